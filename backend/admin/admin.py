@@ -6,10 +6,14 @@ Health checks, cache management, and other administrative functions.
 
 import sys
 import os
+import sqlite3
 
 from flask import Blueprint, jsonify, request, current_app
-from database import with_database
+import database
+from database import with_database, pool
 from extensions import cache
+import cache_warmer
+import forecast_job
 
 try:
     from utils import success_response, error_response
@@ -38,7 +42,12 @@ def health_check():
 
 @admin_bp.route('/api/admin/clear-cache', methods=['POST'])
 def clear_cache_endpoint():
-    """Clear all cached data - useful after database updates"""
+    """
+    Clear all cached data in this worker process.
+
+    Not needed after syncs or deploys (report cache keys include the data
+    version and database file), but handy when debugging a worker.
+    """
     try:
         cache.clear()
         return jsonify(success_response(None, message='Cache cleared successfully'))
@@ -46,6 +55,18 @@ def clear_cache_endpoint():
         return error_response(e)
 
 
+@admin_bp.route('/api/admin/db-pool', methods=['GET'])
+def db_pool_stats():
+    """Connection pool counters (checkouts, waits, open connections)"""
+    return jsonify(success_response(pool.stats()))
+
+
+@admin_bp.route('/api/admin/cache-warmer', methods=['GET'])
+def cache_warmer_status():
+    """Per-URL timings from the most recent cache warm-up run"""
+    return jsonify(success_response(cache_warmer.last_run or None))
+
+
 @admin_bp.route('/api/admin/sync-vivonet', methods=['POST'])
 def sync_vivonet():
     """
@@ -103,10 +124,86 @@ def sync_vivonet():
     db_path = os.path.join(db_dir, "cafe_reports.db")
 
     try:
+        # No cache clear needed: the import bumps the database's data
+        # version, which every cached report key includes.
         stats = import_vivonet(start, end, store, db_path)
-        # Clear cache after successful import
-        cache.clear()
-        return jsonify(success_response(stats,
-                                        message="Vivonet sync complete"))
     except Exception as e:
-        return error_response(e)
\ No newline at end of file
+        return error_response(e)
+
+    # Store today's forecasts from the new sales before warming them. The
+    # orders are committed either way; if this fails the forecasts are
+    # computed live until the job next succeeds.
+    message = "Vivonet sync complete"
+    try:
+        forecast_job.run_forecast_job(db_path)
+    except Exception as e:
+        print(f"[forecast-job] failed after sync: {e!r}", file=sys.stderr)
+        message += f"; storing forecasts failed: {e}"
+    # Recompute the dashboard defaults the sync just invalidated
+    cache_warmer.start_cache_warmer(current_app._get_current_object())
+    return jsonify(success_response(stats, message=message))
+
+
+@admin_bp.route('/api/admin/event-calendar', methods=['GET', 'POST'])
+def event_calendar():
+    """
+    List or import event-calendar days (game days, holidays, closures).
+
+    GET ?type=game_day lists the events, optionally of one type.
+
+    POST body (JSON):
+        events:  [{"date": "YYYY-MM-DD", "type": "game_day", "name": "..."}]
+        replace: true to first delete every event of the imported types
+
+    Reports taking `exclude=game_day` and the forecasts pick the changes
+    up without a cache clear: writes bump the data version of their days.
+
+    Example:
+        curl -X POST http://localhost:5500/api/admin/event-calendar \
+             -H "Content-Type: application/json" \
+             -d '{"events": [{"date": "2026-09-05", "type": "game_day"}]}'
+    """
+    # database/event_calendar.py owns the table; database/ is a sibling of backend/
+    db_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           '..', '..', 'database'))
+    if db_dir not in sys.path:
+        sys.path.insert(0, db_dir)
+    from event_calendar import import_events
+
+    # The pool's connections are read-only, so this uses its own connection
+    conn = sqlite3.connect(database.DB_PATH)
+    try:
+        cursor = conn.cursor()
+        if request.method == 'GET':
+            event_type = request.args.get('type')
+            try:
+                cursor.execute(
+                    'SELECT event_date, event_type, name FROM event_calendar '
+                    'WHERE ? IS NULL OR event_type = ? ORDER BY event_date, event_type',
+                    (event_type, event_type),
+                )
+            except sqlite3.OperationalError:  # nothing imported yet
+                return jsonify(success_response([]))
+            events = [{'date': d, 'type': t, 'name': name} for d, t, name in cursor.fetchall()]
+            return jsonify(success_response(events))
+
+        body = request.get_json(silent=True) or {}
+        events = body.get('events')
+        if not isinstance(events, list) or not all(isinstance(e, dict) for e in events):
+            return error_response("events must be a list of {date, type, name} objects", 400)
+        try:
+            count = import_events(
+                cursor,
+                [(e.get('date'), e.get('type'), e.get('name')) for e in events],
+                replace=bool(body.get('replace')),
+            )
+        except ValueError as e:
+            conn.rollback()
+            return error_response(e, 400)
+        conn.commit()
+        return jsonify(success_response({'imported': count}, message='Event calendar updated'))
+    except Exception as e:
+        conn.rollback()
+        return error_response(e)
+    finally:
+        conn.close()
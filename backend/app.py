@@ -10,6 +10,10 @@ from database import with_database, get_db
 
 app = Flask(__name__)
 
+# Serialize responses with orjson when it is installed (see json_provider.py)
+from json_provider import init_json_provider
+init_json_provider(app)
+
 
 @app.errorhandler(Exception)
 def handle_unexpected_error(e):
@@ -29,6 +33,8 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Import and register blueprints
 from admin.admin import admin_bp
+from reports.dashboard import dashboard_bp
+from reports.export import export_bp
 from forecasts.forecasts import forecasts_bp
 from reports.items import items_bp
 from reports.labor import labor_bp
@@ -36,11 +42,19 @@ from reports.meta import meta_bp
 
 # Register blueprints
 app.register_blueprint(admin_bp)
+app.register_blueprint(dashboard_bp)
+app.register_blueprint(export_bp)
 app.register_blueprint(forecasts_bp)
 app.register_blueprint(items_bp)
 app.register_blueprint(labor_bp)
 app.register_blueprint(meta_bp)
 
+# Compute the dashboard's default reports in the background, starting with
+# each worker process's first request, so later visitors after a reload
+# don't pay for them cold (see cache_warmer.py).
+from cache_warmer import init_cache_warmer
+init_cache_warmer(app)
+
 
 # Frontend serving
 @app.route('/', defaults={'path': ''})
@@ -67,5 +81,7 @@ if __name__ == '__main__':
     print("  /api/forecasts/hourly")
     print("  /api/forecasts/items")
     print("  /api/forecasts/categories")
+    print("  /api/dashboard/summary")
     print("  /api/items")
+    print("  /api/export/transactions")
     app.run(debug=True, port=5500, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Background cache warmer for the dashboard's default requests.
+
+After a WSGI reload or a sync, the first person to open the dashboard used
+to pay for every cold report at once. The warmer replays those requests in
+a background thread through Flask's test client, so they run through the
+real routes and land in the cache under exactly the keys a browser request
+would use (see report_cache.py).
+
+It runs on the first request each process serves (init_cache_warmer) and
+again after every sync. Not at import: a pre-forking server imports the app
+once and forks its workers from that process, and a thread started then
+would run only in the parent, whose SimpleCache no worker shares. Runs are
+bounded by a time budget; each request's duration is logged to stderr.
+
+Settings (environment):
+    CAFE_CACHE_WARM=0              disable the warmer
+    CAFE_CACHE_WARM_BUDGET=120     seconds per run before remaining URLs are skipped
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+try:
+    from utils import get_default_date_range
+except ImportError:
+    from .utils import get_default_date_range
+
+WARM_ENABLED = os.environ.get('CAFE_CACHE_WARM', '1') != '0'
+WARM_BUDGET_SECONDS = float(os.environ.get('CAFE_CACHE_WARM_BUDGET', 120))
+
+FORECAST_URLS = [
+    '/api/forecasts/daily',
+    '/api/forecasts/hourly',
+    '/api/forecasts/items',
+    '/api/forecasts/categories',
+]
+
+# pid -> (run lock, rerun flag): a forked child gets its own, since a lock
+# held by the parent's warmer thread would never be released in the child
+_process_state = {}
+last_run = {}
+
+
+def _quarter_start(day):
+    """First day of the quarter containing day (fiscal quarters, Q1 = Jul-Sep, line up with calendar ones)."""
+    first_month = ((day.month - 1) // 3) * 3 + 1
+    return date(day.year, first_month, 1)
+
+
+def preset_ranges(today=None):
+    """
+    Date ranges to warm, most-used first, as {label: (start, end)}.
+
+    Mirrors frontend/src/utils/datePresets.ts; "This Quarter" is the
+    dashboard's default preset.
+    """
+    today = today or date.today()
+    week_start = today - timedelta(days=today.weekday())  # Monday
+    month_start = today.replace(day=1)
+    last_month_end = month_start - timedelta(days=1)
+    default_start, default_end = get_default_date_range()
+
+    return {
+        'This Quarter': (_quarter_start(today).isoformat(), today.isoformat()),
+        'Default (90 days)': (default_start, default_end),
+        'Last Month': (last_month_end.replace(day=1).isoformat(), last_month_end.isoformat()),
+        'Last Week': ((week_start - timedelta(days=7)).isoformat(),
+                      (week_start - timedelta(days=1)).isoformat()),
+    }
+
+
+def dashboard_urls(start, end):
+    """The report requests Dashboard.tsx makes for one date range."""
+    dates = {'start': start, 'end': end}
+    return [
+        '/api/dashboard/summary?' + urlencode(dates),
+        # The default report panel (ItemsByRevenue.tsx)
+        '/api/reports/items-by-revenue?' + urlencode({**dates, 'item_type': 'all'}),
+    ]
+
+
+def warm_urls(today=None):
+    """Every URL to warm, in priority order, without duplicates."""
+    ranges = list(preset_ranges(today).values())
+    urls = dashboard_urls(*ranges[0]) + FORECAST_URLS
+    for start, end in ranges[1:]:
+        urls += dashboard_urls(start, end)
+    return list(dict.fromkeys(urls))
+
+
+def warm_cache(app, budget_seconds=WARM_BUDGET_SECONDS, urls=None):
+    """
+    Request each URL through the app so its response is cached.
+
+    Stops starting new requests once budget_seconds have elapsed. Returns
+    a summary dict (also kept in `last_run`).
+    """
+    urls = warm_urls() if urls is None else urls
+    client = app.test_client()
+    started = time.monotonic()
+    results = []
+    skipped = 0
+
+    for i, url in enumerate(urls):
+        if time.monotonic() - started >= budget_seconds:
+            skipped = len(urls) - i
+            print(f"[cache-warmer] budget of {budget_seconds:.0f}s used, "
+                  f"skipping {skipped} URLs", file=sys.stderr)
+            break
+        t0 = time.monotonic()
+        status = client.get(url).status_code
+        seconds = round(time.monotonic() - t0, 3)
+        results.append({'url': url, 'status': status, 'seconds': seconds})
+        print(f"[cache-warmer] {status} {seconds:7.3f}s {url}", file=sys.stderr)
+
+    last_run.clear()
+    last_run.update({
+        'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'total_seconds': round(time.monotonic() - started, 3),
+        'warmed': len(results),
+        'skipped': skipped,
+        'results': results,
+    })
+    return dict(last_run)
+
+
+def init_cache_warmer(app):
+    """Start warming the cache when a process serves its first request."""
+    if not WARM_ENABLED:
+        return
+    started = {}  # pid -> token of the request that started its warmer
+
+    @app.before_request
+    def warm_on_first_request():
+        # setdefault is atomic, so concurrent first requests start one run
+        token = object()
+        if started.setdefault(os.getpid(), token) is token:
+            start_cache_warmer(app)
+
+
+def start_cache_warmer(app):
+    """
+    Warm the cache in a daemon thread.
+
+    If a run is already in progress, it is repeated once it finishes (so a
+    sync that lands mid-run is still picked up) rather than starting a
+    second thread.
+    """
+    if not WARM_ENABLED:
+        return None
+
+    pid = os.getpid()
+    lock, rerun = (_process_state.get(pid)
+                   or _process_state.setdefault(pid, (threading.Lock(), threading.Event())))
+    rerun.set()
+    if not lock.acquire(blocking=False):
+        return None
+
+    def run():
+        while True:
+            try:
+                while rerun.is_set():
+                    rerun.clear()
+                    try:
+                        warm_cache(app)
+                    except Exception as e:
+                        print(f"[cache-warmer] failed: {e!r}", file=sys.stderr)
+            finally:
+                lock.release()
+            # A request may have arrived between the last check and release
+            if not rerun.is_set() or not lock.acquire(blocking=False):
+                return
+
+    thread = threading.Thread(target=run, name='cache-warmer', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,344 @@
+"""
+In-memory columnar copy of `transactions` for the hottest report queries.
+
+Most reports select a date range and then group by item, hour or day.
+Even with covering indexes, SQLite aggregates those one row at a time and
+the view then builds a sqlite3.Row per result. This module keeps the
+columns those reports need as NumPy arrays sorted by time:
+
+    epoch     int64   transaction time, seconds since 1970-01-01 (local
+                      wall-clock time, as stored; no time zone applied)
+    item_id   int32
+    quantity  int32
+    cents     int64   total_cents
+    day       int32   days since 1970-01-01 (epoch // 86400)
+    hour      int8    0-23
+    dow       int8    day of week, 0 = Sunday (like strftime('%w'))
+
+so a date range is two `searchsorted` calls and a GROUP BY is a
+`bincount` over the selected slice.
+
+The copy is loaded on first use and kept current from data_versions
+(database/data_version.py): every write to `transactions` stamps its day,
+so on each request the days written since the copy was taken are re-read
+and merged in. Orders appended by vivonet_service (a separate process)
+show up on the next request after the sync commits, without a full reload.
+A replaced database file, or one without data_versions, is reloaded whole
+whenever it changes.
+
+Results match the SQL views exactly: both sum integer cents, and
+averages are rounded to the cent like SQLite's ROUND().
+
+Settings (environment):
+    CAFE_COLUMNAR_ENDPOINTS=           comma-separated endpoints answered from the
+                                       store (see ENDPOINTS), or "all"; off by default
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+try:
+    from database import db_file_id
+    from date_range import parse_report_date
+    from sales_source import get_transactions_source
+except ImportError:
+    from .database import db_file_id
+    from .date_range import parse_report_date
+    from .sales_source import get_transactions_source
+
+ENDPOINTS = ('total-sales', 'items-by-revenue', 'sales-per-hour', 'item-heatmap')
+
+DAY_NAMES = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+
+EPOCH_DAY = date(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+# strftime('%s') reads the stored wall-clock time as UTC, which is exactly
+# the naive epoch the arrays hold.
+ROWS_SQL = '''
+    SELECT epoch, item_id, quantity, cents
+    FROM (
+        SELECT
+            CAST(strftime('%s', transaction_date) AS INTEGER) AS epoch,
+            item_id, quantity, {cents} AS cents
+        FROM transactions
+        {where}
+    )
+    WHERE epoch IS NOT NULL
+'''
+SEQUENCE_SQL = "SELECT version FROM data_versions WHERE scope = 'sequence'"
+# Day scopes sort as 'day:YYYY-MM-DD', so this is a primary-key range.
+CHANGED_DAYS_SQL = '''
+    SELECT substr(scope, 5) FROM data_versions
+    WHERE scope > 'day:' AND scope < 'day;' AND version > ?
+'''
+ROW_COUNT_SQL = 'SELECT MAX(transaction_id), COUNT(*) FROM transactions'
+
+
+def columnar_enabled(endpoint):
+    """True when CAFE_COLUMNAR_ENDPOINTS routes this endpoint to the store."""
+    names = {name.strip() for name in os.environ.get('CAFE_COLUMNAR_ENDPOINTS', '').split(',')}
+    return 'all' in names or endpoint in names
+
+
+def day_number(value):
+    """Days since 1970-01-01 for a date or 'YYYY-MM-DD' string."""
+    if isinstance(value, str):
+        value = parse_report_date(value)
+    return (value - EPOCH_DAY).days
+
+
+def sql_round(value, digits):
+    """ROUND(value, digits) as SQLite computes it: half away from zero on the stored double."""
+    return float(Decimal(value).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+
+class TransactionColumns:
+    """An immutable snapshot of `transactions` as parallel arrays, sorted by time."""
+
+    def __init__(self, epoch, item_id, quantity, cents, token=None, file_id=None):
+        order = np.argsort(epoch, kind='stable')
+        self.epoch = epoch[order]
+        self.item_id = item_id[order]
+        self.quantity = quantity[order]
+        self.cents = cents[order]
+        self.day = (self.epoch // SECONDS_PER_DAY).astype(np.int32)
+        self.hour = (self.epoch % SECONDS_PER_DAY // 3600).astype(np.int8)
+        # 1970-01-01 was a Thursday
+        self.dow = ((self.day + 4) % 7).astype(np.int8)
+        self.token = token
+        self.file_id = file_id
+
+    @classmethod
+    def from_rows(cls, rows, **kwargs):
+        """Build from (epoch, item_id, quantity, cents) tuples."""
+        data = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        return cls(
+            data[:, 0].astype(np.int64),
+            data[:, 1].astype(np.int32),
+            data[:, 2].astype(np.int32),
+            data[:, 3].astype(np.int64),
+            **kwargs,
+        )
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def with_days_replaced(self, days, rows, token):
+        """A new snapshot with every row on `days` (day numbers) replaced by `rows`."""
+        fresh = TransactionColumns.from_rows(rows)
+        keep = ~np.isin(self.day, days)
+        take = np.isin(fresh.day, days)
+        return TransactionColumns(
+            np.concatenate([self.epoch[keep], fresh.epoch[take]]),
+            np.concatenate([self.item_id[keep], fresh.item_id[take]]),
+            np.concatenate([self.quantity[keep], fresh.quantity[take]]),
+            np.concatenate([self.cents[keep], fresh.cents[take]]),
+            token=token,
+            file_id=self.file_id,
+        )
+
+    def select(self, start_date, end_date, exclude_dates=()):
+        """
+        Positions of the rows in an inclusive date range, minus excluded days.
+
+        Returns a slice when nothing is excluded (a view, no copy), else an
+        index array. Either can index the column arrays.
+        """
+        first, last = day_number(start_date), day_number(end_date)
+        lo = int(np.searchsorted(self.epoch, first * SECONDS_PER_DAY, 'left'))
+        hi = int(np.searchsorted(self.epoch, (last + 1) * SECONDS_PER_DAY, 'left'))
+        hi = max(lo, hi)
+        excluded = [day_number(d) for d in exclude_dates]
+        excluded = [d for d in excluded if first <= d <= last]
+        if not excluded:
+            return slice(lo, hi)
+        return lo + np.flatnonzero(~np.isin(self.day[lo:hi], excluded))
+
+
+_lock = threading.Lock()
+_columns = None
+
+
+def _row_cursor(cursor):
+    """A cursor on the same connection returning plain tuples."""
+    plain = cursor.connection.cursor()
+    plain.row_factory = None
+    return plain
+
+
+def _change_token(cursor):
+    """('sequence', n) from data_versions, else ('rows', max id, count)."""
+    try:
+        cursor.execute(SEQUENCE_SQL)
+        row = cursor.fetchone()
+        if row is not None:
+            return ('sequence', row[0])
+    except sqlite3.OperationalError:  # no data_versions table
+        pass
+    cursor.execute(ROW_COUNT_SQL)
+    return ('rows', *cursor.fetchone())
+
+
+def _load_all(cursor, token, file_id):
+    cents = get_transactions_source(cursor).revenue
+    cursor.execute(ROWS_SQL.format(cents=cents, where=''))
+    return TransactionColumns.from_rows(cursor.fetchall(), token=token, file_id=file_id)
+
+
+def _day_runs(days):
+    """Group sorted day numbers into inclusive (first, last) runs of consecutive days."""
+    runs = []
+    for day in days:
+        if runs and day == runs[-1][1] + 1:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def _refresh(columns, cursor, token):
+    """Re-read the days written since `columns` was taken."""
+    cursor.execute(CHANGED_DAYS_SQL, (columns.token[1],))
+    days = sorted({day_number(row[0]) for row in cursor.fetchall()})
+    cents = get_transactions_source(cursor).revenue
+    rows = []
+    for first, last in _day_runs(days):
+        cursor.execute(
+            ROWS_SQL.format(cents=cents, where='WHERE transaction_date >= ? AND transaction_date < ?'),
+            (f'{EPOCH_DAY + timedelta(days=first)} 00:00:00',
+             f'{EPOCH_DAY + timedelta(days=last + 1)} 00:00:00'),
+        )
+        rows.extend(cursor.fetchall())
+    return columns.with_days_replaced(days, rows, token)
+
+
+def get_columns(cursor):
+    """
+    The current snapshot, loading or refreshing it first if the database changed.
+
+    The change token is read before any rows, so a write landing in
+    between is picked up again on the next call rather than missed.
+    """
+    global _columns
+    plain = _row_cursor(cursor)
+    with _lock:
+        file_id = db_file_id()
+        token = _change_token(plain)
+        columns = _columns
+        if columns is not None and columns.file_id == file_id:
+            if columns.token == token:
+                return columns
+            if columns.token[0] == token[0] == 'sequence':
+                _columns = _refresh(columns, plain, token)
+                return _columns
+        _columns = _load_all(plain, token, file_id)
+        return _columns
+
+
+def _daily_totals(day, group, weights, groups):
+    """
+    Per group, the number of days with rows and the weights summed over them.
+
+    Dividing one by the other averages the per-day sums the way AVG over
+    a GROUP BY day subquery does: days without rows in the group don't count.
+    """
+    if len(day) == 0:
+        return np.zeros(groups, dtype=np.int64), np.zeros(groups)
+    first = int(day.min())
+    span = int(day.max()) - first + 1
+    key = group.astype(np.int64) * span + (day - first)
+    rows = np.bincount(key, minlength=groups * span).reshape(groups, span)
+    sums = np.bincount(key, weights=weights, minlength=groups * span).reshape(groups, span)
+    return (rows > 0).sum(axis=1), sums.sum(axis=1)
+
+
+def total_sales(columns, start_date, end_date):
+    """Revenue over the range; 0 when it has no sales, like the SQL view."""
+    sel = columns.select(start_date, end_date)
+    cents = columns.cents[sel]
+    if len(cents) == 0:
+        return 0
+    return int(cents.sum()) / 100
+
+
+def item_totals(columns, start_date, end_date):
+    """{item_id: (units_sold, revenue)} for items sold in the range."""
+    sel = columns.select(start_date, end_date)
+    ids, inverse = np.unique(columns.item_id[sel], return_inverse=True)
+    units = np.bincount(inverse, weights=columns.quantity[sel], minlength=len(ids))
+    cents = np.bincount(inverse, weights=columns.cents[sel], minlength=len(ids))
+    return {
+        int(item_id): (int(u), int(c) / 100)
+        for item_id, u, c in zip(ids, units, cents)
+    }
+
+
+def hourly_sales(columns, start_date, end_date):
+    """[{'hour': 'HH:00', 'sales'}] summed per hour, for hours with sales."""
+    sel = columns.select(start_date, end_date)
+    hour = columns.hour[sel]
+    rows = np.bincount(hour, minlength=24)
+    cents = np.bincount(hour, weights=columns.cents[sel], minlength=24)
+    return [
+        {'hour': f'{h:02d}:00', 'sales': int(cents[h]) / 100}
+        for h in range(24) if rows[h]
+    ]
+
+
+def average_hourly_sales(columns, start_date, end_date, exclude_dates=()):
+    """
+    Mean sales per hour over the days with sales in that hour.
+
+    Returns (rows, days_with_data): rows as [{'hour': 'HH:00', 'sales'}],
+    and the number of days in the range with any sales.
+    """
+    sel = columns.select(start_date, end_date, exclude_dates)
+    day = columns.day[sel]
+    days, cents = _daily_totals(day, columns.hour[sel], columns.cents[sel], 24)
+    data = [
+        {'hour': f'{h:02d}:00', 'sales': sql_round(cents[h] / days[h], 0) / 100}
+        for h in range(24) if days[h]
+    ]
+    return data, len(np.unique(day))
+
+
+def day_of_week_hourly_sales(columns, start_date, end_date, exclude_dates=()):
+    """Mean sales per (day of week, hour), as the rows the day-of-week SQL returns."""
+    sel = columns.select(start_date, end_date, exclude_dates)
+    group = columns.dow[sel].astype(np.int64) * 24 + columns.hour[sel]
+    days, cents = _daily_totals(columns.day[sel], group, columns.cents[sel], 7 * 24)
+    return [
+        {
+            'day_of_week': DAY_NAMES[g // 24],
+            'day_num': g // 24,
+            'hour': f'{g % 24:02d}:00',
+            'sales': sql_round(cents[g] / days[g], 0) / 100,
+        }
+        for g in range(7 * 24) if days[g]
+    ]
+
+
+def item_heatmap(columns, item_id, start_date, end_date, exclude_dates=()):
+    """One item's mean revenue and units per (day of week, hour), as item-heatmap rows."""
+    sel = columns.select(start_date, end_date, exclude_dates)
+    mine = columns.item_id[sel] == item_id
+    day = columns.day[sel][mine]
+    group = columns.dow[sel][mine].astype(np.int64) * 24 + columns.hour[sel][mine]
+    days, cents = _daily_totals(day, group, columns.cents[sel][mine], 7 * 24)
+    _, units = _daily_totals(day, group, columns.quantity[sel][mine], 7 * 24)
+    return [
+        {
+            'day_of_week': DAY_NAMES[g // 24],
+            'day_num': g // 24,
+            'hour': g % 24,
+            'revenue': sql_round(cents[g] / days[g], 0) / 100,
+            'units': sql_round(units[g] / days[g], 1),
+        }
+        for g in range(7 * 24) if days[g]
+    ]
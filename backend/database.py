@@ -1,6 +1,10 @@
 """Database connection and decorator utilities."""
 import os
 import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from functools import wraps
 from flask import jsonify
 
@@ -13,15 +17,286 @@ DB_PATH = os.environ.get('CAFE_DB_PATH', DEFAULT_DB_PATH)
 if not os.path.isabs(DB_PATH):
     DB_PATH = os.path.abspath(os.path.join(BASE_DIR, DB_PATH))
 
+# Connection pool sizing. A PythonAnywhere worker serves requests from a
+# small number of threads, so a handful of long-lived connections is enough
+# to keep SQLite's page cache warm without holding many file handles open.
+POOL_MAX_SIZE = int(os.environ.get('CAFE_DB_POOL_SIZE', 8))
+POOL_TIMEOUT = float(os.environ.get('CAFE_DB_POOL_TIMEOUT', 30))
+
+# The read profile and apply_pragmas() are shared with the importers'
+# write profile (database/sqlite_pragmas.py), so the two can't drift apart.
+DATABASE_DIR = os.path.normpath(os.path.join(BASE_DIR, '..', 'database'))
+if DATABASE_DIR not in sys.path:
+    sys.path.append(DATABASE_DIR)
+
+from sqlite_pragmas import READ_PRAGMAS, apply_pragmas  # noqa: E402
+
+# Oldest SQLite library the report queries run on: the dashboard summary
+# scans its range once through `WITH scan AS MATERIALIZED (...)`, which
+# older versions reject as a syntax error.
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def check_sqlite_version(version=sqlite3.sqlite_version_info):
+    """Fail at startup, not on the first dashboard request, on an older SQLite."""
+    if version < MIN_SQLITE_VERSION:
+        raise RuntimeError(
+            f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required "
+            f"(found {'.'.join(map(str, version))})"
+        )
+
 
 def get_db():
     """Get a database connection with proper configuration."""
-    conn = sqlite3.connect(DB_PATH)
+    # check_same_thread=False: pooled connections may be handed to a
+    # different worker thread than the one that opened them. The pool
+    # guarantees a connection is only ever used by one thread at a time.
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.execute("PRAGMA foreign_keys = ON")  # Enforce FK constraints
+    apply_pragmas(conn, READ_PRAGMAS)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def db_file_id():
+    """
+    Identify the database file currently at DB_PATH as (st_dev, st_ino).
+
+    Changes when the file is replaced (e.g. by scripts/deploy_new_db.sh),
+    even if the new file has the same size and contents. None if missing.
+    """
+    try:
+        st = os.stat(DB_PATH)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no pooled connection becomes free within the timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-aware pool of long-lived SQLite connections.
+
+    Opening a connection per request means every report pays for connect,
+    PRAGMA setup and a cold page cache before it touches `transactions`.
+    The pool keeps connections open between requests instead:
+
+    - A thread gets back the connection it used last whenever that one is
+      idle, so consecutive requests served by the same worker thread reuse
+      the same (warm) page cache.
+    - At most `max_size` connections are open at once. When all of them are
+      checked out, callers wait up to `timeout` seconds for one to be
+      returned, then raise PoolTimeout.
+    - Every checkout runs a health check. Connections that fail `SELECT 1`
+      or that point at a database file which has since been replaced (e.g.
+      by scripts/deploy_new_db.sh) are discarded and reopened.
+    - A process forked from the one that opened the pool (a pre-forking
+      WSGI server's workers) starts with no connections; see _after_fork().
+
+    Usage:
+        with pool.connection() as conn:
+            conn.execute("SELECT ...")
+    """
+
+    def __init__(self, factory, max_size=POOL_MAX_SIZE, timeout=POOL_TIMEOUT):
+        self._factory = factory
+        self._max_size = max_size
+        self._timeout = timeout
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._idle = []          # idle connections, most recently used last
+        self._file_ids = {}      # connection -> (st_dev, st_ino) when opened
+        self._open = 0
+        self._in_use = 0
+        self._pid = os.getpid()
+        self._inherited = []     # connections opened before a fork; never used
+        self._stats = {
+            'checkouts': 0,
+            'thread_reuses': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'timeouts': 0,
+            'created': 0,
+            'discarded': 0,
+        }
+
+    def acquire(self):
+        """Check out a healthy connection, opening one if the pool allows."""
+        self._after_fork()
+        conn = self._checkout()
+        if conn is not None and not self._is_healthy(conn):
+            self._discard(conn)
+            conn = None
+
+        if conn is None:
+            # A slot was reserved in _checkout(); open outside the lock so a
+            # slow connect doesn't block other threads returning theirs.
+            try:
+                conn = self._open_connection()
+            except Exception:
+                self._free_slot()
+                raise
+
+        self._local.conn = conn
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool (or drop it if it is broken)."""
+        self._after_fork()
+        if conn not in self._file_ids:
+            return  # opened before a fork; the parent owns it
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            self._free_slot()
+            return
+
+        with self._cond:
+            self._idle.append(conn)
+            self._in_use -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager wrapper around acquire()/release()."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """Return a snapshot of pool counters for monitoring."""
+        with self._cond:
+            return {
+                **self._stats,
+                'wait_seconds': round(self._stats['wait_seconds'], 4),
+                'open_connections': self._open,
+                'idle_connections': len(self._idle),
+                'in_use_connections': self._in_use,
+                'max_size': self._max_size,
+            }
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on release)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn in idle:
+            self._discard(conn)
+
+    def _after_fork(self):
+        """
+        Start over with no connections when running in a forked child.
+
+        SQLite connections can't be used across fork(), and the parent's
+        lock and counters describe the parent's connections (possibly
+        mid-checkout by a thread the child doesn't have). The inherited
+        connections are kept referenced but never closed: closing one
+        would act on the parent's open database.
+        """
+        if self._pid == os.getpid():
+            return
+        with _fork_lock:
+            if self._pid == os.getpid():
+                return
+            self._inherited.extend(self._file_ids)
+            self._cond = threading.Condition()
+            self._local = threading.local()
+            self._idle = []
+            self._file_ids = {}
+            self._open = 0
+            self._in_use = 0
+            self._pid = os.getpid()
+
+    def _checkout(self):
+        """
+        Take an idle connection, or reserve a slot for a new one.
+
+        Returns the idle connection, or None when the caller should open a
+        new connection into the reserved slot.
+        """
+        with self._cond:
+            self._stats['checkouts'] += 1
+            wait_started = None
+            while not self._idle and self._open >= self._max_size:
+                if wait_started is None:
+                    self._stats['waits'] += 1
+                    wait_started = time.monotonic()
+                remaining = self._timeout - (time.monotonic() - wait_started)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._stats['wait_seconds'] += time.monotonic() - wait_started
+                    raise PoolTimeout(
+                        f"No database connection available after {self._timeout}s "
+                        f"({self._max_size} in use)"
+                    )
+                self._cond.wait(remaining)
+            if wait_started is not None:
+                self._stats['wait_seconds'] += time.monotonic() - wait_started
+
+            self._in_use += 1
+            if self._idle:
+                return self._take_idle()
+            self._open += 1
+            return None
+
+    def _free_slot(self):
+        """Give back the slot held by a connection that was dropped."""
+        with self._cond:
+            self._open -= 1
+            self._in_use -= 1
+            self._cond.notify()
+
+    def _take_idle(self):
+        """Prefer this thread's previous connection; else the warmest idle one."""
+        own = getattr(self._local, 'conn', None)
+        if own is not None:
+            for i, conn in enumerate(self._idle):
+                if conn is own:
+                    self._stats['thread_reuses'] += 1
+                    return self._idle.pop(i)
+        return self._idle.pop()
+
+    def _open_connection(self):
+        conn = self._factory()
+        self._file_ids[conn] = db_file_id()
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        if self._file_ids.get(conn) != db_file_id():
+            return False
+        try:
+            conn.execute('SELECT 1').fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _discard(self, conn):
+        self._file_ids.pop(conn, None)
+        with self._cond:
+            self._stats['discarded'] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+# Serializes the first checkout in a forked child (ConnectionPool._after_fork)
+_fork_lock = threading.Lock()
+
+check_sqlite_version()
+
+pool = ConnectionPool(get_db)
+
+
 def with_database(f):
     """
     Decorator that provides automatic database connection management.
@@ -34,16 +309,17 @@ def with_database(f):
             return {'data': [...]}
 
     Benefits:
-    - Automatic connection opening and closing
-    - Connection closed even if exception occurs
+    - Connections come from the shared pool and are returned afterwards
+    - Connection returned even if exception occurs
     - Consistent error response formatting
     - Reduces boilerplate by ~12 lines per endpoint
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
         conn = None
+        cursor = None
         try:
-            conn = get_db()
+            conn = pool.acquire()
             cursor = conn.cursor()
 
             # Call the wrapped function with cursor
@@ -63,8 +339,10 @@ def with_database(f):
             }), 500
 
         finally:
-            # Always close connection, even on error
+            # Always hand the connection back, even on error
+            if cursor:
+                cursor.close()
             if conn:
-                conn.close()
+                pool.release(conn)
 
     return decorated_function
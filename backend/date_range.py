@@ -14,12 +14,23 @@ filter with a half-open, raw-column range instead:
     AND transaction_date <  '2026-07-22 00:00:00'
 
 which SQLite can satisfy with a bounded index search.
+
+Excluded days (e.g. game days) are handled the same way: rather than
+`DATE(transaction_date) NOT IN (...)`, which evaluates DATE() on every row
+and still reads the excluded days, exclusion_filter() turns the range into
+the runs of days that remain, each its own bounded range.
 """
 
+import json
 from datetime import datetime, timedelta
 
 DATE_FORMAT = '%Y-%m-%d'
 
+# Up to this many remaining runs are OR-ed as index ranges (two bound
+# parameters each, well under SQLite's 999-variable limit); beyond it the
+# excluded days are anti-joined from a single JSON parameter instead.
+EXCLUSION_RANGES_LIMIT = 64
+
 
 def parse_report_date(date_str):
     """
@@ -71,3 +82,90 @@ def inclusive_date_range_to_timestamps(start_date, end_date):
     end = parse_report_date(end_date)
     end_exclusive = end + timedelta(days=1)
     return to_midnight_timestamp(start), to_midnight_timestamp(end_exclusive)
+
+
+def _as_date(value):
+    return parse_report_date(value) if isinstance(value, str) else value
+
+
+def parse_exclude_dates(value):
+    """
+    Parse a comma-separated 'YYYY-MM-DD' list into sorted, unique dates.
+
+    Empty or missing input gives an empty list.
+
+    Raises:
+        ValueError: if any entry is not a valid 'YYYY-MM-DD' date.
+    """
+    days = {parse_report_date(d.strip()) for d in (value or '').split(',') if d.strip()}
+    return sorted(days)
+
+
+def kept_date_ranges(start_date, end_date, exclude_dates):
+    """
+    Split an inclusive [start_date, end_date] range around excluded days.
+
+    Args:
+        start_date, end_date: date objects, inclusive.
+        exclude_dates: iterable of date objects; days outside the range
+            are ignored.
+
+    Returns:
+        list: inclusive (first, last) date pairs covering every day in the
+        range that isn't excluded, in order. Empty if nothing remains.
+    """
+    ranges = []
+    first = start_date
+    for day in sorted(set(exclude_dates)):
+        if day < first or day > end_date:
+            continue
+        if day > first:
+            ranges.append((first, day - timedelta(days=1)))
+        first = day + timedelta(days=1)
+    if first <= end_date:
+        ranges.append((first, end_date))
+    return ranges
+
+
+def exclusion_filter(start_date, end_date, exclude_dates, range_sql, range_params, day_expr):
+    """
+    Build a WHERE fragment for an inclusive date range minus excluded days.
+
+    Args:
+        start_date, end_date: 'YYYY-MM-DD' strings or date objects.
+        exclude_dates: iterable of 'YYYY-MM-DD' strings or date objects.
+        range_sql: fragment selecting one inclusive day range with two
+            placeholders, e.g. 'shift_date >= ? AND shift_date <= ?'.
+        range_params: function (first, last) -> the two bound values.
+        day_expr: SQL expression for a row's 'YYYY-MM-DD' day.
+
+    Returns:
+        tuple: (sql_fragment, params_list). The remaining runs of days are
+        OR-ed as separate ranges inside the overall range, so SQLite can
+        run one index range search per run, and still searches the overall
+        range when a scan in index order is cheaper (e.g. to skip a GROUP
+        BY sort). Past EXCLUSION_RANGES_LIMIT runs, the excluded days are
+        anti-joined from a JSON list instead.
+
+    Raises:
+        ValueError: if any date is not valid 'YYYY-MM-DD'.
+    """
+    start, end = _as_date(start_date), _as_date(end_date)
+    excluded = sorted({_as_date(d) for d in exclude_dates})
+    excluded = [d for d in excluded if start <= d <= end]
+
+    if not excluded:
+        return range_sql, list(range_params(start, end))
+
+    ranges = kept_date_ranges(start, end, excluded)
+    if not ranges:
+        return '0', []
+    if len(ranges) <= EXCLUSION_RANGES_LIMIT:
+        runs = ' OR '.join(f'({range_sql})' for _ in ranges)
+        params = [p for first, last in ranges for p in range_params(first, last)]
+        return f'{range_sql} AND ({runs})', [*range_params(start, end), *params]
+
+    return (
+        f'{range_sql} AND {day_expr} NOT IN (SELECT value FROM json_each(?))',
+        [*range_params(start, end), json.dumps([d.isoformat() for d in excluded])],
+    )
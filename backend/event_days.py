@@ -0,0 +1,127 @@
+"""
+Event-calendar days for report exclusions and forecasts.
+
+database/event_calendar.py keeps game days, holidays and closures in the
+event_calendar table. Reports that take exclude_dates also take
+`exclude=game_day[,holiday,...]`: the view resolves the types to the
+calendar's days within its range and merges them with any exclude_dates,
+so the frontend no longer has to send the list itself. The query string
+stays the same however the calendar changes; calendar writes are stamped
+in data_versions by day, so cached reports covering a changed day are
+recomputed.
+
+The forecasts take the same parameter (see ForecastEvents): history days
+of those types are left out of the averages (earlier weeks stand in for
+them), and forecast days that are themselves events are forecast from
+recent days of the same type.
+"""
+
+import sqlite3
+from datetime import timedelta
+
+from flask import request
+
+try:
+    from date_range import parse_exclude_dates, parse_report_date
+except ImportError:
+    from .date_range import parse_exclude_dates, parse_report_date
+
+# Matches database/event_calendar.EVENT_TYPES
+EVENT_TYPES = ('game_day', 'holiday', 'closure')
+
+# How event days are described in forecast basis strings
+EVENT_LABELS = {'game_day': 'game days', 'holiday': 'holidays', 'closure': 'closures'}
+
+# Recent days of the same type a forecast event day is averaged over,
+# looked up to EVENT_HISTORY_DAYS back
+EVENT_LOOKBACK = 4
+EVENT_HISTORY_DAYS = 364
+
+
+def parse_event_types(value):
+    """
+    Parse a comma-separated list of event types into a sorted, unique list.
+
+    Raises:
+        ValueError: for a type not in EVENT_TYPES.
+    """
+    types = {t.strip() for t in (value or '').split(',') if t.strip()}
+    unknown = sorted(types - set(EVENT_TYPES))
+    if unknown:
+        raise ValueError(f"Unknown event type(s) {', '.join(unknown)}; "
+                         f"exclude takes: {', '.join(EVENT_TYPES)}")
+    return sorted(types)
+
+
+def event_dates(cursor, types, start_date, end_date):
+    """
+    {date: event_type} for calendar days of `types` in [start_date, end_date].
+
+    A day with several types maps to the last in EVENT_TYPES order (a
+    closure outranks a game day). Empty when there's no event_calendar
+    table yet.
+    """
+    if not types:
+        return {}
+    placeholders = ','.join('?' * len(types))
+    try:
+        cursor.execute(f'''
+            SELECT event_date, event_type FROM event_calendar
+            WHERE event_type IN ({placeholders}) AND event_date >= ? AND event_date <= ?
+        ''', (*types, str(start_date), str(end_date)))
+    except sqlite3.OperationalError:  # no event_calendar table
+        return {}
+    days = {}
+    for event_date, event_type in sorted(cursor.fetchall(), key=lambda r: EVENT_TYPES.index(r[1])):
+        days[parse_report_date(event_date)] = event_type
+    return days
+
+
+def request_exclude_dates(cursor, start_date, end_date):
+    """
+    The days a report request excludes: exclude_dates plus the calendar
+    days of the `exclude` types between start_date and end_date.
+
+    Raises:
+        ValueError: for an invalid start_date, end_date, exclude_dates
+            entry or event type, so the views can answer 400.
+    """
+    start, end = parse_report_date(str(start_date)), parse_report_date(str(end_date))
+    excluded = set(parse_exclude_dates(request.args.get('exclude_dates')))
+    types = parse_event_types(request.args.get('exclude'))
+    if types:
+        excluded.update(event_dates(cursor, types, start, end))
+    return sorted(excluded)
+
+
+class ForecastEvents:
+    """
+    Calendar days a forecast treats separately.
+
+    by_date maps event days from the start of the history window through
+    the last forecast day to their type; recent maps each type to the last
+    EVENT_LOOKBACK days of that type in the EVENT_HISTORY_DAYS before today.
+    """
+
+    def __init__(self, types, by_date, recent):
+        self.types = types
+        self.by_date = by_date
+        self.recent = recent
+
+    @classmethod
+    def load(cls, cursor, types, today, history_days, forecast_days):
+        by_date = event_dates(cursor, types, today - timedelta(days=history_days),
+                              today + timedelta(days=forecast_days))
+        recent = {}
+        for event_type in types:
+            try:
+                cursor.execute('''
+                    SELECT event_date FROM event_calendar
+                    WHERE event_type = ? AND event_date >= ? AND event_date < ?
+                    ORDER BY event_date DESC LIMIT ?
+                ''', (event_type, (today - timedelta(days=EVENT_HISTORY_DAYS)).isoformat(),
+                      today.isoformat(), EVENT_LOOKBACK))
+                recent[event_type] = sorted(parse_report_date(row[0]) for row in cursor.fetchall())
+            except sqlite3.OperationalError:  # no event_calendar table
+                recent[event_type] = []
+        return cls(types, by_date, recent)
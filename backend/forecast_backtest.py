@@ -0,0 +1,342 @@
+"""
+Backtest the forecasts against what actually sold.
+
+Replays the forecast endpoints' logic (forecasts/forecasts.py) as of every
+day in a range: for replay day D the forecasts see only sales before D,
+exactly as the endpoints would have on D, and each forecast day D+1..D+21
+that has already happened is scored against its actual sales. Errors are
+collected per
+
+    daily      total daily sales (key 'all')
+    horizon    daily sales by forecast week, 1-3 (days 1-7, 8-14, 15-21 ahead)
+    item       units per item (key item_id)
+    category   units per category
+    hour       sales per hour of day (key 'HH:00')
+
+as MAPE (mean absolute percentage error over the forecasts whose actual
+was non-zero) and bias (total forecast over total actual, minus 1; above
+zero means the forecast runs high).
+
+Replay days are independent, so they're split into chunks and fanned out
+to a process pool. Each worker opens its own read-only connection and
+loads the actual sales for the whole range once. Results are stored in
+forecast_backtest_runs / forecast_backtest_results and printed as a
+summary report.
+
+Usage:
+    python backend/forecast_backtest.py                      # every day with 4 weeks of history
+    python backend/forecast_backtest.py --start 2025-07-01 --end 2026-06-30
+    python backend/forecast_backtest.py --workers 4 --report backtest.txt
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import database
+
+try:
+    from forecasts.forecasts import (
+        FORECAST_DAYS, category_demand_rows, daily_sales_rows, hourly_sales_rows, item_demand_rows,
+    )
+    from sales_source import get_sales_source
+except ImportError:
+    from .forecasts.forecasts import (
+        FORECAST_DAYS, category_demand_rows, daily_sales_rows, hourly_sales_rows, item_demand_rows,
+    )
+    from .sales_source import get_sales_source
+
+HISTORY_DAYS = 28  # the endpoints look back 4 weeks
+
+BACKTEST_TABLES_DDL = '''
+CREATE TABLE IF NOT EXISTS forecast_backtest_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    first_day TEXT NOT NULL,          -- first replay day ('today' for the forecast)
+    last_day TEXT NOT NULL,
+    replay_days INTEGER NOT NULL,
+    workers INTEGER NOT NULL,
+    seconds REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS forecast_backtest_results (
+    run_id INTEGER NOT NULL REFERENCES forecast_backtest_runs(run_id),
+    level TEXT NOT NULL,              -- daily | horizon | item | category | hour
+    key TEXT NOT NULL,
+    forecasts INTEGER NOT NULL,       -- forecast days scored
+    mape REAL,                        -- percent; NULL when every actual was 0
+    bias REAL,                        -- percent; NULL when the actual total was 0
+    forecast_total REAL NOT NULL,
+    actual_total REAL NOT NULL,
+    PRIMARY KEY (run_id, level, key)
+) WITHOUT ROWID;
+'''
+
+LEVELS = ('daily', 'horizon', 'item', 'category', 'hour')
+
+# Set in each worker by _init_worker
+_cursor = None
+_actuals = None
+_last_actual = None
+
+
+def read_only_connection(db_path):
+    """A read-only connection to db_path with the report connections' PRAGMAs."""
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + '?mode=ro', uri=True)
+    database.apply_pragmas(conn, database.READ_PRAGMAS)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def load_actuals(cursor, first, last):
+    """
+    Actual sales from first to last (inclusive), keyed like the forecast rows:
+    {level: {(key, 'YYYY-MM-DD'): actual}}, plus daily as {('all', date): sales}.
+    """
+    src = get_sales_source(cursor)
+    where, params = src.date_filter(first, last)
+    actuals = {'daily': {}, 'hour': {}, 'item': {}, 'category': {}}
+
+    cursor.execute(f'''
+        SELECT {src.sale_date} AS sale_date, {src.sale_hour} AS hour,
+               SUM({src.revenue}) / 100.0 AS sales
+        FROM {src.table}
+        WHERE {where}
+        GROUP BY sale_date, hour
+    ''', params)
+    for row in cursor.fetchall():
+        actuals['hour'][(row['hour'], row['sale_date'])] = row['sales']
+        daily_key = ('all', row['sale_date'])
+        actuals['daily'][daily_key] = actuals['daily'].get(daily_key, 0) + row['sales']
+
+    cursor.execute(f'''
+        SELECT s.item_id, i.category, {src.sale_date} AS sale_date, SUM({src.units}) AS units
+        FROM {src.table} s
+        LEFT JOIN items i ON s.item_id = i.item_id
+        WHERE {where}
+        GROUP BY s.item_id, sale_date
+    ''', params)
+    for row in cursor.fetchall():
+        actuals['item'][(row['item_id'], row['sale_date'])] = row['units']
+        if row['category'] is not None:
+            category_key = (row['category'], row['sale_date'])
+            actuals['category'][category_key] = actuals['category'].get(category_key, 0) + row['units']
+    return actuals
+
+
+def add_error(errors, level, key, forecast, actual):
+    """Accumulate one forecast day into errors[(level, key)]."""
+    stats = errors.setdefault((level, key), [0, 0.0, 0, 0.0, 0.0])
+    stats[0] += 1
+    if actual:
+        stats[1] += abs(forecast - actual) / abs(actual)
+        stats[2] += 1
+    stats[3] += forecast
+    stats[4] += actual
+
+
+def merge_errors(total, errors):
+    for key, stats in errors.items():
+        into = total.setdefault(key, [0, 0.0, 0, 0.0, 0.0])
+        for i, value in enumerate(stats):
+            into[i] += value
+    return total
+
+
+def replay_day(cursor, today, actuals, last_actual, errors):
+    """Score the forecasts made as of `today` whose days are on or before last_actual."""
+    last_scored = last_actual.isoformat()
+
+    for forecast_date, sales, _ in daily_sales_rows(cursor, today):
+        if forecast_date <= last_scored:
+            actual = actuals['daily'].get(('all', forecast_date), 0)
+            add_error(errors, 'daily', 'all', sales, actual)
+            week = ((date.fromisoformat(forecast_date) - today).days - 1) // 7 + 1
+            add_error(errors, 'horizon', str(week), sales, actual)
+
+    for forecast_date, hour, sales, _ in hourly_sales_rows(cursor, today):
+        if forecast_date <= last_scored:
+            add_error(errors, 'hour', f'{hour:02d}:00', sales,
+                      actuals['hour'].get((hour, forecast_date), 0))
+
+    for level, rows in (('item', item_demand_rows(cursor, today)),
+                        ('category', category_demand_rows(cursor, today))):
+        for key, forecast_date, quantity, _ in rows:
+            if forecast_date <= last_scored:
+                add_error(errors, level, str(key), quantity,
+                          actuals[level].get((key, forecast_date), 0))
+
+
+def _init_worker(db_path, first_actual, last_actual):
+    global _cursor, _actuals, _last_actual
+    _cursor = read_only_connection(db_path).cursor()
+    _actuals = load_actuals(_cursor, first_actual, last_actual)
+    _last_actual = last_actual
+
+
+def _replay_chunk(days):
+    errors = {}
+    for today in days:
+        replay_day(_cursor, today, _actuals, _last_actual, errors)
+    return len(days), errors
+
+
+def summarize(errors):
+    """(level, key, forecasts, mape, bias, forecast_total, actual_total) rows from accumulated errors."""
+    rows = []
+    for (level, key), (count, ape_sum, ape_count, forecast_total, actual_total) in sorted(errors.items()):
+        mape = 100 * ape_sum / ape_count if ape_count else None
+        bias = 100 * (forecast_total - actual_total) / actual_total if actual_total else None
+        rows.append((level, key, count, mape, bias, forecast_total, actual_total))
+    return rows
+
+
+def default_range(cursor):
+    """Every day with HISTORY_DAYS of sales behind it, up to the day before the last complete day."""
+    cursor.execute('SELECT MIN(transaction_date), MAX(transaction_date) FROM transactions')
+    first_sale, last_sale = cursor.fetchone()
+    if first_sale is None:
+        raise SystemExit('No transactions to backtest')
+    last_actual = min(date.fromisoformat(last_sale[:10]), date.today() - timedelta(days=1))
+    return (date.fromisoformat(first_sale[:10]) + timedelta(days=HISTORY_DAYS),
+            last_actual - timedelta(days=1),
+            last_actual)
+
+
+def run_backtest(db_path, start=None, end=None, workers=None):
+    """
+    Replay every day from start to end and store the scores.
+
+    Returns (run_id, summary rows). With workers=1 the replay runs in this
+    process.
+    """
+    workers = workers or os.cpu_count() or 1
+    conn = read_only_connection(db_path)
+    try:
+        default_start, default_end, last_actual = default_range(conn.cursor())
+    finally:
+        conn.close()
+    start = start or default_start
+    end = min(end or default_end, last_actual - timedelta(days=1))
+    if start > end:
+        raise SystemExit(f'Nothing to replay between {start} and {end}')
+
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    last_scored = min(last_actual, end + timedelta(days=FORECAST_DAYS))
+    worker_args = (db_path, start + timedelta(days=1), last_scored)
+    chunk_size = max(1, len(days) // (workers * 4))
+    chunks = [days[i:i + chunk_size] for i in range(0, len(days), chunk_size)]
+
+    started_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    started = time.monotonic()
+    errors = {}
+    done = 0
+    if workers == 1:
+        _init_worker(*worker_args)
+        results = map(_replay_chunk, chunks)
+    else:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=worker_args)
+        results = executor.map(_replay_chunk, chunks)
+    try:
+        for count, chunk_errors in results:
+            merge_errors(errors, chunk_errors)
+            done += count
+            print(f"[backtest] {done}/{len(days)} days", file=sys.stderr)
+    finally:
+        if workers != 1:
+            executor.shutdown()
+    seconds = round(time.monotonic() - started, 3)
+
+    rows = summarize(errors)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            conn.executescript(BACKTEST_TABLES_DDL)
+            run_id = conn.execute(
+                'INSERT INTO forecast_backtest_runs '
+                '(started_at, first_day, last_day, replay_days, workers, seconds) VALUES (?, ?, ?, ?, ?, ?)',
+                (started_at, start.isoformat(), end.isoformat(), len(days), workers, seconds)
+            ).lastrowid
+            conn.executemany(
+                'INSERT INTO forecast_backtest_results '
+                '(run_id, level, key, forecasts, mape, bias, forecast_total, actual_total) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(run_id, *row) for row in rows]
+            )
+    finally:
+        conn.close()
+    return run_id, rows
+
+
+def _percent(value):
+    return '    -' if value is None else f'{value:5.1f}%'
+
+
+def format_report(db_path, run_id, top=15):
+    """The summary report for a stored run, as text."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        run = conn.execute('SELECT * FROM forecast_backtest_runs WHERE run_id = ?', (run_id,)).fetchone()
+        results = conn.execute('''
+            SELECT r.*, i.item_name
+            FROM forecast_backtest_results r
+            LEFT JOIN items i ON r.level = 'item' AND i.item_id = CAST(r.key AS INTEGER)
+            WHERE r.run_id = ?
+        ''', (run_id,)).fetchall()
+    finally:
+        conn.close()
+
+    by_level = {level: [r for r in results if r['level'] == level] for level in LEVELS}
+    lines = [
+        f"Forecast backtest #{run_id}: {run['first_day']} to {run['last_day']} "
+        f"({run['replay_days']} replay days, {run['workers']} workers, {run['seconds']:.1f}s)",
+        '',
+        f"{'':28} {'MAPE':>6} {'bias':>6} {'days':>7}",
+    ]
+
+    def add(title, rows, label):
+        lines.append(title)
+        for r in rows:
+            lines.append(f"  {label(r):26.26} {_percent(r['mape'])} {_percent(r['bias'])} {r['forecasts']:7}")
+
+    add('Daily sales', by_level['daily'], lambda r: 'all days')
+    add('Daily sales by forecast week', sorted(by_level['horizon'], key=lambda r: r['key']),
+        lambda r: f"week {r['key']}")
+    add('Sales by hour', sorted(by_level['hour'], key=lambda r: r['key']), lambda r: r['key'])
+    add('Units by category', sorted(by_level['category'], key=lambda r: r['key']), lambda r: r['key'])
+
+    items = [r for r in by_level['item'] if r['mape'] is not None]
+    worst = sorted(items, key=lambda r: r['mape'], reverse=True)[:top]
+    add(f'Units by item: {top} highest MAPE of {len(items)} items that sold',
+        worst, lambda r: r['item_name'] or f"item {r['key']}")
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the forecasts against actual sales')
+    parser.add_argument('--db', default=database.DB_PATH, help='Path to cafe_reports.db')
+    parser.add_argument('--start', type=date.fromisoformat,
+                        help='First replay day (default: 4 weeks after the first sale)')
+    parser.add_argument('--end', type=date.fromisoformat,
+                        help='Last replay day (default: the day before the last complete day)')
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: CPU count)')
+    parser.add_argument('--top', type=int, default=15, help='Items listed in the report')
+    parser.add_argument('--report', help='Also write the summary report to this file')
+    args = parser.parse_args()
+
+    run_id, _ = run_backtest(args.db, args.start, args.end, args.workers)
+    report = format_report(args.db, run_id, args.top)
+    print(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
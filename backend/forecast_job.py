@@ -0,0 +1,234 @@
+"""
+Nightly materialized forecasts.
+
+The forecast endpoints only change once a day (they look at the 28 days
+before today), yet every cold request recomputed them from the sales
+tables. This job computes them once per day with the same functions the
+endpoints use (forecasts/forecasts.py) and stores the per-day rows in the
+forecast_* tables, keyed by the date they were generated on, along with
+the data version (backend/report_cache.py) of the days they read. The
+endpoints read today's generation and only compute live when it's missing
+(e.g. the job hasn't run yet today) or stale (sales or catalog writes
+since it ran).
+
+It runs after every Vivonet sync (the admin sync endpoint and
+database/update_vivonet_latest.py). To also cover the first request of
+each day and writes outside a sync, schedule it with --if-stale (a
+PythonAnywhere scheduled task or cron), which only computes when today's
+generation is missing or stale. Importing the app starts nothing: a
+single-process server may call start_forecast_scheduler() itself, but a
+pre-forking one must not before it forks. Report connections are
+query_only, so the job opens its own write connection.
+
+    python backend/forecast_job.py [--db PATH] [--date YYYY-MM-DD] [--if-stale]
+
+Settings (environment):
+    CAFE_FORECAST_CHECK_SECONDS=300    how often the scheduler checks today's generation
+    CAFE_FORECAST_KEEP_DAYS=35         generations kept before they're pruned
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+import database
+
+try:
+    from forecasts.forecasts import (
+        category_demand_rows, daily_sales_rows, generation_is_current, hourly_sales_rows,
+        item_demand_rows,
+    )
+except ImportError:
+    from .forecasts.forecasts import (
+        category_demand_rows, daily_sales_rows, generation_is_current, hourly_sales_rows,
+        item_demand_rows,
+    )
+
+from report_cache import forecast_window, span_version
+
+CHECK_SECONDS = float(os.environ.get('CAFE_FORECAST_CHECK_SECONDS', 300))
+KEEP_DAYS = int(os.environ.get('CAFE_FORECAST_KEEP_DAYS', 35))
+
+FORECAST_TABLES_DDL = '''
+CREATE TABLE IF NOT EXISTS forecast_generations (
+    generated_on TEXT PRIMARY KEY,
+    data_version INTEGER              -- data_versions stamp of forecast_window(generated_on); NULL if untracked
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS forecast_daily (
+    generated_on TEXT NOT NULL,       -- 'YYYY-MM-DD' the forecast was computed for
+    forecast_date TEXT NOT NULL,
+    forecasted_sales REAL NOT NULL,   -- dollars
+    basis_weeks INTEGER NOT NULL,     -- prior weeks averaged
+    PRIMARY KEY (generated_on, forecast_date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS forecast_hourly (
+    generated_on TEXT NOT NULL,
+    forecast_date TEXT NOT NULL,
+    hour INTEGER NOT NULL,            -- 7-21
+    avg_sales REAL NOT NULL,          -- dollars, unrounded
+    basis_weeks INTEGER NOT NULL,
+    PRIMARY KEY (generated_on, forecast_date, hour)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS forecast_item_daily (
+    generated_on TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    forecast_date TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    basis_weeks INTEGER NOT NULL,
+    PRIMARY KEY (generated_on, item_id, forecast_date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS forecast_category_daily (
+    generated_on TEXT NOT NULL,
+    category TEXT NOT NULL,
+    forecast_date TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    basis_weeks INTEGER NOT NULL,
+    PRIMARY KEY (generated_on, category, forecast_date)
+) WITHOUT ROWID;
+'''
+
+# table -> (row function, column list), in the row function's tuple order
+FORECASTS = {
+    'forecast_daily': (daily_sales_rows, 'forecast_date, forecasted_sales, basis_weeks'),
+    'forecast_hourly': (hourly_sales_rows, 'forecast_date, hour, avg_sales, basis_weeks'),
+    'forecast_item_daily': (item_demand_rows, 'item_id, forecast_date, quantity, basis_weeks'),
+    'forecast_category_daily': (category_demand_rows, 'category, forecast_date, quantity, basis_weeks'),
+}
+
+_started = threading.Lock()
+last_run = {}
+
+
+def ensure_forecast_tables(cursor):
+    """Create the forecast_* tables if they don't exist."""
+    cursor.executescript(FORECAST_TABLES_DDL)
+
+
+def generate_forecasts(cursor, today):
+    """
+    Replace today's generation of every forecast and prune old ones.
+
+    Runs inside the caller's transaction. Returns {table: rows stored}.
+    """
+    generated_on = today.isoformat()
+    oldest_kept = (today - timedelta(days=KEEP_DAYS)).isoformat()
+    cursor.execute('DELETE FROM forecast_generations WHERE generated_on = ? OR generated_on < ?',
+                   (generated_on, oldest_kept))
+    cursor.execute('INSERT INTO forecast_generations (generated_on, data_version) VALUES (?, ?)',
+                   (generated_on, span_version(cursor, forecast_window(today))))
+    counts = {}
+    for table, (row_function, columns) in FORECASTS.items():
+        rows = row_function(cursor, today)
+        cursor.execute(f'DELETE FROM {table} WHERE generated_on = ? OR generated_on < ?',
+                       (generated_on, oldest_kept))
+        placeholders = ', '.join('?' * (columns.count(',') + 2))
+        cursor.executemany(
+            f'INSERT INTO {table} (generated_on, {columns}) VALUES ({placeholders})',
+            [(generated_on, *row) for row in rows]
+        )
+        counts[table] = len(rows)
+    return counts
+
+
+def run_forecast_job(db_path=None, today=None, only_if_missing=False):
+    """
+    Generate today's forecasts in db_path (default: the app's database).
+
+    With only_if_missing, does nothing if today's generation already
+    exists and is current (checked again under the write lock, so concurrent workers
+    don't both compute it) and returns None. Otherwise returns
+    {table: rows stored}.
+    """
+    today = today or date.today()
+    conn = sqlite3.connect(db_path or database.DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.cursor()
+        ensure_forecast_tables(cursor)
+        cursor.execute('BEGIN IMMEDIATE')
+        if only_if_missing and generation_is_current(cursor, today):
+            conn.rollback()
+            return None
+        started = time.monotonic()
+        counts = generate_forecasts(cursor, today)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    last_run.clear()
+    last_run.update({
+        'generated_on': today.isoformat(),
+        'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'seconds': round(time.monotonic() - started, 3),
+        'rows': counts,
+    })
+    return counts
+
+
+def _today_missing():
+    conn = database.pool.acquire()
+    try:
+        return not generation_is_current(conn.cursor(), date.today())
+    finally:
+        database.pool.release(conn)
+
+
+def start_forecast_scheduler():
+    """
+    Check every CHECK_SECONDS for today's generation and run the job if
+    it's missing or stale, in a daemon thread. Only the first call starts a thread.
+
+    Opt-in: call it from the process that serves requests, after any
+    fork, since the thread and its lock don't survive one.
+    """
+    if not _started.acquire(blocking=False):
+        return None
+
+    def run():
+        while True:
+            try:
+                if _today_missing():
+                    counts = run_forecast_job(only_if_missing=True)
+                    if counts is not None:
+                        print(f"[forecast-job] stored {counts} in {last_run['seconds']:.3f}s",
+                              file=sys.stderr)
+            except Exception as e:
+                print(f"[forecast-job] failed: {e!r}", file=sys.stderr)
+            time.sleep(CHECK_SECONDS)
+
+    thread = threading.Thread(target=run, name='forecast-job', daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store today's forecasts in the forecast_* tables")
+    parser.add_argument('--db', default=database.DB_PATH, help='Path to cafe_reports.db')
+    parser.add_argument('--date', type=date.fromisoformat, default=None,
+                        help='Generate as of this date (default: today)')
+    parser.add_argument('--if-stale', action='store_true',
+                        help='Only generate when the stored generation is missing or stale')
+    args = parser.parse_args()
+
+    counts = run_forecast_job(args.db, args.date, only_if_missing=args.if_stale)
+    if counts is None:
+        print('Stored forecasts are current')
+        return
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"Generated for {last_run['generated_on']} in {last_run['seconds']:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,89 +1,425 @@
+import math
+import sqlite3
 from flask import Blueprint, jsonify, request
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from database import with_database
-from extensions import cache
+from report_cache import cached_report, forecast_span, forecast_window, span_version
 
 # Import shared utilities
 try:
-    from utils import success_response
+    from utils import success_response, error_response
 except ImportError:
-    from ..utils import success_response
+    from ..utils import success_response, error_response
 
 try:
-    from date_range import to_midnight_timestamp
+    from sales_source import get_sales_source
 except ImportError:
-    from ..date_range import to_midnight_timestamp
+    from ..sales_source import get_sales_source
 
-forecasts_bp = Blueprint('forecasts', __name__)
+try:
+    from event_days import EVENT_LABELS, ForecastEvents, parse_event_types
+except ImportError:
+    from ..event_days import EVENT_LABELS, ForecastEvents, parse_event_types
 
+try:
+    from forecasts import seasonal_naive
+except ImportError:
+    from . import seasonal_naive
 
-# P1: Daily Sales Forecast (next 21 days)
-@forecasts_bp.route('/api/forecasts/daily', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
-@with_database
-def daily_forecast(cursor):
-    today = datetime.now().date()
+forecasts_bp = Blueprint('forecasts', __name__)
 
+# Each forecast covers the 21 days after today. The *_rows() functions below
+# compute it as flat per-day rows; forecast_job.py stores the same rows in
+# the forecast_* tables each day, and the endpoints read today's generation
+# from there while it is current (computing live otherwise). ?engine=numpy
+# computes the same rows with seasonal_naive.py instead, which also takes
+# a longer lookback and other averages. ?exclude=game_day[,holiday,closure]
+# plans the averages around the event calendar (see lookback_plan) and is
+# always computed live.
+FORECAST_DAYS = 21
+
+# How far back the weeks skipped for event days are replaced from
+EVENT_SKIP_WEEKS = 8
+
+# Today's generation of each materialized forecast, in *_rows() order
+DAILY_SQL = '''
+    SELECT forecast_date, forecasted_sales, basis_weeks
+    FROM forecast_daily WHERE generated_on = ? ORDER BY forecast_date
+'''
+HOURLY_SQL = '''
+    SELECT forecast_date, hour, avg_sales, basis_weeks
+    FROM forecast_hourly WHERE generated_on = ? ORDER BY forecast_date, hour
+'''
+ITEM_DAILY_SQL = '''
+    SELECT item_id, forecast_date, quantity, basis_weeks
+    FROM forecast_item_daily WHERE generated_on = ? ORDER BY item_id, forecast_date
+'''
+CATEGORY_DAILY_SQL = '''
+    SELECT category, forecast_date, quantity, basis_weeks
+    FROM forecast_category_daily WHERE generated_on = ? ORDER BY category, forecast_date
+'''
+
+
+def forecast_dates(today):
+    """The FORECAST_DAYS dates after today."""
+    return [today + timedelta(days=i) for i in range(1, FORECAST_DAYS + 1)]
+
+
+def historical_dates(forecast_date, today):
+    """The same weekday 1-4 weeks before forecast_date, where before today."""
+    return [
+        day for day in (forecast_date - timedelta(days=7 * weeks) for weeks in range(1, 5))
+        if day < today
+    ]
+
+
+def lookback_plan(today, events=None):
+    """
+    (forecast_date, history_days, event_type) for each forecast day.
+
+    By default each day averages its historical_dates(). With
+    ForecastEvents, event days in those are replaced by the same weekday
+    further back (up to EVENT_SKIP_WEEKS weeks); a forecast day that is
+    itself an event averages the recent days of its type instead, and a
+    closure forecasts nothing.
+    """
+    plan = []
+    for forecast_date in forecast_dates(today):
+        days = historical_dates(forecast_date, today)
+        event_type = events.by_date.get(forecast_date) if events else None
+        if event_type == 'closure':
+            days = []
+        elif event_type:
+            days = events.recent[event_type]
+        elif events:
+            earlier = (forecast_date - timedelta(days=7 * weeks) for weeks in range(1, EVENT_SKIP_WEEKS + 1))
+            days = [day for day in earlier if day < today and day not in events.by_date][:len(days)]
+        plan.append((forecast_date, days, event_type))
+    return plan
+
+
+def plan_filter(src, today, plan):
+    """
+    WHERE fragment and params covering every history day of plan.
+
+    The 28 days before today, plus single days before that (recent events
+    of a type, earlier weeks standing in for event days) as further range
+    searches.
+    """
+    window_start = today - timedelta(days=28)
+    window_where, params = src.date_filter(window_start, today - timedelta(days=1))
+    earlier = sorted({day for _, days, _ in plan for day in days if day < window_start})
+    if not earlier:
+        return window_where, params
+    fragments, params = [f'({window_where})'], list(params)
+    for day in earlier:
+        day_where, day_params = src.date_filter(day, day)
+        fragments.append(f'({day_where})')
+        params.extend(day_params)
+    return f"({' OR '.join(fragments)})", params
+
+
+def generation_is_current(cursor, today):
+    """
+    True when forecast_job.py stored today's generation and nothing the
+    forecasts read has been written since.
+
+    The job records the data version of forecast_window(today) with each
+    generation; a sync, backfill or catalog edit after it changes the
+    version. An untracked database (no data_versions) is never current.
+    """
+    try:
+        cursor.execute('SELECT data_version FROM forecast_generations WHERE generated_on = ?',
+                       (today.isoformat(),))
+    except sqlite3.OperationalError:  # no forecast tables in this database
+        return False
+    row = cursor.fetchone()
+    return (row is not None and row[0] is not None
+            and row[0] == span_version(cursor, forecast_window(today)))
+
+
+def materialized_rows(cursor, sql, today):
+    """
+    Today's generation from a forecast_* table as tuples, or None.
+
+    None when forecast_job.py hasn't stored a current generation today
+    (see generation_is_current), so the caller computes the forecast live
+    instead.
+    """
+    if not generation_is_current(cursor, today):
+        return None
+    cursor.execute(sql, (today.isoformat(),))
+    return [tuple(row) for row in cursor.fetchall()] or None
+
+
+def daily_sales_rows(cursor, today, plan=None):
+    """(forecast_date, forecasted_sales, basis_weeks) for each forecast day of plan (default lookback_plan)."""
     # Single query: Get ALL daily sales for the past 28 days
     # This replaces 84 separate queries (21 days × 4 historical dates)
-    query = '''
-        SELECT
-            DATE(transaction_date) as sale_date,
-            SUM(total_amount) as daily_sales
-        FROM transactions
-        WHERE transaction_date >= ?
-          AND transaction_date < ?
-        GROUP BY DATE(transaction_date)
-    '''
     # Window is the 28 days before today, excluding today (today's partial
     # day would skew the historical average) -- same window the previous
     # DATE(...) >= DATE(?, '-28 days') AND DATE(...) < ? predicate selected.
-    window_start = to_midnight_timestamp(today - timedelta(days=28))
-    window_end = to_midnight_timestamp(today)
-    cursor.execute(query, (window_start, window_end))
+    plan = plan or lookback_plan(today)
+    src = get_sales_source(cursor)
+    window_where, params = plan_filter(src, today, plan)
+    query = f'''
+        SELECT
+            {src.sale_date} as sale_date,
+            SUM({src.revenue}) / 100.0 as daily_sales
+        FROM {src.table}
+        WHERE {window_where}
+        GROUP BY sale_date
+    '''
+    cursor.execute(query, params)
 
     # Build a lookup dictionary: {date_string: sales_amount}
     sales_by_date = {row['sale_date']: row['daily_sales'] for row in cursor.fetchall()}
 
-    forecasts = []
+    rows = []
+    for forecast_date, history_days, _ in plan:
+        # Only include non-zero sales in the average
+        sales_points = [
+            sales for sales in (sales_by_date.get(day.isoformat(), 0) for day in history_days)
+            if sales > 0
+        ]
+
+        # Calculate the forecast based on the available, non-zero data points
+        forecasted_sales = sum(sales_points) / len(sales_points) if sales_points else 0
+        rows.append((forecast_date.isoformat(), forecasted_sales, len(sales_points)))
+    return rows
+
+
+def hourly_sales_rows(cursor, today, plan=None):
+    """(forecast_date, hour, avg_sales, basis_weeks) for hours 7-21 of each forecast day."""
+    # Single query: Get ALL hourly sales for the past 28 days
+    # This replaces 84 separate queries (21 days × 4 historical dates)
+    # Same 28-days-before-today, excluding-today window as daily_forecast.
+    plan = plan or lookback_plan(today)
+    src = get_sales_source(cursor)
+    window_where, params = plan_filter(src, today, plan)
+    query = f'''
+        SELECT
+            {src.sale_date} as sale_date,
+            {src.sale_hour} as hour,
+            SUM({src.revenue}) / 100.0 as sales
+        FROM {src.table}
+        WHERE {window_where}
+        GROUP BY sale_date, hour
+    '''
+    cursor.execute(query, params)
+
+    # Build a nested lookup dictionary: {date: {hour: sales}}
+    sales_by_date_hour = {}
+    for row in cursor.fetchall():
+        sales_by_date_hour.setdefault(row['sale_date'], {})[row['hour']] = row['sales']
+
+    rows = []
+    for forecast_date, history_days, _ in plan:
+        # Historical dates (same day of week) that had any sales
+        hourly_sales_data = [
+            sales_by_date_hour[day.isoformat()]
+            for day in history_days
+            if day.isoformat() in sales_by_date_hour
+        ]
 
-    # Generate a forecast for the next 21 days
-    for i in range(1, 22):
-        forecast_date = today + timedelta(days=i)
-        day_of_week = forecast_date.strftime('%A')
-
-        # Always attempt to look at the four previous corresponding weekdays
-        historical_dates = [
-            forecast_date - timedelta(days=7),
-            forecast_date - timedelta(days=14),
-            forecast_date - timedelta(days=21),
-            forecast_date - timedelta(days=28),
+        for hour in range(7, 22):
+            sales_points = [sales[hour] for sales in hourly_sales_data if sales.get(hour, 0) > 0]
+            avg_sales = sum(sales_points) / len(sales_points) if sales_points else 0
+            rows.append((forecast_date.isoformat(), hour, avg_sales, len(hourly_sales_data)))
+    return rows
+
+
+def demand_days(sales_by_date, plan):
+    """
+    (forecast_date, quantity, basis_weeks) for each forecast day of plan from {date: quantity}.
+
+    Each day is the rounded average of its history days (by default the
+    same weekday 1-4 weeks earlier) that had sales.
+    """
+    rows = []
+    for forecast_date, history_days, _ in plan:
+        quantities = [
+            qty for qty in (sales_by_date.get(day.isoformat()) for day in history_days)
+            if qty is not None
         ]
+        forecast_qty = round(sum(quantities) / len(quantities)) if quantities else 0
+        rows.append((forecast_date.isoformat(), forecast_qty, len(quantities)))
+    return rows
+
+
+def item_demand_rows(cursor, today, plan=None):
+    """(item_id, forecast_date, quantity, basis_weeks) for every menu item."""
+    # Single query: Get ALL item sales for the past 28 days
+    # This replaces 16,800 separate queries (200 items × 21 days × 4 historical dates)
+    # Same 28-days-before-today, excluding-today window as daily_forecast.
+    plan = plan or lookback_plan(today)
+    src = get_sales_source(cursor)
+    window_where, params = plan_filter(src, today, plan)
+    query = f'''
+        SELECT
+            item_id,
+            {src.sale_date} as sale_date,
+            SUM({src.units}) as total_qty
+        FROM {src.table}
+        WHERE {window_where}
+        GROUP BY item_id, sale_date
+    '''
+    cursor.execute(query, params)
 
-        sales_points = []
+    # Build a nested lookup dictionary: {item_id: {date: quantity}}
+    sales_by_item_date = {}
+    for row in cursor.fetchall():
+        sales_by_item_date.setdefault(row['item_id'], {})[row['sale_date']] = row['total_qty']
 
-        # Look up sales data from our pre-fetched dictionary
-        for historical_date in historical_dates:
-            if historical_date < today:
-                date_key = historical_date.isoformat()
-                sales = sales_by_date.get(date_key, 0)
+    cursor.execute('SELECT item_id FROM items ORDER BY item_id')
+    return [
+        (item_id, *day)
+        for (item_id,) in cursor.fetchall()
+        for day in demand_days(sales_by_item_date.get(item_id, {}), plan)
+    ]
 
-                # Only include non-zero sales in the average
-                if sales > 0:
-                    sales_points.append(sales)
 
-        # Calculate the forecast based on the available, non-zero data points
-        if not sales_points:
-            forecasted_sales = 0
-        else:
-            forecasted_sales = sum(sales_points) / len(sales_points)
+def category_demand_rows(cursor, today, plan=None):
+    """(category, forecast_date, quantity, basis_weeks) for every menu category."""
+    # Single query: Get ALL category sales for the past 28 days, by the
+    # item's menu category. This replaces up to 84 queries per category
+    # (21 days × 4 historical dates), each with the category's item ids.
+    # Same 28-days-before-today, excluding-today window as daily_forecast.
+    plan = plan or lookback_plan(today)
+    src = get_sales_source(cursor)
+    window_where, params = plan_filter(src, today, plan)
+    query = f'''
+        SELECT
+            i.category,
+            {src.sale_date} as sale_date,
+            SUM({src.units}) as total_qty
+        FROM {src.table} s
+        JOIN items i ON s.item_id = i.item_id
+        WHERE {window_where}
+        GROUP BY i.category, sale_date
+    '''
+    cursor.execute(query, params)
+
+    # Build a nested lookup dictionary: {category: {date: quantity}}
+    sales_by_category_date = {}
+    for row in cursor.fetchall():
+        sales_by_category_date.setdefault(row['category'], {})[row['sale_date']] = row['total_qty']
+
+    cursor.execute('SELECT DISTINCT category FROM items ORDER BY category')
+    return [
+        (category, *day)
+        for (category,) in cursor.fetchall()
+        for day in demand_days(sales_by_category_date.get(category, {}), plan)
+    ]
+
+
+def demand_by_key(rows):
+    """Group (key, forecast_date, quantity, basis_weeks) rows into {key: [(date, quantity, basis)]}."""
+    days = {}
+    for key, *day in rows:
+        days.setdefault(key, []).append(day)
+    return days
+
+
+def weekly_demand(days, today):
+    """
+    Group a key's forecast days into weeks.
+
+    Returns (weekly_forecast, total_forecast, is_new); is_new means no
+    history at all. A key without days (e.g. an item added since the
+    forecast was generated) forecasts 0 and is new.
+    """
+    days = days or [(day.isoformat(), 0, 0) for day in forecast_dates(today)]
+
+    # Group by week with date ranges
+    weekly_forecast = [
+        {
+            'week': week + 1,
+            'start_date': days[week * 7][0],
+            'end_date': days[week * 7 + 6][0],
+            'quantity': sum(quantity for _, quantity, _ in days[week * 7:week * 7 + 7])
+        }
+        for week in range(3)
+    ]
+
+    total_forecast = sum(w['quantity'] for w in weekly_forecast)
+    is_new = all(basis == 0 for _, _, basis in days)
+    return weekly_forecast, total_forecast, is_new
+
+
+def forecast_events(cursor, today, lookback):
+    """
+    ForecastEvents for the request's `exclude` types, or None without any.
+
+    Raises ValueError for an unknown type, or with engine=numpy.
+    """
+    types = parse_event_types(request.args.get('exclude'))
+    if not types:
+        return None
+    if lookback:
+        raise ValueError('exclude needs engine=python')
+    return ForecastEvents.load(cursor, types, today, 7 * EVENT_SKIP_WEEKS, FORECAST_DAYS)
+
 
+def day_event(events, forecast_date):
+    """{'event': type} for a forecast day that is an event, else {}."""
+    event_type = events.by_date.get(date.fromisoformat(forecast_date)) if events else None
+    return {'event': event_type} if event_type else {}
+
+
+def basis_label(basis_weeks, event=None):
+    """How a forecast day's average was formed."""
+    if event == 'closure':
+        return 'Closed'
+    if event:
+        return f'Avg of last {basis_weeks} {EVENT_LABELS[event]}'
+    return f'Avg of last {basis_weeks} valid weeks'
+
+
+def calculate_student_hours_range(sales, target_percent, wage):
+    """Calculate student hours range for scheduling"""
+    labor_budget = sales * (target_percent / 100)
+    exact_hours = labor_budget / wage
+
+    # Round to nearest 0.5
+    lower_bound = math.floor(exact_hours * 2) / 2  # Floor to 0.5
+    upper_bound = math.ceil(exact_hours * 2) / 2  # Ceil to 0.5
+
+    # If exact match to 0.5 boundary, return single value
+    if lower_bound == upper_bound:
+        return f"{exact_hours:.1f} hrs"
+
+    return f"{lower_bound:.1f}-{upper_bound:.1f} hrs"
+
+
+# P1: Daily Sales Forecast (next 21 days)
+@forecasts_bp.route('/api/forecasts/daily', methods=['GET'])
+@cached_report(timeout=43200, span=forecast_span)
+@with_database
+def daily_forecast(cursor):
+    today = datetime.now().date()
+    try:
+        lookback = seasonal_naive.parse_lookback(request.args)
+        events = forecast_events(cursor, today, lookback)
+    except ValueError as e:
+        return error_response(e, 400)
+    if lookback:
+        rows = seasonal_naive.daily_sales_rows(cursor, today, lookback)
+    elif events:
+        rows = daily_sales_rows(cursor, today, lookback_plan(today, events))
+    else:
+        rows = materialized_rows(cursor, DAILY_SQL, today) or daily_sales_rows(cursor, today)
+
+    forecasts = []
+    for forecast_date, forecasted_sales, basis_weeks in rows:
+        event = day_event(events, forecast_date)
         forecasts.append({
-            'date': forecast_date.isoformat(),
-            'day_of_week': day_of_week,
+            'date': forecast_date,
+            'day_of_week': date.fromisoformat(forecast_date).strftime('%A'),
             'forecasted_sales': round(forecasted_sales, 2),
-            'basis': f'Avg of last {len(sales_points)} valid weeks'
+            'basis': basis_label(basis_weeks, event.get('event')),
+            **event
         })
 
     return success_response(forecasts)
@@ -91,10 +427,15 @@ def daily_forecast(cursor):
 
 # P2: Hourly Sales Forecast (next 21 days)
 @forecasts_bp.route('/api/forecasts/hourly', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200, span=forecast_span)
 @with_database
 def hourly_forecast(cursor):
     today = datetime.now().date()
+    try:
+        lookback = seasonal_naive.parse_lookback(request.args)
+        events = forecast_events(cursor, today, lookback)
+    except ValueError as e:
+        return error_response(e, 400)
 
     # Get target labor percentage from query params (default 28%)
     target_pct = request.args.get('target_pct', 28, type=int)
@@ -106,107 +447,30 @@ def hourly_forecast(cursor):
     wage_row = cursor.fetchone()
     student_wage = float(wage_row['setting_value']) if wage_row else 24.19  # fallback to current rate
 
-    # Helper function to calculate student hours range
-    def calculate_student_hours_range(sales, target_percent, wage):
-        """Calculate student hours range for scheduling"""
-        import math
-
-        labor_budget = sales * (target_percent / 100)
-        exact_hours = labor_budget / wage
-
-        # Round to nearest 0.5
-        lower_bound = math.floor(exact_hours * 2) / 2  # Floor to 0.5
-        upper_bound = math.ceil(exact_hours * 2) / 2  # Ceil to 0.5
-
-        # If exact match to 0.5 boundary, return single value
-        if lower_bound == upper_bound:
-            return f"{exact_hours:.1f} hrs"
-
-        return f"{lower_bound:.1f}-{upper_bound:.1f} hrs"
-
-    # Single query: Get ALL hourly sales for the past 28 days
-    # This replaces 84 separate queries (21 days × 4 historical dates)
-    query = '''
-        SELECT
-            DATE(transaction_date) as sale_date,
-            strftime('%H', transaction_date) as hour_num,
-            SUM(total_amount) as sales
-        FROM transactions
-        WHERE transaction_date >= ?
-          AND transaction_date < ?
-        GROUP BY sale_date, hour_num
-    '''
-    # Same 28-days-before-today, excluding-today window as daily_forecast.
-    window_start = to_midnight_timestamp(today - timedelta(days=28))
-    window_end = to_midnight_timestamp(today)
-    cursor.execute(query, (window_start, window_end))
-
-    # Build a nested lookup dictionary: {date: {hour: sales}}
-    sales_by_date_hour = {}
-    for row in cursor.fetchall():
-        date_key = row['sale_date']
-        hour_key = row['hour_num']
-        sales = row['sales']
-
-        if date_key not in sales_by_date_hour:
-            sales_by_date_hour[date_key] = {}
-        sales_by_date_hour[date_key][hour_key] = sales
+    if lookback:
+        rows = seasonal_naive.hourly_sales_rows(cursor, today, lookback)
+    elif events:
+        rows = hourly_sales_rows(cursor, today, lookback_plan(today, events))
+    else:
+        rows = materialized_rows(cursor, HOURLY_SQL, today) or hourly_sales_rows(cursor, today)
 
+    # Staffing bands depend on the request's target and today's wage, so
+    # they're applied here rather than stored with the forecast
     all_forecasts = []
-
-    # Generate forecasts for the next 21 days
-    for day_offset in range(1, 22):
-        forecast_date = today + timedelta(days=day_offset)
-        day_of_week = forecast_date.strftime('%A')
-
-        # Historical dates for this forecast (same day of week)
-        historical_dates = [
-            forecast_date - timedelta(days=7),
-            forecast_date - timedelta(days=14),
-            forecast_date - timedelta(days=21),
-            forecast_date - timedelta(days=28),
-        ]
-
-        # Look up hourly sales data from our pre-fetched dictionary
-        hourly_sales_data = {}
-        for date in historical_dates:
-            if date < today:
-                date_key = date.isoformat()
-                if date_key in sales_by_date_hour:
-                    hourly_sales_data[date_key] = sales_by_date_hour[date_key]
-
-        # Calculate hourly forecasts for this day
-        hourly_forecasts = []
-        for hour in range(7, 22):
-            hour_str = f"{hour:02d}"
-            sales_points = []
-
-            # Collect sales from all historical dates for this hour
-            for date_key in hourly_sales_data:
-                sale = hourly_sales_data[date_key].get(hour_str, 0)
-                if sale > 0:
-                    sales_points.append(sale)
-
-            # Calculate average
-            if not sales_points:
-                avg_sales = 0
-            else:
-                avg_sales = sum(sales_points) / len(sales_points)
-
-            # Calculate student hours range for this forecast
-            student_hours = calculate_student_hours_range(avg_sales, target_pct, student_wage)
-
-            hourly_forecasts.append({
-                'hour': f"{hour_str}:00",
-                'avg_sales': round(avg_sales, 2),
-                'student_hours': student_hours
+    for forecast_date, hour, avg_sales, basis_weeks in rows:
+        if not all_forecasts or all_forecasts[-1]['date'] != forecast_date:
+            event = day_event(events, forecast_date)
+            all_forecasts.append({
+                'date': forecast_date,
+                'day_of_week': date.fromisoformat(forecast_date).strftime('%A'),
+                'hourly_data': [],
+                'basis': basis_label(basis_weeks, event.get('event')),
+                **event
             })
-
-        all_forecasts.append({
-            'date': forecast_date.isoformat(),
-            'day_of_week': day_of_week,
-            'hourly_data': hourly_forecasts,
-            'basis': f'Avg of last {len(hourly_sales_data)} valid weeks'
+        all_forecasts[-1]['hourly_data'].append({
+            'hour': f"{hour:02d}:00",
+            'avg_sales': round(avg_sales, 2),
+            'student_hours': calculate_student_hours_range(avg_sales, target_pct, student_wage)
         })
 
     return success_response(all_forecasts)
@@ -214,121 +478,36 @@ def hourly_forecast(cursor):
 
 # P3: Item Demand Forecast (next 21 days, grouped by week)
 @forecasts_bp.route('/api/forecasts/items', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200, span=forecast_span)
 @with_database
 def item_demand_forecast(cursor):
     today = datetime.now().date()
+    try:
+        lookback = seasonal_naive.parse_lookback(request.args)
+        events = forecast_events(cursor, today, lookback)
+    except ValueError as e:
+        return error_response(e, 400)
+    if lookback:
+        rows = seasonal_naive.item_demand_rows(cursor, today, lookback)
+    elif events:
+        rows = item_demand_rows(cursor, today, lookback_plan(today, events))
+    else:
+        rows = materialized_rows(cursor, ITEM_DAILY_SQL, today) or item_demand_rows(cursor, today)
+    days_by_item = demand_by_key(rows)
 
     # Get all items from the menu
     cursor.execute('SELECT item_id, item_name, category FROM items ORDER BY item_name')
-    items = cursor.fetchall()
-
-    # Single query: Get ALL item sales for the past 28 days
-    # This replaces 16,800 separate queries (200 items × 21 days × 4 historical dates)
-    query = '''
-        SELECT
-            item_id,
-            DATE(transaction_date) as sale_date,
-            SUM(quantity) as total_qty
-        FROM transactions
-        WHERE transaction_date >= ?
-          AND transaction_date < ?
-        GROUP BY item_id, DATE(transaction_date)
-    '''
-    # Same 28-days-before-today, excluding-today window as daily_forecast.
-    window_start = to_midnight_timestamp(today - timedelta(days=28))
-    window_end = to_midnight_timestamp(today)
-    cursor.execute(query, (window_start, window_end))
-
-    # Build a nested lookup dictionary: {item_id: {date: quantity}}
-    sales_by_item_date = {}
-    for row in cursor.fetchall():
-        item_id = row['item_id']
-        date_key = row['sale_date']
-        qty = row['total_qty']
-
-        if item_id not in sales_by_item_date:
-            sales_by_item_date[item_id] = {}
-        sales_by_item_date[item_id][date_key] = qty
 
     all_forecasts = []
-
-    for item in items:
-        item_id = item['item_id']
-        item_name = item['item_name']
-        category = item['category']
-
-        daily_forecasts = []
-        is_new_item = True  # Assume new until we find historical data
-
-        # Get this item's historical sales (if any)
-        item_sales = sales_by_item_date.get(item_id, {})
-
-        # Generate forecasts for the next 21 days
-        for day_offset in range(1, 22):
-            forecast_date = today + timedelta(days=day_offset)
-            day_of_week = forecast_date.strftime('%A')
-
-            # Historical dates for this forecast (same day of week)
-            historical_dates = [
-                forecast_date - timedelta(days=7),
-                forecast_date - timedelta(days=14),
-                forecast_date - timedelta(days=21),
-                forecast_date - timedelta(days=28),
-            ]
-
-            # Look up quantities from our pre-fetched dictionary
-            quantities = []
-            for date in historical_dates:
-                if date < today:
-                    date_key = date.isoformat()
-                    qty = item_sales.get(date_key)
-
-                    if qty is not None:
-                        quantities.append(qty)
-                        is_new_item = False  # Found historical data
-
-            # Calculate forecast
-            if len(quantities) > 0:
-                avg_quantity = sum(quantities) / len(quantities)
-                forecast_qty = round(avg_quantity)  # Round to whole number
-            else:
-                forecast_qty = 0
-
-            daily_forecasts.append({
-                'date': forecast_date.isoformat(),
-                'day_of_week': day_of_week,
-                'quantity': forecast_qty
-            })
-
-        # Group by week with date ranges
-        weekly_forecast = [
-            {
-                'week': 1,
-                'start_date': daily_forecasts[0]['date'],
-                'end_date': daily_forecasts[6]['date'],
-                'quantity': sum(d['quantity'] for d in daily_forecasts[0:7])
-            },
-            {
-                'week': 2,
-                'start_date': daily_forecasts[7]['date'],
-                'end_date': daily_forecasts[13]['date'],
-                'quantity': sum(d['quantity'] for d in daily_forecasts[7:14])
-            },
-            {
-                'week': 3,
-                'start_date': daily_forecasts[14]['date'],
-                'end_date': daily_forecasts[20]['date'],
-                'quantity': sum(d['quantity'] for d in daily_forecasts[14:21])
-            }
-        ]
-
-        total_forecast = sum(w['quantity'] for w in weekly_forecast)
+    for item in cursor.fetchall():
+        weekly_forecast, total_forecast, is_new_item = weekly_demand(
+            days_by_item.get(item['item_id']), today
+        )
 
         all_forecasts.append({
-            'item_id': item_id,
-            'item_name': item_name,
-            'category': category,
+            'item_id': item['item_id'],
+            'item_name': item['item_name'],
+            'category': item['category'],
             'is_new': is_new_item,
             'weekly_forecast': weekly_forecast,
             'total_forecast': total_forecast
@@ -337,108 +516,39 @@ def item_demand_forecast(cursor):
     # Sort by total forecast descending
     all_forecasts.sort(key=lambda x: x['total_forecast'], reverse=True)
 
-    return {
-        'success': True,
-        'data': all_forecasts
-    }
+    return success_response(all_forecasts)
 
 
 # P4: Category Demand Forecast (next 21 days, grouped by week)
 @forecasts_bp.route('/api/forecasts/categories', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200, span=forecast_span)
 @with_database
 def category_demand_forecast(cursor):
     today = datetime.now().date()
+    try:
+        lookback = seasonal_naive.parse_lookback(request.args)
+        events = forecast_events(cursor, today, lookback)
+    except ValueError as e:
+        return error_response(e, 400)
+    if lookback:
+        rows = seasonal_naive.category_demand_rows(cursor, today, lookback)
+    elif events:
+        rows = category_demand_rows(cursor, today, lookback_plan(today, events))
+    else:
+        rows = materialized_rows(cursor, CATEGORY_DAILY_SQL, today) or category_demand_rows(cursor, today)
+    days_by_category = demand_by_key(rows)
 
     # Get all unique categories
     cursor.execute('SELECT DISTINCT category FROM items ORDER BY category')
-    categories = [row['category'] for row in cursor.fetchall()]
 
     all_forecasts = []
-
-    for category in categories:
-        # Get all items in this category
-        cursor.execute('SELECT item_id FROM items WHERE category = ?', (category,))
-        item_ids = [row['item_id'] for row in cursor.fetchall()]
-
-        if not item_ids:
-            continue
-
-        daily_forecasts = []
-        is_new_category = True
-
-        # Generate forecasts for the next 21 days
-        for day_offset in range(1, 22):
-            forecast_date = today + timedelta(days=day_offset)
-            day_of_week = forecast_date.strftime('%A')
-
-            # Historical dates
-            historical_dates = [
-                forecast_date - timedelta(days=7),
-                forecast_date - timedelta(days=14),
-                forecast_date - timedelta(days=21),
-                forecast_date - timedelta(days=28),
-            ]
-
-            # Fetch total quantities for all items in category
-            quantities = []
-            for date in historical_dates:
-                if date < today:
-                    placeholders = ','.join('?' * len(item_ids))
-                    query = f'''
-                        SELECT SUM(quantity) as total_qty
-                        FROM transactions
-                        WHERE item_id IN ({placeholders})
-                        AND transaction_date >= ? AND transaction_date < ?
-                    '''
-                    day_start = to_midnight_timestamp(date)
-                    day_end = to_midnight_timestamp(date + timedelta(days=1))
-                    cursor.execute(query, (*item_ids, day_start, day_end))
-                    result = cursor.fetchone()
-
-                    if result['total_qty'] is not None:
-                        quantities.append(result['total_qty'])
-                        is_new_category = False
-
-            # Calculate forecast
-            if len(quantities) > 0:
-                avg_quantity = sum(quantities) / len(quantities)
-                forecast_qty = round(avg_quantity)
-            else:
-                forecast_qty = 0
-
-            daily_forecasts.append({
-                'date': forecast_date.isoformat(),
-                'day_of_week': day_of_week,
-                'quantity': forecast_qty
-            })
-
-        # Group by week with date ranges
-        weekly_forecast = [
-            {
-                'week': 1,
-                'start_date': daily_forecasts[0]['date'],
-                'end_date': daily_forecasts[6]['date'],
-                'quantity': sum(d['quantity'] for d in daily_forecasts[0:7])
-            },
-            {
-                'week': 2,
-                'start_date': daily_forecasts[7]['date'],
-                'end_date': daily_forecasts[13]['date'],
-                'quantity': sum(d['quantity'] for d in daily_forecasts[7:14])
-            },
-            {
-                'week': 3,
-                'start_date': daily_forecasts[14]['date'],
-                'end_date': daily_forecasts[20]['date'],
-                'quantity': sum(d['quantity'] for d in daily_forecasts[14:21])
-            }
-        ]
-
-        total_forecast = sum(w['quantity'] for w in weekly_forecast)
+    for row in cursor.fetchall():
+        weekly_forecast, total_forecast, is_new_category = weekly_demand(
+            days_by_category.get(row['category']), today
+        )
 
         all_forecasts.append({
-            'category': category,
+            'category': row['category'],
             'is_new': is_new_category,
             'weekly_forecast': weekly_forecast,
             'total_forecast': total_forecast
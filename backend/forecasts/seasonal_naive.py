@@ -0,0 +1,295 @@
+"""
+Vectorized seasonal-naive forecasts (`?engine=numpy` on /api/forecasts/*).
+
+The default engine (forecasts.py) averages the same weekday 1-4 weeks
+back with Python loops and dict lookups per item and day. This engine
+loads the sales history once as matrices:
+
+    units     items × days   units sold per item and day
+    cents     24 × days      revenue per hour of day and day
+
+covering the MAX_WEEKS weeks before today, and forecasts every item,
+category, day and hour with array operations: the same weekday of each
+lookback week is gathered for all 21 forecast days at once, giving a
+keys × 21 × weeks block that is averaged along its last axis.
+
+Because the matrices always span MAX_WEEKS, a 52-week lookback costs the
+same as a 4-week one. The loaded history is kept per data version (see
+report_cache.current_data_version), so requests with other lookbacks or
+methods reuse it until a sync writes to those days.
+
+Lookback options (query params, engine=numpy only):
+    weeks=4          same-weekday weeks averaged, MIN_WEEKS-MAX_WEEKS
+    method=mean      mean | weighted | trimmed
+    half_life=4      weighted: weeks until a week's weight halves
+    trim=0.1         trimmed: fraction of weeks dropped at each end
+
+With the defaults the forecasts match the Python engine's.
+"""
+
+import threading
+from datetime import timedelta
+
+import numpy as np
+
+from report_cache import current_data_version
+
+try:
+    from sales_source import get_sales_source
+except ImportError:
+    from ..sales_source import get_sales_source
+
+ENGINES = ('python', 'numpy')
+METHODS = ('mean', 'weighted', 'trimmed')
+MIN_WEEKS, MAX_WEEKS = 4, 52
+HISTORY_DAYS = 7 * MAX_WEEKS
+FORECAST_DAYS = 21
+HOURS = range(7, 22)
+
+# Only the numpy engine takes these
+LOOKBACK_PARAMS = ('weeks', 'method', 'half_life', 'trim')
+
+
+class Lookback:
+    """How the weeks before a forecast day are combined."""
+
+    def __init__(self, weeks=MIN_WEEKS, method='mean', half_life=4.0, trim=0.1):
+        self.weeks = weeks
+        self.method = method
+        self.half_life = half_life
+        self.trim = trim
+
+
+def parse_lookback(args):
+    """
+    The Lookback a forecast request asks for, or None for the Python engine.
+
+    Raises ValueError for an unknown engine, out-of-range options, or
+    lookback options without engine=numpy.
+    """
+    engine = args.get('engine', 'python')
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of: {', '.join(ENGINES)}")
+    if engine == 'python':
+        if any(name in args for name in LOOKBACK_PARAMS):
+            raise ValueError(f"{', '.join(LOOKBACK_PARAMS)} need engine=numpy")
+        return None
+
+    try:
+        weeks = int(args.get('weeks', MIN_WEEKS))
+        half_life = float(args.get('half_life', 4))
+        trim = float(args.get('trim', 0.1))
+    except ValueError:
+        raise ValueError('weeks, half_life and trim must be numbers')
+    method = args.get('method', 'mean')
+    if not MIN_WEEKS <= weeks <= MAX_WEEKS:
+        raise ValueError(f'weeks must be between {MIN_WEEKS} and {MAX_WEEKS}')
+    if method not in METHODS:
+        raise ValueError(f"method must be one of: {', '.join(METHODS)}")
+    if not half_life > 0:
+        raise ValueError('half_life must be positive')
+    if not 0 <= trim < 0.5:
+        raise ValueError('trim must be at least 0 and less than 0.5')
+    return Lookback(weeks, method, half_life, trim)
+
+
+class SalesHistory:
+    """Sales for the HISTORY_DAYS before `today` as dense matrices (column 0 is the oldest day)."""
+
+    def __init__(self, today, item_ids, units, item_sold, cents, day_sold):
+        self.today = today
+        self.item_ids = item_ids    # items.item_id, one per row of units
+        self.units = units          # float64 items × days
+        self.item_sold = item_sold  # bool items × days: the item had a sales row that day
+        self.cents = cents          # float64 24 × days
+        self.day_sold = day_sold    # bool days: any sales row that day
+
+    @classmethod
+    def load(cls, cursor, today):
+        """Two grouped queries over the history window: units by item and day, revenue by hour and day."""
+        first = today - timedelta(days=HISTORY_DAYS)
+        src = get_sales_source(cursor)
+        window_where, params = src.date_filter(first, today - timedelta(days=1))
+
+        plain = cursor.connection.cursor()
+        plain.row_factory = None  # plain tuples straight into arrays
+        try:
+            plain.execute('SELECT item_id FROM items ORDER BY item_id')
+            item_ids = np.array([row[0] for row in plain.fetchall()], dtype=np.int64)
+
+            plain.execute(f'''
+                SELECT item_id, julianday({src.sale_date}) AS day, SUM({src.units})
+                FROM {src.table}
+                WHERE {window_where}
+                GROUP BY item_id, {src.sale_date}
+            ''', params)
+            item_rows = np.array(plain.fetchall(), dtype=np.float64).reshape(-1, 3)
+
+            plain.execute(f'''
+                SELECT {src.sale_hour} AS hour, julianday({src.sale_date}) AS day, SUM({src.revenue})
+                FROM {src.table}
+                WHERE {window_where}
+                GROUP BY {src.sale_date}, hour
+            ''', params)
+            hour_rows = np.array(plain.fetchall(), dtype=np.float64).reshape(-1, 3)
+        finally:
+            plain.close()
+
+        first_day = _julian_day(first)
+        units = np.zeros((len(item_ids), HISTORY_DAYS))
+        item_sold = np.zeros((len(item_ids), HISTORY_DAYS), dtype=bool)
+        # Sales of ids no longer in items are dropped, like the Python engine
+        rows = np.searchsorted(item_ids, item_rows[:, 0])
+        known = rows < len(item_ids)
+        known[known] = item_ids[rows[known]] == item_rows[known, 0]
+        columns = (item_rows[known, 1] - first_day).astype(np.int64)
+        units[rows[known], columns] = item_rows[known, 2]
+        item_sold[rows[known], columns] = True
+
+        cents = np.zeros((24, HISTORY_DAYS))
+        day_sold = np.zeros(HISTORY_DAYS, dtype=bool)
+        columns = (hour_rows[:, 1] - first_day).astype(np.int64)
+        cents[hour_rows[:, 0].astype(np.int64), columns] = hour_rows[:, 2]
+        day_sold[columns] = True
+
+        return cls(today, item_ids, units, item_sold, cents, day_sold)
+
+    def category_units(self, category_by_item):
+        """
+        (categories, units, sold) with the item rows summed per category.
+
+        category_by_item is {item_id: category} from the current menu, so
+        items that changed category count toward the new one.
+        """
+        item_categories = [category_by_item.get(item_id) for item_id in self.item_ids.tolist()]
+        on_menu = np.array([category is not None for category in item_categories], dtype=bool)
+        categories, rows = np.unique(
+            np.array([c for c in item_categories if c is not None], dtype=object), return_inverse=True
+        )
+        units = np.zeros((len(categories), HISTORY_DAYS))
+        sold = np.zeros((len(categories), HISTORY_DAYS))
+        np.add.at(units, rows, self.units[on_menu])
+        np.add.at(sold, rows, self.item_sold[on_menu])
+        return categories.tolist(), units, sold > 0
+
+
+def _julian_day(day):
+    # SQLite's julianday() of a date at midnight
+    return day.toordinal() + 1721424.5
+
+
+_lock = threading.Lock()
+_history = {}
+
+
+def sales_history(cursor, today):
+    """The SalesHistory for today, reused while the data version of its window is unchanged."""
+    version = current_data_version((today - timedelta(days=HISTORY_DAYS), today), cursor)
+    key = (today, version)
+    with _lock:
+        if version is not None and _history.get('key') == key:
+            return _history['history']
+    history = SalesHistory.load(cursor, today)
+    with _lock:
+        _history.update(key=key, history=history)
+    return history
+
+
+def lookback_columns(weeks):
+    """
+    History columns of the same weekday 1..weeks weeks before each forecast day.
+
+    Returns (columns, valid), both FORECAST_DAYS × weeks; valid is False
+    for dates on or after today (not yet history), whose column is clamped.
+    """
+    offsets = np.arange(1, FORECAST_DAYS + 1)[:, None] - 7 * np.arange(1, weeks + 1)[None, :]
+    valid = offsets < 0
+    return HISTORY_DAYS + np.minimum(offsets, -1), valid
+
+
+def combine(values, observed, lookback):
+    """
+    Average `values` over the observed weeks along the last axis.
+
+    values and observed are ... × weeks with the most recent week first;
+    cells with nothing observed are 0.
+    """
+    counts = observed.sum(axis=-1)
+    if lookback.method == 'trimmed':
+        ordered = np.sort(np.where(observed, values, np.nan), axis=-1)  # NaNs sort last
+        sums = np.concatenate(
+            [np.zeros(ordered.shape[:-1] + (1,)), np.nancumsum(ordered, axis=-1)], axis=-1
+        )
+        drop = np.floor(counts * lookback.trim).astype(np.int64)
+        keep_end = (counts - drop)[..., None]
+        total = (np.take_along_axis(sums, keep_end, -1)
+                 - np.take_along_axis(sums, drop[..., None], -1))[..., 0]
+        kept = counts - 2 * drop
+        return np.divide(total, kept, out=np.zeros(total.shape), where=kept > 0)
+
+    if lookback.method == 'weighted':
+        weights = 0.5 ** (np.arange(values.shape[-1]) / lookback.half_life)
+    else:
+        weights = np.ones(values.shape[-1])
+    weights = np.where(observed, weights, 0.0)
+    total = (values * weights).sum(axis=-1)
+    weight = weights.sum(axis=-1)
+    return np.divide(total, weight, out=np.zeros(total.shape), where=counts > 0)
+
+
+def _forecast_dates(today):
+    return [(today + timedelta(days=i)).isoformat() for i in range(1, FORECAST_DAYS + 1)]
+
+
+def _demand_rows(keys, units, sold, today, lookback):
+    columns, valid = lookback_columns(lookback.weeks)
+    observed = sold[:, columns] & valid
+    quantities = np.rint(combine(units[:, columns], observed, lookback)).astype(np.int64)
+    basis = observed.sum(axis=-1)
+    dates = _forecast_dates(today)
+    return [
+        (key, dates[day], quantity, weeks)
+        for key, key_quantities, key_basis in zip(keys, quantities.tolist(), basis.tolist())
+        for day, (quantity, weeks) in enumerate(zip(key_quantities, key_basis))
+    ]
+
+
+def daily_sales_rows(cursor, today, lookback):
+    """(forecast_date, forecasted_sales, basis_weeks), as forecasts.daily_sales_rows."""
+    history = sales_history(cursor, today)
+    columns, valid = lookback_columns(lookback.weeks)
+    daily = history.cents.sum(axis=0)[columns]
+    observed = (daily > 0) & valid  # only days with sales count
+    sales = combine(daily, observed, lookback) / 100
+    return list(zip(_forecast_dates(today), sales.tolist(), observed.sum(axis=-1).tolist()))
+
+
+def hourly_sales_rows(cursor, today, lookback):
+    """(forecast_date, hour, avg_sales, basis_weeks), as forecasts.hourly_sales_rows."""
+    history = sales_history(cursor, today)
+    columns, valid = lookback_columns(lookback.weeks)
+    # basis counts the weeks with any sales; each hour averages its non-zero weeks
+    basis = (history.day_sold[columns] & valid).sum(axis=-1).tolist()
+    hourly = history.cents[HOURS.start:HOURS.stop][:, columns]
+    sales = (combine(hourly, (hourly > 0) & valid, lookback) / 100).T.tolist()
+    return [
+        (forecast_date, hour, avg_sales, basis[day])
+        for day, forecast_date in enumerate(_forecast_dates(today))
+        for hour, avg_sales in zip(HOURS, sales[day])
+    ]
+
+
+def item_demand_rows(cursor, today, lookback):
+    """(item_id, forecast_date, quantity, basis_weeks), as forecasts.item_demand_rows."""
+    history = sales_history(cursor, today)
+    return _demand_rows(history.item_ids.tolist(), history.units, history.item_sold, today, lookback)
+
+
+def category_demand_rows(cursor, today, lookback):
+    """(category, forecast_date, quantity, basis_weeks), as forecasts.category_demand_rows."""
+    history = sales_history(cursor, today)
+    cursor.execute('SELECT item_id, category FROM items')
+    categories, units, sold = history.category_units(
+        {row['item_id']: row['category'] for row in cursor.fetchall()}
+    )
+    return _demand_rows(categories, units, sold, today, lookback)
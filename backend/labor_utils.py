@@ -22,6 +22,11 @@ Example Problem:
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
+try:
+    from date_range import exclusion_filter
+except ImportError:
+    from .date_range import exclusion_filter
+
 
 def prorate_shift_hours(
         shift_start: datetime,
@@ -170,13 +175,13 @@ def calculate_hourly_labor_costs(
     salaried_rate = settings.get('salaried_labor_rate', 30.00)  # Default $30 if not set
 
     # Build WHERE clause with optional date exclusion
-    base_where = 'WHERE shift_date BETWEEN ? AND ?'
-    params = [start_date, end_date]
-
-    if exclude_dates:
-        placeholders = ','.join('?' * len(exclude_dates))
-        base_where += f' AND shift_date NOT IN ({placeholders})'
-        params.extend(exclude_dates)
+    date_where, params = exclusion_filter(
+        start_date, end_date, exclude_dates,
+        'shift_date >= ? AND shift_date <= ?',
+        lambda first, last: (first.isoformat(), last.isoformat()),
+        'shift_date',
+    )
+    base_where = f'WHERE {date_where}'
 
     # Build query with optional employee type filter
     if include_salaried:
@@ -256,6 +261,84 @@ def calculate_hourly_labor_costs(
     return hourly_breakdown
 
 
+def hourly_only_breakdown(labor_breakdown: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    Derive the include_salaried=False view from an all-staff breakdown.
+
+    student_cost accumulates the same hourly-employee costs, in the same
+    order, that calculate_hourly_labor_costs(..., include_salaried=False)
+    sums into total_cost, so callers that need both views can run the
+    shift proration once.
+    """
+    return {
+        hour: {
+            'total_cost': breakdown['student_cost'],
+            'salaried_hours': 0,
+            'salaried_cost': 0,
+            'student_hours': breakdown['student_hours'],
+            'student_cost': breakdown['student_cost']
+        }
+        for hour, breakdown in labor_breakdown.items()
+        if breakdown['student_hours']
+    }
+
+
+def build_labor_percent_rows(
+        sales_by_hour: Dict[str, float],
+        labor_breakdown: Dict[str, Dict[str, float]]
+) -> List[Dict[str, Any]]:
+    """
+    Combine hourly sales and labor costs into labor-percent report rows.
+
+    Args:
+        sales_by_hour: {'YYYY-MM-DD HH:00:00': sales}
+        labor_breakdown: Output of calculate_hourly_labor_costs()
+
+    Returns:
+        Rows sorted by hour, skipping hours with neither sales nor labor.
+        Labor with no sales is reported as 100% (capped, not infinity).
+    """
+    # Get all hours that have either sales or labor
+    all_hours = set(sales_by_hour.keys()) | set(labor_breakdown.keys())
+
+    rows = []
+    for hour in sorted(all_hours):
+        sales = sales_by_hour.get(hour, 0)
+        breakdown = labor_breakdown.get(hour, {
+            'total_cost': 0,
+            'salaried_hours': 0,
+            'salaried_cost': 0,
+            'student_hours': 0,
+            'student_cost': 0
+        })
+
+        labor_cost = breakdown['total_cost']
+
+        # Skip hours with no activity (no sales and no labor)
+        if sales == 0 and labor_cost == 0:
+            continue
+
+        # Calculate labor percentage with zero sales edge case handling
+        if sales == 0:
+            labor_pct = 100  # Labor but no sales = 100% (capped, not infinity)
+        else:
+            labor_pct = round(labor_cost / sales * 100, 2)
+
+        rows.append({
+            'hour': hour,
+            'sales': sales,
+            'labor_cost': round(labor_cost, 2),
+            'labor_pct': labor_pct,
+            # Breakdown for tooltip
+            'salaried_hours': round(breakdown['salaried_hours'], 2),
+            'salaried_cost': round(breakdown['salaried_cost'], 2),
+            'student_hours': round(breakdown['student_hours'], 2),
+            'student_cost': round(breakdown['student_cost'], 2)
+        })
+
+    return rows
+
+
 def get_shift_summary(shift_start: datetime, shift_end: datetime, hourly_rate: float) -> Dict[str, Any]:
     """
     Get a human-readable summary of a shift and its proration.
@@ -0,0 +1,326 @@
+"""
+Versioned response cache for report endpoints.
+
+Report responses are cached per process in `extensions.cache`. Instead of
+wiping that cache whenever new data lands, every key includes:
+
+- the identity of the database file (so deploying a new file misses), and
+- the data version of the dates the request covers: triggers installed by
+  database/data_version.py stamp each day written (and a global scope for
+  items, costs and settings), and the key takes the latest stamp over the
+  report's span.
+
+A sync therefore invalidates, in every worker, exactly the entries whose
+span includes a day it wrote (plus everything, when the catalog changes);
+nothing needs to call `cache.clear()`. Forecasts cover their 28-day
+lookback, so a sync of yesterday refreshes them too.
+
+Because stale keys can never be hit again, how long an entry lives only
+matters for responses that depend on today's date. Requests whose range
+ends before today are "historical" and kept for HISTORICAL_TIMEOUT.
+Everything else (no end date, end date today or later, forecasts) is
+"live": its key also includes today's date, so default ranges roll over at
+midnight, and it keeps the endpoint's normal timeout.
+
+The key also serves as the response's ETag. Responses are sent with
+`Cache-Control: no-cache`, so browsers keep them but revalidate each time;
+a request whose If-None-Match still matches gets a 304 after the version
+lookup, before the view (or its SQL) runs and without resending the body.
+
+Entries hold the body already compressed for each supported encoding (see
+response_encoding.py), so a hit skips serialization and compression.
+
+Every cached report also answers `?format=csv` with its result as CSV
+(row_export.report_csv), and `?layout=columnar` with its rows as one list
+per column (utils.success_response). Both are part of the query, so each
+variant is cached separately.
+
+Usage:
+    @items_bp.route('/api/reports/items-by-revenue', methods=['GET'])
+    @cached_report(timeout=43200)
+    @with_database
+    def items_by_revenue(cursor):
+        ...
+
+    @cached_report(timeout=43200, span=forecast_span)   # custom date span
+    @cached_report(timeout=43200, span=catalog_span)    # undated data only
+"""
+
+import hashlib
+import sqlite3
+from datetime import date, timedelta
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, make_response, request
+
+from database import db_file_id, pool
+from extensions import cache
+
+try:
+    from date_range import parse_exclude_dates, parse_report_date
+    from event_days import EVENT_HISTORY_DAYS, parse_event_types
+    from response_encoding import ETAG_SUFFIXES, IDENTITY, encode_variants, negotiate_encoding
+    from row_export import attachment, report_csv
+    from utils import LAYOUTS, error_response, get_default_date_range
+except ImportError:
+    from .date_range import parse_exclude_dates, parse_report_date
+    from .event_days import EVENT_HISTORY_DAYS, parse_event_types
+    from .response_encoding import ETAG_SUFFIXES, IDENTITY, encode_variants, negotiate_encoding
+    from .row_export import attachment, report_csv
+    from .utils import LAYOUTS, error_response, get_default_date_range
+
+# Historical entries can't go stale, but SimpleCache evicts the entries
+# closest to expiry first when it is over threshold, so give them a long
+# finite lifetime rather than 0 (which it would evict first).
+HISTORICAL_TIMEOUT = 30 * 86400
+
+REPORT_FORMATS = ('json', 'csv')
+
+# Latest stamp of the global scope and of any day in [start, end]. Day
+# scopes sort as 'day:YYYY-MM-DD', so the span is a primary-key range.
+SPAN_VERSION_SQL = """
+    SELECT MAX(
+        (SELECT version FROM data_versions WHERE scope = 'global'),
+        COALESCE((SELECT MAX(version) FROM data_versions
+                  WHERE scope >= ? AND scope <= ?), 0)
+    )
+"""
+ANY_VERSION_SQL = "SELECT version FROM data_versions WHERE scope = 'sequence'"
+CATALOG_VERSION_SQL = "SELECT version FROM data_versions WHERE scope = 'global'"
+
+# Span for views that read only undated data (items, costs, settings)
+CATALOG = 'catalog'
+
+
+def request_span():
+    """
+    Dates a report request reads, as a (start, end) pair of dates.
+
+    Mirrors the report views: `date` (single-day mode) or `start`/`end`,
+    defaulting to the same 90-day window. None when a date is invalid.
+    """
+    args = request.args
+    try:
+        if args.get('date'):
+            day = parse_report_date(args['date'])
+            return day, day
+        default_start, default_end = get_default_date_range()
+        return (parse_report_date(args.get('start', default_start)),
+                parse_report_date(args.get('end', default_end)))
+    except ValueError:
+        return None
+
+
+def forecast_span():
+    """
+    Forecasts average the `weeks` (default 4, at most 52) weeks before
+    today and cover the 21 days after it, where calendar events can be
+    scheduled. With `exclude`, event days are forecast from earlier events
+    of their type, up to EVENT_HISTORY_DAYS back.
+    """
+    weeks = request.args.get('weeks', 4, type=int)
+    days = 7 * (weeks if 4 <= weeks <= 52 else 4)
+    if request.args.get('exclude'):
+        days = max(days, EVENT_HISTORY_DAYS)
+    return forecast_window(date.today(), days)
+
+
+def forecast_window(today, history_days=28):
+    """The history_days before today through the 21 days after it."""
+    return today - timedelta(days=history_days), today + timedelta(days=21)
+
+
+def catalog_span():
+    """The view reads no dated rows; only catalog writes invalidate it."""
+    return CATALOG
+
+
+def span_version(cursor, span=None):
+    """
+    The latest data_versions stamp a span depends on, read through cursor
+    (a cursor or connection). None when the database has no
+    data_versions table yet.
+    """
+    try:
+        if span is None:
+            row = cursor.execute(ANY_VERSION_SQL).fetchone()
+        elif span == CATALOG:
+            row = cursor.execute(CATALOG_VERSION_SQL).fetchone()
+        else:
+            start, end = span
+            row = cursor.execute(
+                SPAN_VERSION_SQL, (f"day:{start.isoformat()}", f"day:{end.isoformat()}")
+            ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return None if row is None else row[0]
+
+
+def current_data_version(span=None, cursor=None):
+    """
+    Return a token identifying the database contents a span depends on.
+
+    With span=None, any write changes the token; with CATALOG, only writes
+    to the global (undated) scope do. Returns None when the
+    database has no data_versions table yet; callers then fall back to
+    time-based expiry only.
+
+    Reads through `cursor` when given, so a view asking from inside
+    with_database doesn't hold a second pool connection; otherwise
+    checks one out.
+    """
+    if cursor is not None:
+        version = span_version(cursor, span)
+    else:
+        try:
+            with pool.connection() as conn:
+                version = span_version(conn, span)
+        except sqlite3.OperationalError:
+            return None
+    if version is None:
+        return None
+    file_id = db_file_id() or ('', '')
+    return f"{file_id[0]}-{file_id[1]}-{version}"
+
+
+def is_historical(span, today=None):
+    """True when the span ends before today (or reads no dated rows)."""
+    if span == CATALOG:
+        return True
+    return span is not None and span[1] < (today or date.today())
+
+
+def _canonical_args(args, span):
+    """
+    Query args as sorted pairs, with exclude_dates and exclude in canonical form.
+
+    Excluded days are sorted, de-duplicated and clipped to the span, so
+    lists that select the same days share an entry; `exclude` event types
+    are sorted and de-duplicated. An invalid list is left as sent; the
+    view reports the error.
+    """
+    pairs = []
+    for name, value in args.items(multi=True):
+        if name == 'exclude':
+            try:
+                value = ','.join(parse_event_types(value))
+            except ValueError:
+                pass
+        elif name == 'exclude_dates':
+            try:
+                days = parse_exclude_dates(value)
+            except ValueError:
+                pass
+            else:
+                if isinstance(span, tuple):
+                    days = [d for d in days if span[0] <= d <= span[1]]
+                value = ','.join(d.isoformat() for d in days)
+        pairs.append((name, value))
+    return sorted(pairs)
+
+
+def report_cache_key(path, args, version, historical, today=None, span=None):
+    """Build a cache key from the path, normalized query args and version."""
+    query = urlencode(_canonical_args(args, span))
+    key = f"report:{path}?{query}|v={version}"
+    if not historical:
+        key += f"|day={(today or date.today()).isoformat()}"
+    return key
+
+
+def report_etag(key):
+    """Strong ETag for the response cached under key."""
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _revalidatable(response, etag):
+    """Attach the validator headers to a 200 (or 304) response."""
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _send_variant(variants, mimetype, etag):
+    """Respond with the cached body variant the request's Accept-Encoding prefers."""
+    encoding = negotiate_encoding(variants, request.accept_encodings)
+    response = current_app.response_class(variants[encoding], mimetype=mimetype)
+    if encoding != IDENTITY:
+        response.headers['Content-Encoding'] = encoding
+    if len(variants) > 1:
+        response.vary.add('Accept-Encoding')
+    if mimetype == 'text/csv':
+        response.headers['Content-Disposition'] = attachment(request.path.rsplit('/', 1)[-1], 'csv')
+    return _revalidatable(response, etag and etag + ETAG_SUFFIXES[encoding])
+
+
+def cached_report(timeout=43200, span=request_span):
+    """
+    Cache a report view's successful responses under a data-versioned key.
+
+    `span` returns the (start, end) dates the view reads; only writes to
+    those days (or to the catalog) invalidate the entry. Only 200 responses
+    are stored, so transient errors aren't replayed for the rest of the
+    timeout.
+
+    Responses carry an ETag derived from the key; a matching If-None-Match
+    is answered with 304 before the view runs. Without a data version
+    (untracked database) the key can't prove the data is unchanged, so no
+    ETag is sent.
+
+    `?format=csv` converts the view's JSON result to CSV before caching.
+    A span of None (an invalid `date`, `start` or `end`) is answered with
+    400 before the view runs.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            fmt = request.args.get('format', 'json')
+            if fmt not in REPORT_FORMATS:
+                return error_response(f"format must be one of: {', '.join(REPORT_FORMATS)}", 400)
+            if request.args.get('layout', 'rows') not in LAYOUTS:
+                return error_response(f"layout must be one of: {', '.join(LAYOUTS)}", 400)
+            try:
+                parse_event_types(request.args.get('exclude'))
+            except ValueError as e:
+                return error_response(e, 400)
+
+            dates = span()
+            if dates is None:
+                return error_response('date, start and end must be YYYY-MM-DD dates', 400)
+            version = current_data_version(dates)
+            historical = version is not None and is_historical(dates)
+            key = report_cache_key(request.path, request.args, version, historical, span=dates)
+            etag = report_etag(key) if version is not None else None
+
+            if etag is not None:
+                # Any encoding's ETag proves the client has this data version
+                for suffix in ETAG_SUFFIXES.values():
+                    if request.if_none_match.contains(etag + suffix):
+                        return _revalidatable(current_app.response_class(status=304), etag + suffix)
+
+            cached = cache.get(key)
+            if cached is not None:
+                variants, mimetype = cached
+                return _send_variant(variants, mimetype, etag)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+            if fmt == 'csv':
+                response = current_app.response_class(
+                    report_csv(response.get_json()), mimetype='text/csv'
+                )
+
+            variants = encode_variants(response.get_data())
+            cache.set(
+                key,
+                (variants, response.mimetype),
+                timeout=HISTORICAL_TIMEOUT if historical else timeout,
+            )
+            return _send_variant(variants, response.mimetype, etag)
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,140 @@
+"""
+Dashboard summary endpoint.
+
+The dashboard KPIs used to take four requests per date range
+(items-by-revenue, total-sales and labor-percent with and without salaried
+staff). /api/dashboard/summary answers all of them in one request, cached
+as one unit: a single scan of the range's sales and a single labor
+proration run feed every KPI. Both labor-percent series are returned
+with their averages, matching labor-percent with include_salaried=true
+and false.
+"""
+
+from flask import Blueprint, request
+
+from database import with_database
+from report_cache import cached_report
+
+# Import shared utilities
+try:
+    from utils import get_default_date_range, success_response
+except ImportError:
+    from ..utils import get_default_date_range, success_response
+
+try:
+    from sales_source import get_sales_source
+except ImportError:
+    from ..sales_source import get_sales_source
+
+try:
+    from labor_utils import calculate_hourly_labor_costs, build_labor_percent_rows, hourly_only_breakdown
+except ImportError:
+    from ..labor_utils import calculate_hourly_labor_costs, build_labor_percent_rows, hourly_only_breakdown
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+
+def average_labor_pct(rows):
+    """
+    Sales-weighted labor % over a labor-percent series (None if empty).
+
+    Left unrounded, as the dashboard formats it for display.
+    """
+    if not rows:
+        return None
+    sales = sum(row['sales'] for row in rows)
+    labor_cost = sum(row['labor_cost'] for row in rows)
+    return labor_cost / sales * 100 if sales > 0 else 0
+
+
+@dashboard_bp.route('/api/dashboard/summary', methods=['GET'])
+@cached_report(timeout=43200)
+@with_database
+def dashboard_summary(cursor):
+    default_start, default_end = get_default_date_range()
+    start_date = request.args.get('start', default_start)
+    end_date = request.args.get('end', default_end)
+
+    src = get_sales_source(cursor)
+    date_where, params = src.date_filter(start_date, end_date)
+
+    # One pass over the range, grouped by (hour, item); the outer SELECTs
+    # re-aggregate that small intermediate into each KPI:
+    #   'total' - total sales (as /api/total-sales)
+    #   'hour'  - hourly sales for the labor-percent series
+    #   'item'  - the top seller by revenue (as items-by-revenue's first row)
+    # MATERIALIZED (SQLite 3.35+, checked by database.check_sqlite_version)
+    # keeps the outer SELECTs from each re-running the scan.
+    query = f'''
+        WITH scan AS MATERIALIZED (
+            SELECT
+                {src.sale_date} || printf(' %02d:00:00', {src.sale_hour}) as hour,
+                item_id,
+                SUM({src.units}) as units,
+                SUM({src.revenue}) as revenue
+            FROM {src.table}
+            WHERE {date_where}
+            GROUP BY hour, item_id
+        )
+        SELECT 'total' as kind, NULL as hour, NULL as item_id, NULL as item_name,
+               NULL as category, NULL as is_resold, NULL as units,
+               SUM(revenue) / 100.0 as revenue
+        FROM scan
+        UNION ALL
+        SELECT 'hour', hour, NULL, NULL, NULL, NULL, NULL, SUM(revenue) / 100.0
+        FROM scan
+        GROUP BY hour
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'item', NULL, s.item_id, i.item_name, i.category, i.is_resold,
+                   SUM(s.units), SUM(s.revenue) / 100.0 as item_revenue
+            FROM scan s
+            JOIN items i ON s.item_id = i.item_id
+            GROUP BY s.item_id
+            ORDER BY item_revenue DESC
+            LIMIT 1
+        )
+    '''
+    cursor.execute(query, params)
+
+    total_sales = 0
+    sales_by_hour = {}
+    top_seller = None
+    for row in cursor.fetchall():
+        if row['kind'] == 'total':
+            total_sales = row['revenue'] if row['revenue'] is not None else 0
+        elif row['kind'] == 'hour':
+            sales_by_hour[row['hour']] = row['revenue']
+        else:
+            top_seller = {
+                'item_id': row['item_id'],
+                'item_name': row['item_name'],
+                'category': row['category'],
+                'is_resold': row['is_resold'],
+                'units_sold': row['units'],
+                'revenue': row['revenue']
+            }
+
+    # One proration run covers both views: all staff, and hourly (students)
+    # only, which is what labor-percent?include_salaried=false returns.
+    if sales_by_hour:
+        all_staff = calculate_hourly_labor_costs(cursor.connection, start_date, end_date, True)
+        labor_all = build_labor_percent_rows(sales_by_hour, all_staff)
+        labor_hourly = build_labor_percent_rows(sales_by_hour, hourly_only_breakdown(all_staff))
+    else:
+        # Same as labor-percent: no revenue in range means no series
+        labor_all, labor_hourly = [], []
+
+    return success_response(
+        {
+            'top_seller': top_seller,
+            'total_sales': total_sales,
+            'avg_labor_pct': average_labor_pct(labor_all),
+            'avg_student_labor_pct': average_labor_pct(labor_hourly),
+            'labor_percent': {
+                'all': labor_all,
+                'hourly': labor_hourly
+            }
+        },
+        date_range={'start': start_date, 'end': end_date}
+    )
@@ -0,0 +1,71 @@
+"""
+Raw data export endpoints.
+
+Streams line items for a date range as CSV or NDJSON (see row_export.py),
+so a multi-year export runs in bounded memory instead of being built up
+as one JSON body.
+"""
+
+from flask import Blueprint, request
+
+try:
+    from utils import get_default_date_range, error_response
+except ImportError:
+    from ..utils import get_default_date_range, error_response
+
+try:
+    from date_range import inclusive_date_range_to_timestamps
+except ImportError:
+    from ..date_range import inclusive_date_range_to_timestamps
+
+try:
+    from row_export import EXPORT_FORMATS, stream_query
+except ImportError:
+    from ..row_export import EXPORT_FORMATS, stream_query
+
+export_bp = Blueprint('export', __name__)
+
+# Ordered by idx_transactions_date (whose entries end in the rowid), so
+# rows stream straight off the index with no sort to buffer first.
+TRANSACTIONS_EXPORT_SQL = '''
+    SELECT
+        transaction_id,
+        transaction_date,
+        item_id,
+        item_name,
+        category,
+        quantity,
+        register_num,
+        unit_price,
+        total_amount
+    FROM transactions
+    WHERE transaction_date >= ? AND transaction_date < ?
+    ORDER BY transaction_date, transaction_id
+'''
+
+
+@export_bp.route('/api/export/transactions', methods=['GET'])
+def export_transactions():
+    """
+    Stream every line item in [start, end].
+
+    Params:
+    - start: Start date (YYYY-MM-DD), inclusive
+    - end: End date (YYYY-MM-DD), inclusive
+    - format: 'csv' (default) or 'ndjson'
+    """
+    default_start, default_end = get_default_date_range()
+    start_date = request.args.get('start', default_start)
+    end_date = request.args.get('end', default_end)
+    fmt = request.args.get('format', 'csv')
+
+    if fmt not in EXPORT_FORMATS:
+        return error_response(f"format must be one of: {', '.join(EXPORT_FORMATS)}", 400)
+    try:
+        params = inclusive_date_range_to_timestamps(start_date, end_date)
+    except ValueError as e:
+        return error_response(e, 400)
+
+    return stream_query(
+        TRANSACTIONS_EXPORT_SQL, params, fmt, f'transactions_{start_date}_{end_date}'
+    )
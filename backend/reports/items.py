@@ -1,25 +1,74 @@
 from flask import Blueprint, jsonify, request
 
 from database import with_database
-from extensions import cache
+from report_cache import cached_report
 
 # Import shared utilities
 try:
-    from utils import get_default_date_range, success_response, error_response
+    from utils import cursor_columns, get_default_date_range, success_response, error_response
 except ImportError:
-    from ..utils import get_default_date_range, success_response, error_response
+    from ..utils import cursor_columns, get_default_date_range, success_response, error_response
 
 try:
     from date_range import inclusive_date_range_to_timestamps
 except ImportError:
     from ..date_range import inclusive_date_range_to_timestamps
 
+try:
+    from event_days import request_exclude_dates
+except ImportError:
+    from ..event_days import request_exclude_dates
+
+try:
+    from sales_source import get_sales_source, get_transactions_source
+except ImportError:
+    from ..sales_source import get_sales_source, get_transactions_source
+
+try:
+    import columnar_store
+except ImportError:
+    from .. import columnar_store
+
 items_bp = Blueprint('items', __name__)
 
+# Date ranges each item cost applies to, derived from item_cost_history the
+# same way database/cost_intervals.py materializes item_cost_intervals.
+# Converts the float cost, so it also works before the cents migration.
+COST_INTERVALS_CTE = '''
+    WITH cost_intervals AS (
+        SELECT
+            item_id,
+            DATE(effective_date) as effective_from,
+            COALESCE(
+                LEAD(DATE(effective_date)) OVER (PARTITION BY item_id ORDER BY effective_date),
+                '9999-12-31'
+            ) as effective_to,
+            CAST(ROUND(cost * 100) AS INTEGER) as cost_cents
+        FROM item_cost_history
+    )
+'''
+
+
+def cost_intervals_source(cursor):
+    """
+    Return (cte_sql, table) for the per-item cost intervals.
+
+    Reads the materialized item_cost_intervals table when it exists (and
+    holds cents); otherwise derives the intervals inline (item_cost_history
+    is small).
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'item_cost_intervals' "
+        "AND sql LIKE '%cost_cents%'"
+    )
+    if cursor.fetchone() is not None:
+        return '', 'item_cost_intervals'
+    return COST_INTERVALS_CTE, 'cost_intervals'
+
 
 # R3: Items by Revenue
 @items_bp.route('/api/reports/items-by-revenue', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200)
 @with_database
 def items_by_revenue(cursor):
     default_start, default_end = get_default_date_range()
@@ -27,43 +76,76 @@ def items_by_revenue(cursor):
     end_date = request.args.get('end', default_end)
     item_type = request.args.get('item_type', 'all')  # 'all', 'purchased', 'house-made'
 
-    query = '''
+    if columnar_store.columnar_enabled('items-by-revenue'):
+        items = _columnar_items_by_revenue(cursor, start_date, end_date, item_type)
+        return jsonify(success_response(items, date_range={'start': start_date, 'end': end_date}))
+
+    src = get_sales_source(cursor)
+    date_where, params = src.date_filter(start_date, end_date)
+
+    # Total per item first, then join the (few hundred) matching items.
+    # The inner query only reads item_id/units/revenue in a date range,
+    # which the date-leading covering index answers without table lookups.
+    query = f'''
         SELECT 
             i.item_id,
             i.item_name,
             i.category,
             i.is_resold,
-            SUM(t.quantity) as units_sold,
-            ROUND(SUM(t.total_amount), 2) as revenue
-        FROM transactions t
-        JOIN items i ON t.item_id = i.item_id
-        WHERE t.transaction_date >= ? AND t.transaction_date < ?
+            s.units_sold,
+            s.revenue / 100.0 as revenue
+        FROM (
+            SELECT
+                item_id,
+                SUM({src.units}) as units_sold,
+                SUM({src.revenue}) as revenue
+            FROM {src.table}
+            WHERE {date_where}
+            GROUP BY item_id
+        ) s
+        JOIN items i ON s.item_id = i.item_id
     '''
 
     # Add item_type filter if specified
-    start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
-    params = [start_ts, end_ts]
     if item_type == 'purchased':
-        query += ' AND i.is_resold = 1'
+        query += ' WHERE i.is_resold = 1'
     elif item_type == 'house-made':
-        query += ' AND i.is_resold = 0'
+        query += ' WHERE i.is_resold = 0'
 
     query += '''
-        GROUP BY t.item_id, i.item_name, i.category, i.is_resold
         ORDER BY revenue DESC
     '''
 
     cursor.execute(query, params)
     rows = cursor.fetchall()
 
-    items = [dict(row) for row in rows]
+    return jsonify(success_response(rows, columns=cursor_columns(cursor),
+                                    date_range={'start': start_date, 'end': end_date}))
+
+
+def _columnar_items_by_revenue(cursor, start_date, end_date, item_type):
+    """items-by-revenue rows from the columnar store, in the same shape and order."""
+    totals = columnar_store.item_totals(columnar_store.get_columns(cursor), start_date, end_date)
+
+    query = 'SELECT item_id, item_name, category, is_resold FROM items'
+    if item_type == 'purchased':
+        query += ' WHERE is_resold = 1'
+    elif item_type == 'house-made':
+        query += ' WHERE is_resold = 0'
+    cursor.execute(query)
 
-    return jsonify(success_response(items, date_range={'start': start_date, 'end': end_date}))
+    items = []
+    for row in cursor.fetchall():
+        if row['item_id'] in totals:
+            units_sold, revenue = totals[row['item_id']]
+            items.append({**dict(row), 'units_sold': units_sold, 'revenue': revenue})
+    items.sort(key=lambda item: item['revenue'], reverse=True)
+    return items
 
 
 # R4: Items by Total Profit
 @items_bp.route('/api/reports/items-by-profit', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200)
 @with_database
 def items_by_profit(cursor):
     default_start, default_end = get_default_date_range()
@@ -75,74 +157,66 @@ def items_by_profit(cursor):
     # Do not fall back to items.current_cost here: current_cost is only the
     # current snapshot/display value. Falling back would silently make
     # historical profit reports wrong.
-    transaction_cte = '''
-        WITH transaction_costs AS (
-            SELECT
-                t.transaction_id,
-                t.item_id,
-                i.item_name,
-                i.category,
-                i.is_resold,
-                t.transaction_date,
-                t.quantity,
-                t.unit_price,
-                t.total_amount,
-                (
-                    SELECT ich.cost
-                    FROM item_cost_history ich
-                    WHERE ich.item_id = t.item_id
-                      AND ich.effective_date <= DATE(t.transaction_date)
-                    ORDER BY ich.effective_date DESC
-                    LIMIT 1
-                ) AS effective_cost
-            FROM transactions t
-            JOIN items i ON t.item_id = i.item_id
-            WHERE t.transaction_date >= ? AND t.transaction_date < ?
-    '''
-
+    #
+    # Each sale range-joins the one [effective_from, effective_to) cost
+    # interval containing it (none before an item's first cost), so profit,
+    # margin and the missing-cost counts all come from a single pass.
+    intervals_cte, intervals = cost_intervals_source(cursor)
+    unit_price = get_transactions_source(cursor).unit_price
     start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
     params = [start_ts, end_ts]
-    if item_type == 'purchased':
-        transaction_cte += ' AND i.is_resold = 1'
-    elif item_type == 'house-made':
-        transaction_cte += ' AND i.is_resold = 0'
 
-    transaction_cte += '''
-        )
-    '''
-
-    query = transaction_cte + '''
+    query = intervals_cte + f'''
         SELECT
-            item_id,
-            item_name,
-            category,
-            is_resold,
-            SUM(quantity) as units_sold,
-            ROUND(SUM((unit_price - effective_cost) * quantity), 2) as total_profit,
+            t.item_id,
+            i.item_name,
+            i.category,
+            i.is_resold,
+            SUM(CASE WHEN c.cost_cents IS NOT NULL THEN t.quantity END) as units_sold,
+            SUM(({unit_price} - c.cost_cents) * t.quantity) / 100.0 as total_profit,
+            -- 100.0 first: prices and costs are integer cents, and integer
+            -- division would truncate the margin to 0
             ROUND(
-                SUM((unit_price - effective_cost) * quantity)
-                / NULLIF(SUM(unit_price * quantity), 0) * 100,
+                SUM(({unit_price} - c.cost_cents) * t.quantity) * 100.0
+                / NULLIF(SUM(CASE WHEN c.cost_cents IS NOT NULL THEN {unit_price} * t.quantity END), 0),
                 2
-            ) as margin_pct
-        FROM transaction_costs
-        WHERE effective_cost IS NOT NULL
-        GROUP BY item_id, item_name, category, is_resold
-        ORDER BY total_profit DESC
+            ) as margin_pct,
+            COUNT(c.cost_cents) as costed_rows,
+            SUM(c.cost_cents IS NULL) as missing_rows
+        FROM transactions t
+        JOIN items i ON t.item_id = i.item_id
+        LEFT JOIN {intervals} c
+            ON c.item_id = t.item_id
+           AND t.transaction_date >= c.effective_from
+           AND t.transaction_date < c.effective_to
+        WHERE t.transaction_date >= ? AND t.transaction_date < ?
     '''
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    data = [dict(row) for row in rows]
+    if item_type == 'purchased':
+        query += ' AND i.is_resold = 1'
+    elif item_type == 'house-made':
+        query += ' AND i.is_resold = 0'
 
-    missing_query = transaction_cte + '''
-        SELECT
-            COUNT(*) as missing_cost_transaction_rows,
-            COUNT(DISTINCT item_id) as missing_cost_distinct_items
-        FROM transaction_costs
-        WHERE effective_cost IS NULL
+    # Grouping on i.item_id (not t.item_id) keeps SQLite from walking the
+    # whole item-leading transactions index to avoid a sort; the date range
+    # stays the driving search.
+    query += '''
+        GROUP BY i.item_id
+        ORDER BY total_profit DESC
     '''
-    cursor.execute(missing_query, params)
-    missing = dict(cursor.fetchone())
+
+    cursor.execute(query, params)
+    data = []
+    missing = {'missing_cost_transaction_rows': 0, 'missing_cost_distinct_items': 0}
+    for row in cursor.fetchall():
+        row = dict(row)
+        costed_rows = row.pop('costed_rows')
+        missing_rows = row.pop('missing_rows')
+        if missing_rows:
+            missing['missing_cost_transaction_rows'] += missing_rows
+            missing['missing_cost_distinct_items'] += 1
+        if costed_rows:
+            data.append(row)
 
     return success_response(
         data,
@@ -154,7 +228,7 @@ def items_by_profit(cursor):
 
 # R5: Items by Profitability %
 @items_bp.route('/api/reports/items-by-margin', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200)
 @with_database
 def items_by_margin(cursor):
     item_type = request.args.get('item_type', 'all')  # 'all', 'purchased', 'house-made'
@@ -185,14 +259,12 @@ def items_by_margin(cursor):
     cursor.execute(query, params)
     rows = cursor.fetchall()
 
-    data = [dict(row) for row in rows]
-
-    return success_response(data, item_type=item_type)
+    return success_response(rows, columns=cursor_columns(cursor), item_type=item_type)
 
 
 # R9: Item heatmap data (hourly × daily patterns)
 @items_bp.route('/api/reports/item-heatmap', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200)
 @with_database
 def item_heatmap(cursor):
     default_start, default_end = get_default_date_range()
@@ -201,31 +273,38 @@ def item_heatmap(cursor):
     item_id = request.args.get('item_id')
 
     # Optional date filtering (e.g., to exclude game days)
-    exclude_dates_str = request.args.get('exclude_dates', '')
-    exclude_dates = [d.strip() for d in exclude_dates_str.split(',') if d.strip()] if exclude_dates_str else []
+    try:
+        exclude_dates = request_exclude_dates(cursor, start_date, end_date)
+    except ValueError as e:
+        return error_response(e, 400)
 
     if not item_id:
         return error_response('item_id required', 400)
 
-    # Build WHERE clause with optional date exclusion
-    start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
-    where_clause = 'WHERE item_id = ? AND transaction_date >= ? AND transaction_date < ?'
-    params = [item_id, start_ts, end_ts]
+    if columnar_store.columnar_enabled('item-heatmap'):
+        # A non-numeric item_id matches no rows, as in SQL
+        data = columnar_store.item_heatmap(
+            columnar_store.get_columns(cursor),
+            int(item_id) if item_id.isdigit() else None,
+            start_date, end_date, exclude_dates,
+        )
+        return success_response(data, date_range={'start': start_date, 'end': end_date})
 
-    if exclude_dates:
-        placeholders = ','.join('?' * len(exclude_dates))
-        where_clause += f' AND DATE(transaction_date) NOT IN ({placeholders})'
-        params.extend(exclude_dates)
+    # Build WHERE clause with optional date exclusion
+    src = get_sales_source(cursor)
+    date_where, date_params = src.date_filter(start_date, end_date, exclude_dates)
+    where_clause = f'WHERE item_id = ? AND {date_where}'
+    params = [item_id, *date_params]
 
     query = f'''
         WITH daily_hourly_totals AS (
             SELECT 
-                DATE(transaction_date) as sale_date,
-                CAST(strftime('%w', transaction_date) AS INTEGER) as day_num,
-                CAST(strftime('%H', transaction_date) AS INTEGER) as hour,
-                SUM(total_amount) as daily_revenue,
-                SUM(quantity) as daily_units
-            FROM transactions
+                {src.sale_date} as sale_date,
+                {src.day_of_week} as day_num,
+                {src.sale_hour} as hour,
+                SUM({src.revenue}) as daily_revenue,
+                SUM({src.units}) as daily_units
+            FROM {src.table}
             {where_clause}
             GROUP BY sale_date, day_num, hour
         )
@@ -241,7 +320,7 @@ def item_heatmap(cursor):
             END as day_of_week,
             day_num,
             hour,
-            ROUND(AVG(daily_revenue), 2) as revenue,
+            ROUND(AVG(daily_revenue)) / 100.0 as revenue,
             ROUND(AVG(daily_units), 1) as units
         FROM daily_hourly_totals
         GROUP BY day_num, hour
@@ -251,14 +330,242 @@ def item_heatmap(cursor):
     cursor.execute(query, params)
     rows = cursor.fetchall()
 
-    data = [dict(row) for row in rows]
+    return success_response(rows, columns=cursor_columns(cursor),
+                            date_range={'start': start_date, 'end': end_date})
+
+
+# Most items one item-heatmaps request may ask for
+MAX_HEATMAP_ITEMS = 100
+
+
+def _heatmap_item_ids(cursor, src, start_date, end_date):
+    """
+    Resolve an item-heatmaps request to an ordered list of item ids.
+
+    `item_ids` is used as given. Otherwise items are ranked by revenue
+    over the range, like top-items, optionally within `category` and
+    limited to the `top` N. Returns (item_ids, error) with one of them None.
+    """
+    item_ids = request.args.get('item_ids')
+    top = request.args.get('top', type=int)
+    category = request.args.get('category')
+
+    if item_ids:
+        try:
+            ids = list(dict.fromkeys(int(i) for i in item_ids.split(',') if i.strip()))
+        except ValueError:
+            return None, 'item_ids must be a comma-separated list of integers'
+        if len(ids) > MAX_HEATMAP_ITEMS:
+            return None, f'At most {MAX_HEATMAP_ITEMS} item_ids per request'
+        return ids, None
+
+    if top is None and not category:
+        return None, 'item_ids, top or category required'
+    if top is not None and not 1 <= top <= MAX_HEATMAP_ITEMS:
+        return None, f'top must be between 1 and {MAX_HEATMAP_ITEMS}'
+
+    date_where, params = src.date_filter(start_date, end_date)
+    query = f'''
+        SELECT item_id
+        FROM {src.table}
+        WHERE {date_where}
+    '''
+    if category:
+        query += ' AND item_id IN (SELECT item_id FROM items WHERE category = ?)'
+        params.append(category)
+    query += f'''
+        GROUP BY item_id
+        ORDER BY SUM({src.revenue}) DESC
+        LIMIT ?
+    '''
+    params.append(top or MAX_HEATMAP_ITEMS)
+
+    cursor.execute(query, params)
+    return [row['item_id'] for row in cursor.fetchall()], None
+
+
+# R9b: Heatmaps for several items at once
+@items_bp.route('/api/reports/item-heatmaps', methods=['GET'])
+@cached_report(timeout=43200)
+@with_database
+def item_heatmaps(cursor):
+    """
+    Day-of-week × hour heatmaps for several items in one grouped scan.
+
+    Params:
+    - item_ids: Comma-separated item ids, or
+    - top: The N items with the most revenue in the range, and/or
+    - category: Items in this category, by revenue
+    - start, end, exclude_dates, exclude: As for item-heatmap
+
+    Each item's `revenue` and `units` are dense 7×24 matrices indexed
+    [day_num][hour] (day_num 0 = Sunday), holding the same averages
+    item-heatmap returns per cell, and 0 where the item had no sales.
+    """
+    default_start, default_end = get_default_date_range()
+    start_date = request.args.get('start', default_start)
+    end_date = request.args.get('end', default_end)
+    try:
+        exclude_dates = request_exclude_dates(cursor, start_date, end_date)
+    except ValueError as e:
+        return error_response(e, 400)
+
+    src = get_sales_source(cursor)
+    item_ids, error = _heatmap_item_ids(cursor, src, start_date, end_date)
+    if error:
+        return error_response(error, 400)
+
+    date_range = {'start': start_date, 'end': end_date}
+    if not item_ids:
+        return success_response([], date_range=date_range)
+
+    placeholders = ','.join('?' * len(item_ids))
+    date_where, date_params = src.date_filter(start_date, end_date, exclude_dates)
+
+    query = f'''
+        WITH daily_hourly_totals AS (
+            SELECT
+                item_id,
+                {src.sale_date} as sale_date,
+                {src.day_of_week} as day_num,
+                {src.sale_hour} as hour,
+                SUM({src.revenue}) as daily_revenue,
+                SUM({src.units}) as daily_units
+            FROM {src.table}
+            WHERE item_id IN ({placeholders}) AND {date_where}
+            GROUP BY item_id, sale_date, day_num, hour
+        )
+        SELECT
+            item_id,
+            day_num,
+            hour,
+            ROUND(AVG(daily_revenue)) / 100.0 as revenue,
+            ROUND(AVG(daily_units), 1) as units
+        FROM daily_hourly_totals
+        GROUP BY item_id, day_num, hour
+    '''
+    cursor.execute(query, [*item_ids, *date_params])
+
+    heatmaps = {
+        item_id: {
+            'revenue': [[0] * 24 for _ in range(7)],
+            'units': [[0] * 24 for _ in range(7)],
+        }
+        for item_id in item_ids
+    }
+    for row in cursor.fetchall():
+        cells = heatmaps[row['item_id']]
+        cells['revenue'][row['day_num']][row['hour']] = row['revenue']
+        cells['units'][row['day_num']][row['hour']] = row['units']
+
+    cursor.execute(
+        f'SELECT item_id, item_name, category FROM items WHERE item_id IN ({placeholders})',
+        item_ids,
+    )
+    names = {row['item_id']: row for row in cursor.fetchall()}
+
+    data = []
+    for item_id in item_ids:
+        item = names.get(item_id)
+        data.append({
+            'item_id': item_id,
+            'item_name': item['item_name'] if item else None,
+            'category': item['category'] if item else None,
+            **heatmaps[item_id],
+        })
+
+    return success_response(data, date_range=date_range)
+
 
-    return success_response(data, date_range={'start': start_date, 'end': end_date})
+# Most named periods one period-comparison request may define
+MAX_PERIODS = 12
+
+
+def parse_period(spec):
+    """
+    Parse a 'name:days:start-end' period, e.g. 'morning:1,2,3,4,5:9-12'.
+
+    Days are day numbers (0=Sunday, 6=Saturday); the hour window is
+    [start, end). Returns (name, days, start_hour, end_hour).
+
+    Raises:
+        ValueError: if the spec is malformed or out of range.
+    """
+    try:
+        name, days, hours = spec.split(':')
+        day_list = [int(d) for d in days.split(',')]
+        start_hour, end_hour = (int(h) for h in hours.split('-'))
+    except ValueError:
+        raise ValueError(f"Invalid period {spec!r}; expected name:days:start-end")
+    if not name or not all(0 <= d <= 6 for d in day_list) or not 0 <= start_hour <= end_hour <= 24:
+        raise ValueError(f"Invalid period {spec!r}; days are 0-6 and hours 0-24")
+    return name, day_list, start_hour, end_hour
+
+
+def empty_period_totals():
+    return {'revenue': 0, 'days_counted': 0, 'units_sold': 0, 'avg_per_day': 0}
+
+
+def period_totals(cursor, src, date_where, date_params, periods, item_where='1', item_params=()):
+    """
+    Revenue, units and days counted per (item, period) in one grouped pass.
+
+    Each period is (name, days, start_hour, end_hour). Rows are bucketed
+    with CASE on the stored day/hour values; a sale counts toward every
+    period it falls in, so periods may overlap.
+
+    Returns:
+        dict: item_id -> {period name -> {'revenue', 'days_counted',
+        'units_sold', 'avg_per_day'}}, for items with sales in any period.
+    """
+    conditions, condition_params = [], []
+    for _, days, start_hour, end_hour in periods:
+        day_placeholders = ','.join('?' * len(days))
+        conditions.append(
+            f'({src.day_of_week} IN ({day_placeholders}) '
+            f'AND {src.sale_hour} >= ? AND {src.sale_hour} < ?)'
+        )
+        condition_params.append([*days, start_hour, end_hour])
+
+    columns, column_params = [], []
+    for i, condition in enumerate(conditions):
+        columns.append(
+            f'SUM(CASE WHEN {condition} THEN {src.revenue} END) / 100.0 as revenue_{i}, '
+            f'COUNT(DISTINCT CASE WHEN {condition} THEN {src.sale_date} END) as days_{i}, '
+            f'SUM(CASE WHEN {condition} THEN {src.units} END) as units_{i}'
+        )
+        column_params.extend(condition_params[i] * 3)
+
+    query = f'''
+        SELECT item_id, {', '.join(columns)}
+        FROM {src.table}
+        WHERE {item_where}
+        AND {date_where}
+        AND ({' OR '.join(conditions)})
+        GROUP BY item_id
+    '''
+    params = [*column_params, *item_params, *date_params,
+              *(p for period_params in condition_params for p in period_params)]
+    cursor.execute(query, params)
+
+    totals = {}
+    for row in cursor.fetchall():
+        item_totals = totals[row['item_id']] = {}
+        for i, (name, *_) in enumerate(periods):
+            revenue = row[f'revenue_{i}'] or 0
+            days_counted = row[f'days_{i}'] or 0
+            item_totals[name] = {
+                'revenue': revenue,
+                'days_counted': days_counted,
+                'units_sold': row[f'units_{i}'] or 0,
+                'avg_per_day': round(revenue / days_counted, 2) if days_counted > 0 else 0
+            }
+    return totals
 
 
 # R10: Time Period Comparison
 @items_bp.route('/api/reports/time-period-comparison', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200)
 @with_database
 def time_period_comparison(cursor):
     """
@@ -297,41 +604,8 @@ def time_period_comparison(cursor):
     period_a_day_list = [int(d.strip()) for d in period_a_days.split(',')]
     period_b_day_list = [int(d.strip()) for d in period_b_days.split(',')]
 
-    start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
-
-    # Helper function to calculate revenue for a period
-    def get_period_revenue(day_list, start_hour, end_hour):
-        # Create placeholders for days
-        day_placeholders = ','.join('?' * len(day_list))
-
-        query = f'''
-            SELECT
-                ROUND(SUM(t.total_amount), 2) as revenue,
-                COUNT(DISTINCT DATE(t.transaction_date)) as days_counted,
-                SUM(t.quantity) as units_sold
-            FROM transactions t
-            WHERE t.item_id = ?
-            AND t.transaction_date >= ? AND t.transaction_date < ?
-            AND CAST(strftime('%w', t.transaction_date) AS INTEGER) IN ({day_placeholders})
-            AND CAST(strftime('%H', t.transaction_date) AS INTEGER) >= ?
-            AND CAST(strftime('%H', t.transaction_date) AS INTEGER) < ?
-        '''
-
-        # Execute query with parameters: item_id, start_ts, end_ts, days, start_hour, end_hour
-        params = [item_id, start_ts, end_ts] + day_list + [start_hour, end_hour]
-        cursor.execute(query, params)
-        result = cursor.fetchone()
-
-        revenue = result['revenue'] if result['revenue'] is not None else 0
-        days_counted = result['days_counted'] if result['days_counted'] is not None else 0
-        units_sold = result['units_sold'] if result['units_sold'] is not None else 0
-
-        return {
-            'revenue': revenue,
-            'days_counted': days_counted,
-            'units_sold': units_sold,
-            'avg_per_day': round(revenue / days_counted, 2) if days_counted > 0 else 0
-        }
+    src = get_sales_source(cursor)
+    date_where, date_params = src.date_filter(start_date, end_date)
 
     # Get item name
     cursor.execute('SELECT item_name, category FROM items WHERE item_id = ?', (item_id,))
@@ -342,9 +616,15 @@ def time_period_comparison(cursor):
     item_name = item_row['item_name']
     category = item_row['category']
 
-    # Calculate revenues for both periods
-    period_a_data = get_period_revenue(period_a_day_list, period_a_start_hour, period_a_end_hour)
-    period_b_data = get_period_revenue(period_b_day_list, period_b_start_hour, period_b_end_hour)
+    # Calculate revenues for both periods in one pass
+    periods = [
+        ('a', period_a_day_list, period_a_start_hour, period_a_end_hour),
+        ('b', period_b_day_list, period_b_start_hour, period_b_end_hour),
+    ]
+    totals = period_totals(cursor, src, date_where, date_params, periods, 'item_id = ?', [item_id])
+    item_totals = totals.get(item_id, {})
+    period_a_data = item_totals.get('a', empty_period_totals())
+    period_b_data = item_totals.get('b', empty_period_totals())
 
     return success_response({
         'item_id': item_id,
@@ -366,4 +646,89 @@ def time_period_comparison(cursor):
             'end_hour': period_b_end_hour,
             **period_b_data
         }
-    })
\ No newline at end of file
+    })
+
+# R10b: N-way period comparison across items
+@items_bp.route('/api/reports/period-comparison', methods=['GET'])
+@cached_report(timeout=43200)
+@with_database
+def period_comparison(cursor):
+    """
+    Compare any number of named time periods for many items at once.
+
+    Params:
+    - period: Repeated 'name:days:start-end', e.g.
+      period=morning:1,2,3,4,5:9-12&period=afternoon:1,2,3,4,5:14-17
+    - item_ids: Comma-separated item ids, or
+    - category: Items in this category (default: all items)
+    - start: Overall date range start
+    - end: Overall date range end
+
+    Returns one row per item with sales in any period, highest total
+    revenue across the periods first, each with the per-period totals
+    time-period-comparison reports.
+    """
+    default_start, default_end = get_default_date_range()
+    start_date = request.args.get('start', default_start)
+    end_date = request.args.get('end', default_end)
+    item_ids = request.args.get('item_ids')
+    category = request.args.get('category')
+
+    specs = request.args.getlist('period')
+    if not specs:
+        return error_response('At least one period is required', 400)
+    if len(specs) > MAX_PERIODS:
+        return error_response(f'At most {MAX_PERIODS} periods per request', 400)
+    try:
+        periods = [parse_period(spec) for spec in specs]
+    except ValueError as e:
+        return error_response(e, 400)
+    if len({name for name, *_ in periods}) != len(periods):
+        return error_response('Period names must be unique', 400)
+
+    item_where, item_params = '1', []
+    if item_ids:
+        try:
+            ids = sorted({int(i) for i in item_ids.split(',') if i.strip()})
+        except ValueError:
+            return error_response('item_ids must be a comma-separated list of integers', 400)
+        if len(ids) > MAX_HEATMAP_ITEMS:
+            return error_response(f'At most {MAX_HEATMAP_ITEMS} item_ids per request', 400)
+        item_where = f'item_id IN ({",".join("?" * len(ids))})'
+        item_params = ids
+    elif category:
+        item_where = 'item_id IN (SELECT item_id FROM items WHERE category = ?)'
+        item_params = [category]
+
+    src = get_sales_source(cursor)
+    date_where, date_params = src.date_filter(start_date, end_date)
+    totals = period_totals(cursor, src, date_where, date_params, periods, item_where, item_params)
+
+    names = {}
+    if totals:
+        placeholders = ','.join('?' * len(totals))
+        cursor.execute(
+            f'SELECT item_id, item_name, category FROM items WHERE item_id IN ({placeholders})',
+            list(totals),
+        )
+        names = {row['item_id']: row for row in cursor.fetchall()}
+
+    data = []
+    for item_id, item_periods in totals.items():
+        item = names.get(item_id)
+        data.append({
+            'item_id': item_id,
+            'item_name': item['item_name'] if item else None,
+            'category': item['category'] if item else None,
+            'periods': item_periods,
+        })
+    data.sort(key=lambda row: sum(p['revenue'] for p in row['periods'].values()), reverse=True)
+
+    return success_response(
+        data,
+        date_range={'start': start_date, 'end': end_date},
+        periods=[
+            {'name': name, 'days': days, 'start_hour': start_hour, 'end_hour': end_hour}
+            for name, days, start_hour, end_hour in periods
+        ],
+    )
@@ -2,31 +2,45 @@ from flask import Blueprint, jsonify, request
 from datetime import datetime, timedelta
 
 from database import with_database
-from extensions import cache
+from report_cache import cached_report
 
 # Import shared utilities
 try:
-    from utils import get_default_date_range, success_response
+    from utils import get_default_date_range, success_response, error_response
 except ImportError:
-    from ..utils import get_default_date_range, success_response
+    from ..utils import get_default_date_range, success_response, error_response
 
 try:
-    from date_range import inclusive_date_range_to_timestamps
+    from event_days import request_exclude_dates
 except ImportError:
-    from ..date_range import inclusive_date_range_to_timestamps
+    from ..event_days import request_exclude_dates
+
+try:
+    from sales_source import get_sales_source
+except ImportError:
+    from ..sales_source import get_sales_source
+
+try:
+    import columnar_store
+except ImportError:
+    from .. import columnar_store
 
 # Import labor utilities
 try:
-    from labor_utils import calculate_hourly_labor_costs
+    from labor_utils import calculate_hourly_labor_costs, build_labor_percent_rows
 except ImportError:
-    from ..labor_utils import calculate_hourly_labor_costs
+    from ..labor_utils import calculate_hourly_labor_costs, build_labor_percent_rows
 
 labor_bp = Blueprint('labor', __name__)
 
+# sales-per-hour row keys, for the header of a range with no sales
+HOURLY_SALES_COLUMNS = ('hour', 'sales')
+DAY_OF_WEEK_COLUMNS = ('day_of_week', 'hourly_data')
+
 
 # R1: Sales per Labor Hour
 @labor_bp.route('/api/reports/sales-per-hour', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)  # 12 hours
+@cached_report(timeout=43200)  # 12 hours
 @with_database
 def sales_per_hour(cursor):
     mode = request.args.get('mode', 'average')  # 'average', 'single', or 'day-of-week'
@@ -36,48 +50,54 @@ def sales_per_hour(cursor):
     single_date = request.args.get('date')  # For single mode
 
     # Optional date filtering (e.g., to exclude game days)
-    exclude_dates_str = request.args.get('exclude_dates', '')
-    exclude_dates = [d.strip() for d in exclude_dates_str.split(',') if d.strip()] if exclude_dates_str else []
+    try:
+        exclude_dates = request_exclude_dates(cursor, start_date, end_date)
+    except ValueError as e:
+        return error_response(e, 400)
+
+    src = get_sales_source(cursor)
+    hour_label = f"printf('%02d:00', {src.sale_hour})"
+
+    # Same results, aggregated from the in-memory columnar store instead
+    columns = None
+    if columnar_store.columnar_enabled('sales-per-hour'):
+        columns = columnar_store.get_columns(cursor)
 
     if mode == 'single':
         # Single day mode - show actual sales for specific day
         target_date = single_date if single_date else end_date
 
-        query = '''
+        date_where, params = src.date_filter(target_date, target_date)
+        query = f'''
             SELECT
-                strftime('%H:00', transaction_date) as hour,
-                ROUND(SUM(total_amount), 2) as sales
-            FROM transactions
-            WHERE transaction_date >= ? AND transaction_date < ?
+                {hour_label} as hour,
+                SUM({src.revenue}) / 100.0 as sales
+            FROM {src.table}
+            WHERE {date_where}
             GROUP BY hour
             ORDER BY hour
         '''
 
-        start_ts, end_ts = inclusive_date_range_to_timestamps(target_date, target_date)
-        cursor.execute(query, (start_ts, end_ts))
-        rows = cursor.fetchall()
-        data = [dict(row) for row in rows]
+        if columns is not None:
+            data = columnar_store.hourly_sales(columns, target_date, target_date)
+        else:
+            cursor.execute(query, params)
+            data = cursor.fetchall()
 
-        return success_response(data, mode='single', date=target_date)
+        return success_response(data, columns=HOURLY_SALES_COLUMNS, mode='single', date=target_date)
 
     elif mode == 'day-of-week':
         # Day-of-week mode - calculate average sales per hour for each day of week
         # We need to divide by the count of that specific day of week, not all days
 
         # Build the WHERE clause with optional date exclusion
-        start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
-        where_clause = 'WHERE transaction_date >= ? AND transaction_date < ?'
-        params = [start_ts, end_ts]
-
-        if exclude_dates:
-            placeholders = ','.join('?' * len(exclude_dates))
-            where_clause += f' AND DATE(transaction_date) NOT IN ({placeholders})'
-            params.extend(exclude_dates)
+        date_where, params = src.date_filter(start_date, end_date, exclude_dates)
+        where_clause = f'WHERE {date_where}'
 
         query = f'''
             WITH hourly_sales AS (
                 SELECT 
-                    CASE CAST(strftime('%w', transaction_date) AS INTEGER)
+                    CASE {src.day_of_week}
                         WHEN 0 THEN 'Sunday'
                         WHEN 1 THEN 'Monday'
                         WHEN 2 THEN 'Tuesday'
@@ -86,11 +106,11 @@ def sales_per_hour(cursor):
                         WHEN 5 THEN 'Friday'
                         WHEN 6 THEN 'Saturday'
                     END as day_of_week,
-                    CAST(strftime('%w', transaction_date) AS INTEGER) as day_num,
-                    strftime('%H:00', transaction_date) as hour,
-                    DATE(transaction_date) as date,
-                    SUM(total_amount) as daily_hourly_sales
-                FROM transactions
+                    {src.day_of_week} as day_num,
+                    {hour_label} as hour,
+                    {src.sale_date} as date,
+                    SUM({src.revenue}) as daily_hourly_sales
+                FROM {src.table}
                 {where_clause}
                 GROUP BY day_of_week, day_num, hour, date
             )
@@ -98,14 +118,17 @@ def sales_per_hour(cursor):
                 day_of_week,
                 day_num,
                 hour,
-                ROUND(AVG(daily_hourly_sales), 2) as sales
+                ROUND(AVG(daily_hourly_sales)) / 100.0 as sales
             FROM hourly_sales
             GROUP BY day_of_week, day_num, hour
             ORDER BY day_num, hour
         '''
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        if columns is not None:
+            rows = columnar_store.day_of_week_hourly_sales(columns, start_date, end_date, exclude_dates)
+        else:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
         # Group data by day of week
         data_by_day = {}
@@ -128,49 +151,48 @@ def sales_per_hour(cursor):
                     'hourly_data': data_by_day[day]
                 })
 
-        return success_response(data, mode='day-of-week', date_range={'start': start_date, 'end': end_date})
+        return success_response(data, columns=DAY_OF_WEEK_COLUMNS, mode='day-of-week',
+                                date_range={'start': start_date, 'end': end_date})
 
     else:
         # Average mode - calculate average sales per hour across date range
 
         # Build WHERE clause with optional date exclusion
-        start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
-        where_clause = 'WHERE transaction_date >= ? AND transaction_date < ?'
-        params = [start_ts, end_ts]
-
-        if exclude_dates:
-            placeholders = ','.join('?' * len(exclude_dates))
-            where_clause += f' AND DATE(transaction_date) NOT IN ({placeholders})'
-            params.extend(exclude_dates)
+        date_where, params = src.date_filter(start_date, end_date, exclude_dates)
+        where_clause = f'WHERE {date_where}'
 
         # First, get all days that have data in the range (after exclusions)
         days_query = f'''
-            SELECT DISTINCT DATE(transaction_date) as day
-            FROM transactions
+            SELECT DISTINCT {src.sale_date} as day
+            FROM {src.table}
             {where_clause}
             ORDER BY day
         '''
-        cursor.execute(days_query, params)
-        days_with_data = [row['day'] for row in cursor.fetchall()]
+        if columns is not None:
+            data, days_with_data_count = columnar_store.average_hourly_sales(
+                columns, start_date, end_date, exclude_dates
+            )
+        else:
+            cursor.execute(days_query, params)
+            days_with_data_count = len(cursor.fetchall())
 
         # Calculate total days in range for missing data note
         start = datetime.strptime(start_date, '%Y-%m-%d')
         end = datetime.strptime(end_date, '%Y-%m-%d')
         total_days_in_range = (end - start).days + 1
-        days_with_data_count = len(days_with_data)
         missing_days_count = total_days_in_range - days_with_data_count
 
         # Get average sales per hour across all days with data
         query = f'''
             SELECT 
                 hour,
-                ROUND(AVG(hourly_sales), 2) as sales
+                ROUND(AVG(hourly_sales)) / 100.0 as sales
             FROM (
                 SELECT 
-                    strftime('%H:00', transaction_date) as hour,
-                    DATE(transaction_date) as day,
-                    SUM(total_amount) as hourly_sales
-                FROM transactions
+                    {hour_label} as hour,
+                    {src.sale_date} as day,
+                    SUM({src.revenue}) as hourly_sales
+                FROM {src.table}
                 {where_clause}
                 GROUP BY day, hour
             )
@@ -178,12 +200,13 @@ def sales_per_hour(cursor):
             ORDER BY hour
         '''
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        data = [dict(row) for row in rows]
+        if columns is None:
+            cursor.execute(query, params)
+            data = cursor.fetchall()
 
         return success_response(
             data,
+            columns=HOURLY_SALES_COLUMNS,
             mode='average',
             date_range={'start': start_date, 'end': end_date},
             metadata={
@@ -196,7 +219,7 @@ def sales_per_hour(cursor):
 
 # R2: Labor % per Labor Hour (with accurate proration)
 @labor_bp.route('/api/reports/labor-percent', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)  # 12 hours
+@cached_report(timeout=43200)  # 12 hours
 @with_database
 def labor_percent(cursor):
     default_start, default_end = get_default_date_range()
@@ -205,27 +228,22 @@ def labor_percent(cursor):
     include_salaried = request.args.get('include_salaried', 'true').lower() == 'true'
 
     # Optional date filtering (e.g., to exclude game days)
-    exclude_dates_str = request.args.get('exclude_dates', '')
-    exclude_dates = [d.strip() for d in exclude_dates_str.split(',') if d.strip()] if exclude_dates_str else []
+    try:
+        exclude_dates = request_exclude_dates(cursor, start_date, end_date)
+    except ValueError as e:
+        return error_response(e, 400)
 
     # Build WHERE clause with optional date exclusion
-    start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
-    where_clause = 'WHERE transaction_date >= ? AND transaction_date < ?'
-    params = [start_ts, end_ts]
-
-    if exclude_dates:
-        placeholders = ','.join('?' * len(exclude_dates))
-        where_clause += f' AND DATE(transaction_date) NOT IN ({placeholders})'
-        params.extend(exclude_dates)
+    src = get_sales_source(cursor)
+    date_where, params = src.date_filter(start_date, end_date, exclude_dates)
+    where_clause = f'WHERE {date_where}'
 
     # First, check if there's any revenue data in this date range
     revenue_check_query = f'''
-        SELECT COUNT(*) as transaction_count
-        FROM transactions
-        {where_clause}
+        SELECT EXISTS (SELECT 1 FROM {src.table} {where_clause}) as has_revenue
     '''
     cursor.execute(revenue_check_query, params)
-    has_revenue_data = cursor.fetchone()['transaction_count'] > 0
+    has_revenue_data = cursor.fetchone()['has_revenue'] == 1
 
     # If no revenue data, return empty result (like items_by_revenue does)
     if not has_revenue_data:
@@ -238,9 +256,9 @@ def labor_percent(cursor):
     # Get hourly sales from transactions
     sales_query = f'''
         SELECT 
-            strftime('%Y-%m-%d %H:00:00', transaction_date) as hour,
-            ROUND(SUM(total_amount), 2) as sales
-        FROM transactions
+            {src.sale_date} || printf(' %02d:00:00', {src.sale_hour}) as hour,
+            SUM({src.revenue}) / 100.0 as sales
+        FROM {src.table}
         {where_clause}
         GROUP BY hour
         ORDER BY hour
@@ -256,43 +274,7 @@ def labor_percent(cursor):
     labor_breakdown = calculate_hourly_labor_costs(conn, start_date, end_date, include_salaried, exclude_dates)
 
     # Combine sales and labor data
-    # Get all hours that have either sales or labor
-    all_hours = set(sales_data.keys()) | set(labor_breakdown.keys())
-
-    data = []
-    for hour in sorted(all_hours):
-        sales = sales_data.get(hour, 0)
-        breakdown = labor_breakdown.get(hour, {
-            'total_cost': 0,
-            'salaried_hours': 0,
-            'salaried_cost': 0,
-            'student_hours': 0,
-            'student_cost': 0
-        })
-
-        labor_cost = breakdown['total_cost']
-
-        # Skip hours with no activity (no sales and no labor)
-        if sales == 0 and labor_cost == 0:
-            continue
-
-        # Calculate labor percentage with zero sales edge case handling
-        if sales == 0:
-            labor_pct = 100  # Labor but no sales = 100% (capped, not infinity)
-        else:
-            labor_pct = round(labor_cost / sales * 100, 2)
-
-        data.append({
-            'hour': hour,
-            'sales': sales,
-            'labor_cost': round(labor_cost, 2),
-            'labor_pct': labor_pct,
-            # Breakdown for tooltip
-            'salaried_hours': round(breakdown['salaried_hours'], 2),
-            'salaried_cost': round(breakdown['salaried_cost'], 2),
-            'student_hours': round(breakdown['student_hours'], 2),
-            'student_cost': round(breakdown['student_cost'], 2)
-        })
+    data = build_labor_percent_rows(sales_data, labor_breakdown)
 
     return success_response(
         data,
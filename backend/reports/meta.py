@@ -1,20 +1,31 @@
+import json
+from datetime import date, timedelta
+
 from flask import Blueprint, jsonify, request
-from datetime import datetime, timedelta
-from calendar import monthrange
 
 from database import with_database
-from extensions import cache
+from report_cache import cached_report, catalog_span
 
 # Import shared utilities
 try:
-    from utils import get_default_date_range, success_response
+    from utils import cursor_columns, get_default_date_range, success_response, error_response
+except ImportError:
+    from ..utils import cursor_columns, get_default_date_range, success_response, error_response
+
+try:
+    from date_range import parse_report_date
+except ImportError:
+    from ..date_range import parse_report_date
+
+try:
+    from sales_source import get_sales_source
 except ImportError:
-    from ..utils import get_default_date_range, success_response
+    from ..sales_source import get_sales_source
 
 try:
-    from date_range import inclusive_date_range_to_timestamps
+    import columnar_store
 except ImportError:
-    from ..date_range import inclusive_date_range_to_timestamps
+    from .. import columnar_store
 
 meta_bp = Blueprint('meta', __name__)
 
@@ -35,24 +46,30 @@ def data_freshness(cursor):
 
 # Total Sales for date range
 @meta_bp.route('/api/total-sales', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200)
 @with_database
 def total_sales(cursor):
     default_start, default_end = get_default_date_range()
     start_date = request.args.get('start', default_start)
     end_date = request.args.get('end', default_end)
 
-    query = '''
-        SELECT ROUND(SUM(total_amount), 2) as total_sales
-        FROM transactions
-        WHERE transaction_date >= ? AND transaction_date < ?
-    '''
+    if columnar_store.columnar_enabled('total-sales'):
+        columns = columnar_store.get_columns(cursor)
+        total = columnar_store.total_sales(columns, start_date, end_date)
+    else:
+        src = get_sales_source(cursor)
+        date_where, params = src.date_filter(start_date, end_date)
 
-    start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
-    cursor.execute(query, (start_ts, end_ts))
-    row = cursor.fetchone()
+        query = f'''
+            SELECT SUM({src.revenue}) / 100.0 as total_sales
+            FROM {src.table}
+            WHERE {date_where}
+        '''
 
-    total = row['total_sales'] if row['total_sales'] is not None else 0
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+
+        total = row['total_sales'] if row['total_sales'] is not None else 0
 
     return jsonify(success_response({
         'total_sales': total,
@@ -63,6 +80,7 @@ def total_sales(cursor):
 
 # Get all items (for dropdowns)
 @meta_bp.route('/api/items', methods=['GET'])
+@cached_report(timeout=43200, span=catalog_span)
 @with_database
 def get_all_items(cursor):
     query = '''
@@ -73,14 +91,13 @@ def get_all_items(cursor):
 
     cursor.execute(query)
     rows = cursor.fetchall()
-    items = [dict(row) for row in rows]
 
-    return success_response(items)
+    return success_response(rows, columns=cursor_columns(cursor))
 
 
 # R8: Get top items for heatmap selector
 @meta_bp.route('/api/reports/top-items', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200)
 @with_database
 def top_items(cursor):
     default_start, default_end = get_default_date_range()
@@ -88,204 +105,210 @@ def top_items(cursor):
     end_date = request.args.get('end', default_end)
     limit = int(request.args.get('limit', 25))
 
-    query = '''
+    src = get_sales_source(cursor)
+    date_where, params = src.date_filter(start_date, end_date)
+
+    # Same shape as items-by-revenue: index-only totals, then the join
+    query = f'''
         SELECT 
             i.item_id,
             i.item_name,
             i.category,
-            ROUND(SUM(t.total_amount), 2) as total_revenue
-        FROM transactions t
-        JOIN items i ON t.item_id = i.item_id
-        WHERE t.transaction_date >= ? AND t.transaction_date < ?
-        GROUP BY i.item_id, i.item_name, i.category
+            s.revenue / 100.0 as total_revenue
+        FROM (
+            SELECT item_id, SUM({src.revenue}) as revenue
+            FROM {src.table}
+            WHERE {date_where}
+            GROUP BY item_id
+        ) s
+        JOIN items i ON s.item_id = i.item_id
         ORDER BY total_revenue DESC
         LIMIT ?
     '''
 
-    start_ts, end_ts = inclusive_date_range_to_timestamps(start_date, end_date)
-    cursor.execute(query, (start_ts, end_ts, limit))
+    cursor.execute(query, (*params, limit))
     rows = cursor.fetchall()
 
-    items = [dict(row) for row in rows]
+    return success_response(rows, columns=cursor_columns(cursor),
+                            date_range={'start': start_date, 'end': end_date})
 
-    return success_response(items, date_range={'start': start_date, 'end': end_date})
 
+# Revenue-trend granularities: (first day of the period containing a day,
+# first day of the next period, label for [start, end]). Weeks are ISO
+# (Mon-Sun); quarters and fiscal years follow the July 1 fiscal year, whose
+# quarters line up with calendar ones.
+FISCAL_YEAR_START_MONTH = 7
 
-# R11: Weekly and Monthly Revenue Trends
+
+def _month_floor(day):
+    return day.replace(day=1)
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def _quarter_floor(day):
+    return day.replace(month=((day.month - 1) // 3) * 3 + 1, day=1)
+
+
+def _fiscal_year_floor(day):
+    year = day.year if day.month >= FISCAL_YEAR_START_MONTH else day.year - 1
+    return date(year, FISCAL_YEAR_START_MONTH, 1)
+
+
+def _week_label(start, end):
+    # Like "Nov 4-10", or "Oct 28 - Nov 3" across months
+    if start.month == end.month:
+        return f"{start.strftime('%b')} {start.day}-{end.day}"
+    return f"{start.strftime('%b')} {start.day} - {end.strftime('%b')} {end.day}"
+
+
+TREND_GRANULARITIES = {
+    'day': (
+        lambda d: d,
+        lambda d: d + timedelta(days=1),
+        lambda start, end: f"{start.strftime('%a %b')} {start.day}",
+    ),
+    'week': (
+        lambda d: d - timedelta(days=d.weekday()),
+        lambda d: d + timedelta(days=7),
+        _week_label,
+    ),
+    'month': (
+        _month_floor,
+        lambda d: _add_months(d, 1),
+        lambda start, end: start.strftime('%B %Y'),
+    ),
+    'quarter': (
+        _quarter_floor,
+        lambda d: _add_months(d, 3),
+        lambda start, end: f"{start.strftime('%b')}-{end.strftime('%b')} {start.year}",
+    ),
+    'fiscal_year': (
+        _fiscal_year_floor,
+        lambda d: _add_months(d, 12),
+        lambda start, end: f"FY {start.year}-{str(end.year)[2:]}",
+    ),
+}
+
+
+def complete_periods(start, end, granularity):
+    """
+    Split [start, end] into the complete periods of a granularity.
+
+    Returns:
+        tuple: (periods, excluded_partial). periods is a list of inclusive
+        (first, last) date pairs wholly inside the range; excluded_partial
+        describes the incomplete period at the start, the end, or both
+        ('type' 'start' / 'end' / 'both'), or is None.
+    """
+    floor, next_start, _ = TREND_GRANULARITIES[granularity]
+    excluded_partial = None
+
+    current = floor(start)
+    if current != start:
+        current = next_start(current)
+        excluded_partial = {
+            'type': 'start',
+            'start': start.isoformat(),
+            'end': (current - timedelta(days=1)).isoformat()
+        }
+
+    periods = []
+    while current <= end:
+        following = next_start(current)
+        last = following - timedelta(days=1)
+        if last <= end:
+            periods.append((current, last))
+        elif not excluded_partial:
+            # Partial period at end - record but don't include
+            excluded_partial = {
+                'type': 'end',
+                'start': current.isoformat(),
+                'end': end.isoformat()
+            }
+        else:
+            # Both start and end have partials
+            excluded_partial = {
+                'type': 'both',
+                'start': excluded_partial['start'],
+                'end': excluded_partial['end'],
+                'end_partial_start': current.isoformat(),
+                'end_partial_end': end.isoformat()
+            }
+        current = following
+
+    return periods, excluded_partial
+
+
+def period_revenues(cursor, src, spans):
+    """
+    Revenue for each inclusive (first, last) date span, in order.
+
+    One statement runs an index range sum per span (the spans' bounds
+    arrive as a single JSON parameter), instead of one query per span.
+    Spans with no sales get 0.
+    """
+    bounds = json.dumps([src.range_params(first, last) for first, last in spans])
+    span_range = src.range_sql("json_extract(p.value, '$[0]')", "json_extract(p.value, '$[1]')")
+    cursor.execute(f'''
+        SELECT
+            p.key as span,
+            (SELECT SUM({src.revenue}) / 100.0 FROM {src.table} WHERE {span_range}) as revenue
+        FROM json_each(?) p
+    ''', (bounds,))
+    revenues = [0] * len(spans)
+    for row in cursor.fetchall():
+        if row['revenue'] is not None:
+            revenues[row['span']] = row['revenue']
+    return revenues
+
+
+# R11: Revenue Trends
 @meta_bp.route('/api/reports/revenue-trends', methods=['GET'])
-@cache.cached(timeout=43200, query_string=True)
+@cached_report(timeout=43200)
 @with_database
 def revenue_trends(cursor):
     """
-    Get revenue totals aggregated by week or month.
+    Get revenue totals aggregated by day, week, month, quarter or fiscal year.
 
     Params:
     - start: Start date (YYYY-MM-DD)
     - end: End date (YYYY-MM-DD)
-    - granularity: 'week' or 'month'
+    - granularity: 'day', 'week', 'month', 'quarter' or 'fiscal_year'
 
-    Returns only complete periods. Weeks are Mon-Sun.
+    Returns only complete periods. Weeks are Mon-Sun; fiscal years start
+    July 1. Every period is summed by one statement (period_revenues): a
+    correlated subquery per span over the index range, not a GROUP BY.
     """
     default_start, default_end = get_default_date_range()
     start_date = request.args.get('start', default_start)
     end_date = request.args.get('end', default_end)
     granularity = request.args.get('granularity', 'week')
 
-    # Parse dates
-    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-    end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-
-    periods = []
-    excluded_partial = None
-
-    if granularity == 'week':
-        # Find first Monday on or after start_date
-        days_until_monday = (7 - start_dt.weekday()) % 7
-        if start_dt.weekday() != 0:  # If not already Monday
-            first_monday = start_dt + timedelta(days=days_until_monday)
-            # Record the excluded partial week
-            excluded_partial = {
-                'type': 'start',
-                'start': start_date,
-                'end': (first_monday - timedelta(days=1)).strftime('%Y-%m-%d')
-            }
-        else:
-            first_monday = start_dt
-
-        # Generate complete weeks (Mon-Sun)
-        current_monday = first_monday
-        while current_monday <= end_dt:
-            current_sunday = current_monday + timedelta(days=6)
-
-            # Only include if the full week is within range
-            if current_sunday <= end_dt:
-                week_start = current_monday.strftime('%Y-%m-%d')
-                week_end = current_sunday.strftime('%Y-%m-%d')
-
-                # Query revenue for this week
-                week_start_ts, week_end_ts = inclusive_date_range_to_timestamps(week_start, week_end)
-                cursor.execute('''
-                    SELECT ROUND(SUM(total_amount), 2) as revenue
-                    FROM transactions
-                    WHERE transaction_date >= ? AND transaction_date < ?
-                ''', (week_start_ts, week_end_ts))
-
-                row = cursor.fetchone()
-                revenue = row['revenue'] if row['revenue'] is not None else 0
-
-                # Format label like "Nov 4-10"
-                start_month = current_monday.strftime('%b')
-                start_day = current_monday.day
-                end_day = current_sunday.day
-
-                if current_monday.month == current_sunday.month:
-                    label = f"{start_month} {start_day}-{end_day}"
-                else:
-                    end_month = current_sunday.strftime('%b')
-                    label = f"{start_month} {start_day} - {end_month} {end_day}"
-
-                periods.append({
-                    'label': label,
-                    'start_date': week_start,
-                    'end_date': week_end,
-                    'revenue': revenue,
-                    'is_complete': True
-                })
-            else:
-                # Partial week at end - record but don't include
-                if not excluded_partial:
-                    excluded_partial = {
-                        'type': 'end',
-                        'start': current_monday.strftime('%Y-%m-%d'),
-                        'end': end_date
-                    }
-                elif excluded_partial.get('type') == 'start':
-                    # Both start and end have partials
-                    excluded_partial = {
-                        'type': 'both',
-                        'start': excluded_partial['start'],
-                        'end': excluded_partial['end'],
-                        'end_partial_start': current_monday.strftime('%Y-%m-%d'),
-                        'end_partial_end': end_date
-                    }
-
-            current_monday += timedelta(days=7)
-
-    elif granularity == 'month':
-        # Find first day of first complete month
-        if start_dt.day != 1:
-            # Start is mid-month, so first complete month starts next month
-            if start_dt.month == 12:
-                first_complete_month = datetime(start_dt.year + 1, 1, 1)
-            else:
-                first_complete_month = datetime(start_dt.year, start_dt.month + 1, 1)
-
-            # Record excluded partial
-            last_day_of_start_month = monthrange(start_dt.year, start_dt.month)[1]
-            excluded_partial = {
-                'type': 'start',
-                'start': start_date,
-                'end': datetime(start_dt.year, start_dt.month, last_day_of_start_month).strftime('%Y-%m-%d')
-            }
-        else:
-            first_complete_month = start_dt
-
-        # Generate complete months
-        current_month_start = first_complete_month
-        while current_month_start <= end_dt:
-            # Get last day of this month
-            last_day = monthrange(current_month_start.year, current_month_start.month)[1]
-            current_month_end = datetime(current_month_start.year, current_month_start.month, last_day)
-
-            # Only include if the full month is within range
-            if current_month_end <= end_dt:
-                month_start = current_month_start.strftime('%Y-%m-%d')
-                month_end = current_month_end.strftime('%Y-%m-%d')
-
-                # Query revenue for this month
-                month_start_ts, month_end_ts = inclusive_date_range_to_timestamps(month_start, month_end)
-                cursor.execute('''
-                    SELECT ROUND(SUM(total_amount), 2) as revenue
-                    FROM transactions
-                    WHERE transaction_date >= ? AND transaction_date < ?
-                ''', (month_start_ts, month_end_ts))
-
-                row = cursor.fetchone()
-                revenue = row['revenue'] if row['revenue'] is not None else 0
-
-                # Format label like "November 2024"
-                label = current_month_start.strftime('%B %Y')
-
-                periods.append({
-                    'label': label,
-                    'start_date': month_start,
-                    'end_date': month_end,
-                    'revenue': revenue,
-                    'is_complete': True
-                })
-            else:
-                # Partial month at end
-                if not excluded_partial:
-                    excluded_partial = {
-                        'type': 'end',
-                        'start': current_month_start.strftime('%Y-%m-%d'),
-                        'end': end_date
-                    }
-                elif excluded_partial.get('type') == 'start':
-                    # Both start and end have partials
-                    excluded_partial = {
-                        'type': 'both',
-                        'start': excluded_partial['start'],
-                        'end': excluded_partial['end'],
-                        'end_partial_start': current_month_start.strftime('%Y-%m-%d'),
-                        'end_partial_end': end_date
-                    }
-
-            # Move to next month
-            if current_month_start.month == 12:
-                current_month_start = datetime(current_month_start.year + 1, 1, 1)
-            else:
-                current_month_start = datetime(current_month_start.year, current_month_start.month + 1, 1)
+    if granularity not in TREND_GRANULARITIES:
+        return error_response(
+            f"granularity must be one of: {', '.join(TREND_GRANULARITIES)}", 400
+        )
+
+    spans, excluded_partial = complete_periods(
+        parse_report_date(start_date), parse_report_date(end_date), granularity
+    )
+
+    revenues = period_revenues(cursor, get_sales_source(cursor), spans) if spans else []
+    label = TREND_GRANULARITIES[granularity][2]
+    periods = [
+        {
+            'label': label(first, last),
+            'start_date': first.isoformat(),
+            'end_date': last.isoformat(),
+            'revenue': revenue,
+            'is_complete': True
+        }
+        for (first, last), revenue in zip(spans, revenues)
+    ]
 
     # Calculate average across all periods
     if periods:
@@ -299,4 +322,4 @@ def revenue_trends(cursor):
         'average': average,
         'excluded_partial': excluded_partial,
         'granularity': granularity
-    }, date_range={'start': start_date, 'end': end_date})
\ No newline at end of file
+    }, date_range={'start': start_date, 'end': end_date})
@@ -0,0 +1,63 @@
+"""
+Content-Encoding negotiation for cached report responses.
+
+Large report bodies are gzip-compressed (and brotli-compressed, when the
+optional `brotli` package is installed) once, when the response is cached;
+report_cache.py stores every variant so cache hits skip both serialization
+and compression. Each request gets the best variant its Accept-Encoding
+allows. Bodies under the size threshold are always sent uncompressed.
+
+Settings (environment):
+    CAFE_COMPRESS_MIN_BYTES=1024   smallest body worth compressing (0 disables)
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get('CAFE_COMPRESS_MIN_BYTES', 1024))
+COMPRESS_ENABLED = COMPRESS_MIN_BYTES > 0
+
+# Levels tuned for responses compressed once and served many times, while
+# keeping the cache miss itself cheap
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+IDENTITY = 'identity'
+
+# A compressed body is a distinct representation, so it gets its own ETag
+ETAG_SUFFIXES = {IDENTITY: '', 'gzip': '-gzip', 'br': '-br'}
+
+
+def encode_variants(body):
+    """
+    Return {encoding: bytes} for body: always 'identity', plus 'gzip' and
+    'br' (if available) when the body is large enough to be worth it.
+    """
+    variants = {IDENTITY: body}
+    if not COMPRESS_ENABLED or len(body) < COMPRESS_MIN_BYTES:
+        return variants
+    variants['gzip'] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return variants
+
+
+def negotiate_encoding(variants, accept_encodings):
+    """
+    Pick the variant to send for a request's Accept-Encoding header.
+
+    Prefers the smallest variant the client accepts (q > 0); identity is
+    always acceptable.
+    """
+    acceptable = [
+        encoding for encoding in variants
+        if encoding != IDENTITY and accept_encodings[encoding] > 0
+    ]
+    if not acceptable:
+        return IDENTITY
+    return min(acceptable, key=lambda encoding: len(variants[encoding]))
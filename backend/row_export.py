@@ -0,0 +1,138 @@
+"""
+CSV / NDJSON export of query rows and report results.
+
+Raw exports (/api/export/transactions) can cover years of line items, far
+more than the worker should hold in memory at once. stream_query() runs
+the query on a pooled connection and returns a response whose body is a
+generator: rows are read with fetchmany() in EXPORT_BATCH_ROWS batches and
+each batch is encoded and sent as one chunk, so memory stays bounded by the
+batch however long the range. The connection goes back to the pool when
+the server closes the response (finished, failed or client gone).
+
+Report endpoints answer `?format=csv` too (see report_cache.cached_report).
+Their results are small aggregates that are cached whole anyway, so
+report_csv() renders the finished result instead of streaming a cursor.
+
+Settings (environment):
+    CAFE_EXPORT_BATCH_ROWS=1000    rows fetched and sent per chunk
+"""
+
+import csv
+import io
+import json
+import os
+
+from flask import current_app
+
+import database
+
+EXPORT_BATCH_ROWS = int(os.environ.get('CAFE_EXPORT_BATCH_ROWS', 1000))
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def attachment(name, fmt):
+    """Content-Disposition value for downloading `name` as a .fmt file."""
+    return f'attachment; filename="{name}.{fmt}"'
+
+
+def _csv_cell(value):
+    # Nested report values (e.g. heatmap matrices) don't fit a cell; keep them as JSON
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'))
+    return value
+
+
+def encode_csv(columns, batches):
+    """Yield a header line, then one CSV chunk per batch of row tuples."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([_csv_cell(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def encode_ndjson(columns, batches):
+    """Yield one chunk of newline-delimited JSON objects per batch of row tuples."""
+    for batch in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in batch)
+
+
+ENCODERS = {'csv': encode_csv, 'ndjson': encode_ndjson}
+
+
+def _fetch_batches(cursor, size):
+    while True:
+        batch = cursor.fetchmany(size)
+        if not batch:
+            return
+        yield batch
+
+
+def stream_query(sql, params, fmt, name):
+    """
+    Stream the rows of a query as a CSV or NDJSON download.
+
+    The query runs before the response is returned, so SQL errors still
+    surface as a normal error response; rows are fetched as the body is
+    sent.
+    """
+    pool = database.pool
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # plain tuples; no sqlite3.Row per line
+        cursor.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+    except Exception:
+        pool.release(conn)
+        raise
+
+    def close():
+        cursor.close()
+        pool.release(conn)
+
+    body = ENCODERS[fmt](columns, _fetch_batches(cursor, EXPORT_BATCH_ROWS))
+    response = current_app.response_class(body, mimetype=MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = attachment(name, fmt)
+    response.call_on_close(close)
+    return response
+
+
+def _flatten(record, prefix=''):
+    """A report row as {column: value}, nested dicts as dotted columns."""
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def report_csv(payload):
+    """
+    CSV text for a report's JSON payload.
+
+    A list in `data` becomes one row per entry; any other `data` (e.g.
+    total-sales' object) becomes a single row. Columns are the union of
+    the rows' keys, in first-seen order. A ?layout=columnar payload gives
+    the same rows as the default layout, and its `columns` are the header
+    of a report with no rows.
+    """
+    data = payload.get('data')
+    if 'columns' in payload:
+        columns = payload['columns']
+        data = [dict(zip(columns, values)) for values in zip(*(data[c] for c in columns))]
+    records = data if isinstance(data, list) else [data]
+    rows = [_flatten(r) if isinstance(r, dict) else {'value': r} for r in records]
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    if not rows:
+        columns = payload.get('columns', [])
+    return ''.join(encode_csv(columns, [[[row.get(c) for c in columns] for row in rows]]))
@@ -0,0 +1,208 @@
+"""
+Sales source selection for report queries.
+
+Most reports only need sales summed per (day, hour, item). Those sums are
+pre-computed in `sales_hourly_rollup` (maintained by database/sales_rollup.py
+and the importers), which is far smaller than `transactions`. A SalesSource
+describes one of the two tables through a common set of column expressions,
+so a report writes its SQL once and runs against whichever is available:
+
+    src = get_sales_source(cursor)
+    where, params = src.date_filter(start_date, end_date)
+    cursor.execute(f'''
+        SELECT {src.sale_date} AS sale_date, SUM({src.revenue}) / 100.0 AS revenue
+        FROM {src.table}
+        WHERE {where}
+        GROUP BY sale_date
+    ''', params)
+
+Money is in integer cents (`revenue`, `unit_price`; see
+database/money_columns.py): sum and average the integers, and convert to
+dollars once, in the outermost SELECT -- `SUM(...) / 100.0` for totals,
+`ROUND(AVG(...)) / 100.0` for averages -- so totals are exact and agree
+however they were computed.
+
+Expressions are unqualified column names/expressions: when joining `items`,
+alias the source table but avoid selecting `category` or `item_id` without a
+table prefix, since `items` has columns with those names too.
+
+When the rollup isn't ready, reports read `transactions`. Once
+database/transaction_time_columns.py has stored sale_date / sale_hour /
+day_of_week and the cents columns on each row (and built its covering
+indexes), the raw source uses those columns instead of evaluating
+DATE()/strftime() and converting dollars per row.
+
+Queries that need per-line detail the rollup doesn't keep (unit_price,
+sub-hour timestamps) should read `transactions` through
+get_transactions_source() instead.
+"""
+
+import os
+import sqlite3
+from datetime import date
+
+try:
+    from date_range import exclusion_filter, inclusive_date_range_to_timestamps, parse_report_date
+except ImportError:
+    from .date_range import exclusion_filter, inclusive_date_range_to_timestamps, parse_report_date
+
+ROLLUP_READY_SETTING = 'sales_hourly_rollup_ready'
+TIME_COLUMNS_INDEX = 'idx_transactions_item_time_cents'
+
+
+class SalesSource:
+    """Column expressions and date filtering for one sales table."""
+
+    def __init__(self, table, sale_date, sale_hour, day_of_week, units,
+                 revenue, unit_price, line_count, is_rollup):
+        self.table = table
+        self.sale_date = sale_date
+        self.sale_hour = sale_hour
+        self.day_of_week = day_of_week
+        self.units = units
+        self.revenue = revenue
+        self.unit_price = unit_price
+        self.line_count = line_count
+        self.is_rollup = is_rollup
+
+    def range_sql(self, first='?', last='?'):
+        """
+        WHERE fragment selecting the inclusive day range [first, last].
+
+        first/last are SQL expressions for the bounds range_params()
+        returns (placeholders by default).
+        """
+        if self.is_rollup:
+            # sale_date is stored as 'YYYY-MM-DD', so an inclusive string
+            # range is a bounded primary-key search.
+            return f'sale_date >= {first} AND sale_date <= {last}'
+        return f'transaction_date >= {first} AND transaction_date < {last}'
+
+    def range_params(self, first, last):
+        """The two bound values range_sql() compares against, for date objects."""
+        if self.is_rollup:
+            return [first.isoformat(), last.isoformat()]
+        return list(inclusive_date_range_to_timestamps(first.isoformat(), last.isoformat()))
+
+    def date_filter(self, start_date, end_date, exclude_dates=()):
+        """
+        Build the WHERE fragment for an inclusive date range.
+
+        Accepts 'YYYY-MM-DD' strings or date objects. Days in
+        exclude_dates are left out by splitting the range around them
+        (see date_range.exclusion_filter), so the filter stays a set of
+        index range searches.
+
+        Returns:
+            tuple: (sql_fragment, params_list)
+
+        Raises:
+            ValueError: if any date is not valid 'YYYY-MM-DD'.
+        """
+        if isinstance(start_date, date):
+            start_date = start_date.isoformat()
+        if isinstance(end_date, date):
+            end_date = end_date.isoformat()
+
+        return exclusion_filter(
+            parse_report_date(start_date), parse_report_date(end_date), exclude_dates,
+            self.range_sql(), self.range_params, self.sale_date,
+        )
+
+
+# Converts the float dollar columns per row, for databases that predate the
+# cents columns (same rounding as database/money_columns.CENTS_SQL).
+RAW_SOURCE = SalesSource(
+    table='transactions',
+    sale_date='DATE(transaction_date)',
+    sale_hour="CAST(strftime('%H', transaction_date) AS INTEGER)",
+    day_of_week="CAST(strftime('%w', transaction_date) AS INTEGER)",
+    units='quantity',
+    revenue='CAST(ROUND(total_amount * 100) AS INTEGER)',
+    unit_price='CAST(ROUND(unit_price * 100) AS INTEGER)',
+    line_count='1',
+    is_rollup=False,
+)
+
+# Same table, reading the stored time columns. Their covering indexes
+# (item_id or transaction_date first) let hourly reports run index-only.
+TIMED_RAW_SOURCE = SalesSource(
+    table='transactions',
+    sale_date='sale_date',
+    sale_hour='sale_hour',
+    day_of_week='day_of_week',
+    units='quantity',
+    revenue='total_cents',
+    unit_price='unit_price_cents',
+    line_count='1',
+    is_rollup=False,
+)
+
+ROLLUP_SOURCE = SalesSource(
+    table='sales_hourly_rollup',
+    sale_date='sale_date',
+    sale_hour='sale_hour',
+    day_of_week='day_of_week',
+    units='units',
+    revenue='revenue_cents',
+    unit_price=None,  # per-line detail isn't kept
+    line_count='line_count',
+    is_rollup=True,
+)
+
+
+def rollup_available(cursor):
+    """
+    True when sales_hourly_rollup has been fully built and may be read.
+
+    Set CAFE_REPORT_ROLLUP=0 to force every report onto raw transactions.
+    """
+    if os.environ.get('CAFE_REPORT_ROLLUP', '1') == '0':
+        return False
+    try:
+        cursor.execute(
+            "SELECT 1 FROM settings WHERE setting_key = ?",
+            (ROLLUP_READY_SETTING,)
+        )
+        if cursor.fetchone() is None:
+            return False
+        # A rollup from before revenue_cents is rebuilt by the next writer
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sales_hourly_rollup' "
+            "AND sql LIKE '%revenue_cents%'"
+        )
+        return cursor.fetchone() is not None
+    except sqlite3.OperationalError:
+        # No settings table (e.g. a bare test database)
+        return False
+
+
+def time_columns_available(cursor):
+    """
+    True when transactions has backfilled time columns.
+
+    The covering index is created after the backfill and the triggers, in
+    the same transaction, so its presence means every row has been
+    populated and later writes keep it that way (the cents columns too,
+    which the index holds).
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+        (TIME_COLUMNS_INDEX,)
+    )
+    return cursor.fetchone() is not None
+
+
+def get_transactions_source(cursor):
+    """Raw transactions, through the stored columns when they exist."""
+    return TIMED_RAW_SOURCE if time_columns_available(cursor) else RAW_SOURCE
+
+
+def get_sales_source(cursor):
+    """
+    Return the rollup source when it is ready, else raw transactions
+    (through the stored time columns when they exist).
+    """
+    if rollup_available(cursor):
+        return ROLLUP_SOURCE
+    return get_transactions_source(cursor)
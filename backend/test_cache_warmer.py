@@ -0,0 +1,62 @@
+"""Tests for cache_warmer.py."""
+
+import os
+import sys
+from datetime import date
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cache_warmer
+from cache_warmer import init_cache_warmer, preset_ranges, warm_cache, warm_urls
+
+
+def test_preset_ranges_match_frontend_presets():
+    ranges = preset_ranges(date(2026, 2, 18))  # a Wednesday in fiscal Q3
+    assert ranges['This Quarter'] == ('2026-01-01', '2026-02-18')
+    assert ranges['Last Month'] == ('2026-01-01', '2026-01-31')
+    assert ranges['Last Week'] == ('2026-02-09', '2026-02-15')
+    assert list(ranges)[0] == 'This Quarter'  # dashboard default first
+
+
+def test_warm_urls_start_with_dashboard_default_and_have_no_duplicates():
+    urls = warm_urls(date(2026, 2, 18))
+    assert urls[0] == '/api/dashboard/summary?start=2026-01-01&end=2026-02-18'
+    assert '/api/forecasts/categories' in urls
+    assert len(urls) == len(set(urls))
+
+
+def test_warm_cache_requests_urls_and_respects_budget():
+    app = Flask(__name__)
+    seen = []
+
+    @app.route('/a')
+    def a():
+        seen.append('a')
+        return 'ok'
+
+    summary = warm_cache(app, budget_seconds=60, urls=['/a', '/a?x=1'])
+    assert seen == ['a', 'a']
+    assert summary['warmed'] == 2
+    assert summary['results'][0]['status'] == 200
+
+    summary = warm_cache(app, budget_seconds=0, urls=['/a'])
+    assert summary['warmed'] == 0
+    assert summary['skipped'] == 1
+    assert seen == ['a', 'a']
+
+
+def test_warmer_starts_on_first_request_only(monkeypatch):
+    started = []
+    monkeypatch.setattr(cache_warmer, 'start_cache_warmer', started.append)
+    monkeypatch.setattr(cache_warmer, 'WARM_ENABLED', True)
+    app = Flask(__name__)
+    app.add_url_rule('/a', 'a', lambda: 'ok')
+
+    init_cache_warmer(app)
+    assert started == []
+    client = app.test_client()
+    client.get('/a')
+    client.get('/a')
+    assert started == [app]
@@ -0,0 +1,93 @@
+"""Tests for the dashboard summary's labor helpers (labor_utils.py, reports/dashboard.py)."""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from labor_utils import build_labor_percent_rows, calculate_hourly_labor_costs, hourly_only_breakdown
+from reports.dashboard import average_labor_pct
+from test_query_plans import traced
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.executescript('''
+        CREATE TABLE labor_hours (
+            labor_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shift_date DATE NOT NULL,
+            shift_start TIMESTAMP NOT NULL,
+            shift_end TIMESTAMP NOT NULL,
+            employee_name TEXT NOT NULL,
+            employee_type TEXT NOT NULL
+        );
+        CREATE TABLE settings (setting_key TEXT PRIMARY KEY, setting_value TEXT NOT NULL);
+        INSERT INTO settings VALUES ('hourly_labor_rate', '17.5'), ('salaried_labor_rate', '31');
+    ''')
+    conn.executemany(
+        'INSERT INTO labor_hours (shift_date, shift_start, shift_end, employee_name, employee_type) '
+        'VALUES (?, ?, ?, ?, ?)',
+        [
+            ('2026-03-02', '2026-03-02 07:40:00', '2026-03-02 11:15:00', 'Sam', 'hourly'),
+            ('2026-03-02', '2026-03-02 08:00:00', '2026-03-02 16:30:00', 'Pat', 'salaried'),
+            ('2026-03-02', '2026-03-02 10:20:00', '2026-03-02 13:05:00', 'Alex', 'hourly'),
+            # Salaried-only hour: must not show up in the hourly view
+            ('2026-03-03', '2026-03-03 18:00:00', '2026-03-03 19:00:00', 'Pat', 'salaried'),
+        ],
+    )
+    yield conn
+    conn.close()
+
+
+def test_hourly_only_breakdown_matches_hourly_query(conn):
+    all_staff = calculate_hourly_labor_costs(conn, '2026-03-01', '2026-03-03', True)
+    hourly = calculate_hourly_labor_costs(conn, '2026-03-01', '2026-03-03', False)
+    assert hourly_only_breakdown(all_staff) == hourly
+
+
+def test_labor_percent_rows_are_identical_for_derived_breakdown(conn):
+    sales = {'2026-03-02 08:00:00': 120.0, '2026-03-02 12:00:00': 80.5, '2026-03-04 09:00:00': 40.0}
+    all_staff = calculate_hourly_labor_costs(conn, '2026-03-01', '2026-03-04', True)
+    hourly = calculate_hourly_labor_costs(conn, '2026-03-01', '2026-03-04', False)
+    assert (build_labor_percent_rows(sales, hourly_only_breakdown(all_staff))
+            == build_labor_percent_rows(sales, hourly))
+
+    rows = build_labor_percent_rows(sales, hourly)
+    assert [r['hour'] for r in rows] == sorted(r['hour'] for r in rows)
+    # Labor with no sales is capped at 100%
+    assert next(r for r in rows if r['hour'] == '2026-03-02 07:00:00')['labor_pct'] == 100
+
+
+def test_average_labor_pct_is_sales_weighted():
+    rows = [
+        {'sales': 100.0, 'labor_cost': 50.0},
+        {'sales': 300.0, 'labor_cost': 30.0},
+    ]
+    assert average_labor_pct(rows) == 20.0
+    assert average_labor_pct([]) is None
+    assert average_labor_pct([{'sales': 0, 'labor_cost': 10.0}]) == 0
+
+
+def test_summary_returns_both_labor_series(traced):
+    _, client, _, _ = traced
+    summary = client.get('/api/dashboard/summary?start=2026-03-01&end=2026-03-07').get_json()['data']
+    for key, include_salaried in (('all', 'true'), ('hourly', 'false')):
+        series = client.get('/api/reports/labor-percent?start=2026-03-01&end=2026-03-07'
+                            f'&include_salaried={include_salaried}').get_json()['data']
+        assert summary['labor_percent'][key] == series
+    assert summary['avg_labor_pct'] == average_labor_pct(summary['labor_percent']['all'])
+    assert summary['avg_student_labor_pct'] == average_labor_pct(summary['labor_percent']['hourly'])
+
+
+@pytest.mark.parametrize('route', ['/api/dashboard/summary', '/api/total-sales', '/api/reports/revenue-trends'])
+def test_invalid_dates_are_bad_requests(traced, route):
+    _, client, _, _ = traced
+    for query in ('start=bad', 'start=2026-03-01&end=2026-13-01'):
+        response = client.get(f'{route}?{query}')
+        assert response.status_code == 400
+        assert 'YYYY-MM-DD' in response.get_json()['error']
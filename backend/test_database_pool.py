@@ -0,0 +1,144 @@
+"""Tests for the pooled connection layer in database.py."""
+
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+from database import MIN_SQLITE_VERSION, ConnectionPool, PoolTimeout, check_sqlite_version
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / 'pool_test.db'
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(database, 'DB_PATH', str(path))
+    return path
+
+
+def test_same_thread_reuses_its_connection(db_path):
+    pool = ConnectionPool(database.get_db, max_size=4)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    stats = pool.stats()
+    assert stats['checkouts'] == 2
+    assert stats['created'] == 1
+    assert stats['thread_reuses'] == 1
+    assert stats['open_connections'] == 1
+    assert stats['idle_connections'] == 1
+
+
+def test_pool_is_bounded_and_times_out(db_path):
+    pool = ConnectionPool(database.get_db, max_size=1, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(conn)
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['open_connections'] == 1
+
+
+def test_waiting_thread_gets_released_connection(db_path):
+    pool = ConnectionPool(database.get_db, max_size=1, timeout=5)
+    held = pool.acquire()
+    got = []
+
+    def worker():
+        with pool.connection() as conn:
+            got.append(conn.execute('SELECT x FROM t').fetchone()[0])
+
+    t = threading.Thread(target=worker)
+    t.start()
+    pool.release(held)
+    t.join(timeout=5)
+
+    assert got == [1]
+    assert pool.stats()['open_connections'] == 1
+
+
+def test_replaced_database_file_is_reopened(db_path, tmp_path):
+    pool = ConnectionPool(database.get_db, max_size=2)
+    with pool.connection() as old:
+        assert old.execute('SELECT x FROM t').fetchone()[0] == 1
+
+    # Simulate deploy_new_db.sh dropping a new file in place.
+    replacement = tmp_path / 'replacement.db'
+    conn = sqlite3.connect(replacement)
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.execute('INSERT INTO t VALUES (2)')
+    conn.commit()
+    conn.close()
+    shutil.move(replacement, db_path)
+
+    with pool.connection() as new:
+        assert new is not old
+        assert new.execute('SELECT x FROM t').fetchone()[0] == 2
+    assert pool.stats()['discarded'] == 1
+    assert pool.stats()['open_connections'] == 1
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork()')
+def test_forked_child_opens_its_own_connections(db_path):
+    pool = ConnectionPool(database.get_db, max_size=1, timeout=0.05)
+    # Checked out when the process forks, as by a thread the child lacks
+    held = pool.acquire()
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            with pool.connection() as conn:
+                ok = conn is not held and conn.execute('SELECT x FROM t').fetchone()[0] == 1
+            pool.release(held)  # not the child's to return
+            ok = ok and pool.stats()['idle_connections'] == 1
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    assert held.execute('SELECT x FROM t').fetchone()[0] == 1
+    pool.release(held)
+    assert pool.stats()['open_connections'] == 1
+
+
+def test_release_rolls_back_open_transaction(db_path):
+    pool = ConnectionPool(database.get_db, max_size=1)
+    with pool.connection() as conn:
+        conn.execute('BEGIN')
+        conn.execute('SELECT x FROM t').fetchone()
+        assert conn.in_transaction
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+
+
+def test_report_connections_use_read_profile(db_path):
+    conn = database.get_db()
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA query_only').fetchone()[0] == 1
+        assert conn.execute('PRAGMA temp_store').fetchone()[0] == 2  # MEMORY
+        assert conn.execute('PRAGMA cache_size').fetchone()[0] == -16384
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute('INSERT INTO t VALUES (2)')
+    finally:
+        conn.close()
+
+
+def test_older_sqlite_is_refused_at_startup():
+    check_sqlite_version(MIN_SQLITE_VERSION)
+    with pytest.raises(RuntimeError, match='3.35.0 or newer'):
+        check_sqlite_version((3, 34, 1))
@@ -1,7 +1,9 @@
 """Tests for the date_range helper module (Phase 1 performance optimization)."""
 
 import os
+import sqlite3
 import sys
+from datetime import date
 
 import pytest
 
@@ -9,7 +11,11 @@ import pytest
 # module is importable whether pytest is run from backend/ or the repo root.
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import date_range
 from date_range import (
+    exclusion_filter,
+    kept_date_ranges,
+    parse_exclude_dates,
     parse_report_date,
     to_midnight_timestamp,
     inclusive_date_range_to_timestamps,
@@ -84,3 +90,72 @@ def test_to_midnight_timestamp_accepts_string_or_date():
     d = parse_report_date('2026-07-21')
     assert to_midnight_timestamp(d) == '2026-07-21 00:00:00'
     assert to_midnight_timestamp('2026-07-21') == '2026-07-21 00:00:00'
+
+
+def test_parse_exclude_dates_sorts_and_dedupes():
+    assert parse_exclude_dates(' 2026-03-14,2026-03-07,,2026-03-14 ') == [
+        date(2026, 3, 7), date(2026, 3, 14)]
+    assert parse_exclude_dates(None) == []
+    with pytest.raises(ValueError):
+        parse_exclude_dates('2026-03-07,March 14')
+
+
+def test_kept_date_ranges_splits_around_excluded_days():
+    d = lambda day: date(2026, 3, day)
+    assert kept_date_ranges(d(1), d(10), [d(4), d(5), d(8)]) == [
+        (d(1), d(3)), (d(6), d(7)), (d(9), d(10))]
+    # Excluded range edges, and days outside the range, leave one run
+    assert kept_date_ranges(d(1), d(10), [d(1), d(10), d(20)]) == [(d(2), d(9))]
+    assert kept_date_ranges(d(1), d(2), [d(1), d(2)]) == []
+
+
+SHIFT_RANGE = 'shift_date >= ? AND shift_date <= ?'
+
+
+def shift_params(first, last):
+    return first.isoformat(), last.isoformat()
+
+
+def matching_days(start, end, exclude):
+    """Days of March 2026 selected by exclusion_filter, run against SQLite."""
+    sql, params = exclusion_filter(start, end, exclude, SHIFT_RANGE, shift_params, 'shift_date')
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE shifts (shift_date DATE)')
+    conn.executemany('INSERT INTO shifts VALUES (?)',
+                     [(f'2026-03-{day:02d}',) for day in range(1, 32)])
+    rows = conn.execute(f'SELECT shift_date FROM shifts WHERE {sql} ORDER BY 1', params)
+    return [int(row[0][-2:]) for row in rows]
+
+
+def test_exclusion_filter_without_exclusions_is_the_plain_range():
+    assert exclusion_filter('2026-03-01', '2026-03-31', [], SHIFT_RANGE, shift_params, 'shift_date') == (
+        SHIFT_RANGE, ['2026-03-01', '2026-03-31'])
+    # Days outside the range don't change the filter
+    assert exclusion_filter('2026-03-01', '2026-03-31', ['2026-04-01'], SHIFT_RANGE,
+                            shift_params, 'shift_date')[0] == SHIFT_RANGE
+
+
+def test_exclusion_filter_ors_remaining_ranges():
+    sql, params = exclusion_filter('2026-03-01', '2026-03-10', ['2026-03-04'],
+                                   SHIFT_RANGE, shift_params, 'shift_date')
+    assert sql == f'{SHIFT_RANGE} AND (({SHIFT_RANGE}) OR ({SHIFT_RANGE}))'
+    assert params == ['2026-03-01', '2026-03-10',
+                      '2026-03-01', '2026-03-03', '2026-03-05', '2026-03-10']
+    assert matching_days('2026-03-01', '2026-03-10', ['2026-03-01', '2026-03-04']) == [
+        2, 3, 5, 6, 7, 8, 9, 10]
+
+
+def test_exclusion_filter_everything_excluded():
+    assert exclusion_filter('2026-03-01', '2026-03-01', ['2026-03-01'],
+                            SHIFT_RANGE, shift_params, 'shift_date') == ('0', [])
+    assert matching_days('2026-03-01', '2026-03-01', ['2026-03-01']) == []
+
+
+def test_exclusion_filter_anti_joins_long_lists(monkeypatch):
+    monkeypatch.setattr(date_range, 'EXCLUSION_RANGES_LIMIT', 2)
+    exclude = ['2026-03-03', '2026-03-05', '2026-03-07']
+    sql, params = exclusion_filter('2026-03-01', '2026-03-09', exclude,
+                                   SHIFT_RANGE, shift_params, 'shift_date')
+    assert 'json_each(?)' in sql
+    assert params[:2] == ['2026-03-01', '2026-03-09']
+    assert matching_days('2026-03-01', '2026-03-09', exclude) == [1, 2, 4, 6, 8, 9]
@@ -0,0 +1,203 @@
+"""Tests for event_days.py: `exclude=<event types>` on reports and forecasts."""
+
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_DIR = os.path.join(BACKEND_DIR, '..', 'database')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.append(DATABASE_DIR)
+
+import database
+import report_cache
+from admin.admin import admin_bp
+from event_calendar import import_events
+from extensions import cache
+from forecasts import forecasts
+from reports.items import items_bp
+from reports.labor import labor_bp
+from test_forecast_job import FORECAST_URLS, build_db
+
+TODAY = date.today()
+# Two past game days a week apart, and one upcoming
+GAME_DAYS = [TODAY - timedelta(days=14), TODAY - timedelta(days=7)]
+NEXT_GAME = TODAY + timedelta(days=7)
+HOLIDAY = TODAY - timedelta(days=10)
+RANGE = f'start={TODAY - timedelta(days=30)}&end={TODAY - timedelta(days=1)}'
+
+REPORT_URLS = [
+    f'/api/reports/item-heatmap?{RANGE}&item_id=1',
+    f'/api/reports/sales-per-hour?{RANGE}',
+    f'/api/reports/sales-per-hour?{RANGE}&mode=day-of-week',
+    f'/api/reports/labor-percent?{RANGE}',
+]
+
+
+def add_events(events, replace=False):
+    conn = sqlite3.connect(database.DB_PATH)
+    import_events(conn.cursor(), events, replace=replace)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = str(tmp_path / 'events.db')
+    build_db(path, TODAY)
+    monkeypatch.setattr(database, 'DB_PATH', path)
+    add_events([(str(day), 'game_day', None) for day in GAME_DAYS + [NEXT_GAME]]
+               + [(str(HOLIDAY), 'holiday', 'Founders Day')])
+
+    pool = database.ConnectionPool(database.get_db)
+    monkeypatch.setattr(database, 'pool', pool)
+    monkeypatch.setattr(report_cache, 'pool', pool)
+
+    app = Flask(__name__)
+    cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
+    for bp in (items_bp, labor_bp, forecasts.forecasts_bp, admin_bp):
+        app.register_blueprint(bp)
+
+    with app.app_context():
+        cache.clear()
+    yield app.test_client()
+    pool.close_all()
+
+
+def get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.get_json())
+    return response.get_json()['data']
+
+
+def daily_sales(*days):
+    """Average sales of the given days, as the forecasts compute it."""
+    conn = sqlite3.connect(database.DB_PATH)
+    try:
+        totals = [conn.execute('SELECT SUM(total_cents) FROM transactions '
+                               'WHERE DATE(transaction_date) = ?', (str(day),)).fetchone()[0]
+                  for day in days]
+    finally:
+        conn.close()
+    return round(sum(totals) / 100 / len(totals), 2)
+
+
+@pytest.mark.parametrize('url', REPORT_URLS)
+def test_exclude_matches_exclude_dates(client, url):
+    dates = ','.join(str(day) for day in GAME_DAYS)
+    assert get(client, f'{url}&exclude=game_day') == get(client, f'{url}&exclude_dates={dates}')
+
+    # Types combine with each other and with exclude_dates
+    extra = TODAY - timedelta(days=3)
+    assert (get(client, f'{url}&exclude=holiday,game_day&exclude_dates={extra}')
+            == get(client, f'{url}&exclude_dates={dates},{HOLIDAY},{extra}'))
+
+
+def test_calendar_changes_invalidate_cached_reports(client):
+    url = REPORT_URLS[1] + '&exclude=game_day'
+    before = get(client, url)
+    assert get(client, url) == before
+
+    add_events([(str(TODAY - timedelta(days=21)), 'game_day', None)])
+    after = get(client, url)
+    assert after != before
+    dates = ','.join(str(day) for day in [TODAY - timedelta(days=21)] + GAME_DAYS)
+    assert after == get(client, f'{REPORT_URLS[1]}&exclude_dates={dates}')
+
+
+@pytest.mark.parametrize('url', REPORT_URLS)
+def test_invalid_exclude_dates_is_rejected(client, url):
+    response = client.get(f'{url}&exclude_dates={GAME_DAYS[0]},March 14')
+    assert response.status_code == 400
+    assert 'March 14' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('url', REPORT_URLS)
+def test_invalid_range_is_rejected(client, url):
+    for bad in ('start=2026-02-30&end=2026-03-31', 'start=2026-03-01&end=soon'):
+        for exclude in ('', '&exclude=game_day'):
+            response = client.get(url.replace(RANGE, bad) + exclude)
+            assert response.status_code == 400, (bad, exclude)
+
+
+def test_unknown_event_type_is_rejected(client):
+    for url in (REPORT_URLS[0], '/api/forecasts/daily?'):
+        response = client.get(f'{url}&exclude=game_day,concert')
+        assert response.status_code == 400
+        assert 'concert' in response.get_json()['error']
+
+    response = client.get('/api/forecasts/daily?engine=numpy&exclude=game_day')
+    assert response.status_code == 400
+
+
+def test_forecasts_plan_around_events(client):
+    plain = {day['date']: day for day in get(client, '/api/forecasts/daily')}
+    daily = {day['date']: day for day in get(client, '/api/forecasts/daily?exclude=game_day')}
+
+    # The game day averages the past game days instead of its weekday
+    game = daily[str(NEXT_GAME)]
+    assert game['event'] == 'game_day'
+    assert game['basis'] == 'Avg of last 2 game days'
+    assert game['forecasted_sales'] == daily_sales(*GAME_DAYS)
+    assert 'event' not in plain[str(NEXT_GAME)]
+    assert plain[str(NEXT_GAME)]['basis'] == 'Avg of last 3 valid weeks'
+
+    # Two weeks out, both weeks back were game days: earlier weeks replace them
+    later = str(TODAY + timedelta(days=14))
+    assert 'event' not in daily[later]
+    assert daily[later]['basis'] == plain[later]['basis'] == 'Avg of last 2 valid weeks'
+    assert plain[later]['forecasted_sales'] == daily_sales(*GAME_DAYS)
+    assert daily[later]['forecasted_sales'] == daily_sales(TODAY - timedelta(days=21),
+                                                           TODAY - timedelta(days=28))
+
+    hourly = {day['date']: day for day in get(client, '/api/forecasts/hourly?exclude=game_day')}
+    assert hourly[str(NEXT_GAME)]['event'] == 'game_day'
+    assert hourly[str(NEXT_GAME)]['basis'] == 'Avg of last 2 game days'
+    assert 'event' not in hourly[later]
+
+
+def test_closures_forecast_nothing(client):
+    add_events([(str(NEXT_GAME), 'closure', 'Cafe closed')])
+    daily = {day['date']: day for day in get(client, '/api/forecasts/daily?exclude=game_day,closure')}
+    closed = daily[str(NEXT_GAME)]
+    assert closed['event'] == 'closure'
+    assert closed['basis'] == 'Closed' and closed['forecasted_sales'] == 0
+
+    items = get(client, '/api/forecasts/items?exclude=closure')
+    latte = next(item for item in items if item['item_id'] == 1)
+    plain = next(item for item in get(client, '/api/forecasts/items') if item['item_id'] == 1)
+    assert latte['total_forecast'] < plain['total_forecast']
+
+
+def test_forecasts_without_exclude_are_unchanged(client):
+    before = {url: get(client, url) for url in FORECAST_URLS}
+    add_events([(str(TODAY + timedelta(days=3)), 'holiday', None)])
+    # New calendar days don't change forecasts that don't ask for them
+    assert {url: get(client, url) for url in FORECAST_URLS} == before
+
+
+def test_admin_event_calendar(client):
+    response = client.post('/api/admin/event-calendar', json={
+        'events': [{'date': '2026-09-05', 'type': 'game_day', 'name': 'Cal vs. Oregon'},
+                   {'date': '2026-09-12', 'type': 'game_day'}],
+        'replace': True,
+    })
+    assert response.status_code == 200
+    assert response.get_json()['data'] == {'imported': 2}
+
+    events = client.get('/api/admin/event-calendar?type=game_day').get_json()['data']
+    assert events == [
+        {'date': '2026-09-05', 'type': 'game_day', 'name': 'Cal vs. Oregon'},
+        {'date': '2026-09-12', 'type': 'game_day', 'name': None},
+    ]
+    # replace only dropped the other game days
+    assert [e['date'] for e in client.get('/api/admin/event-calendar').get_json()['data']] == sorted(
+        ['2026-09-05', '2026-09-12', str(HOLIDAY)])
+
+    for body in ({'events': [{'date': '2026-09-19', 'type': 'concert'}]}, {'events': 'x'}, {}):
+        assert client.post('/api/admin/event-calendar', json=body).status_code == 400
+    assert len(client.get('/api/admin/event-calendar?type=game_day').get_json()['data']) == 2
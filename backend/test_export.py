@@ -0,0 +1,122 @@
+"""Tests for the streaming exports (row_export.py, reports/export.py) and report CSV."""
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import report_cache
+import row_export
+from extensions import cache
+from reports.export import TRANSACTIONS_EXPORT_SQL, export_bp
+from reports.items import items_bp
+from reports.meta import meta_bp
+from test_query_plans import RANGE, build_fixture_db
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / 'export.db'
+    build_fixture_db(path, with_rollup=False)
+    monkeypatch.setattr(database, 'DB_PATH', str(path))
+
+    pool = database.ConnectionPool(database.get_db)
+    monkeypatch.setattr(database, 'pool', pool)
+    monkeypatch.setattr(report_cache, 'pool', pool)
+
+    app = Flask(__name__)
+    cache.init_app(app, config={'CACHE_TYPE': 'NullCache'})
+    for bp in (export_bp, items_bp, meta_bp):
+        app.register_blueprint(bp)
+
+    yield app.test_client(), pool
+    pool.close_all()
+
+
+def test_transactions_stream_in_batches(client, monkeypatch):
+    client, pool = client
+    monkeypatch.setattr(row_export, 'EXPORT_BATCH_ROWS', 10)
+
+    response = client.get(f'/api/export/transactions?{RANGE}')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'transactions_2026-03-01_2026-03-31.csv' in response.headers['Content-Disposition']
+
+    chunks = list(response.response)
+    response.close()
+    # 112 rows, sent 10 at a time (the header goes with the first batch)
+    assert len(chunks) == 12
+    rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))
+    assert len(rows) == 112
+    assert [r['transaction_date'] for r in rows] == sorted(r['transaction_date'] for r in rows)
+    assert rows[0]['transaction_date'] == '2026-03-01 08:15:00'
+    assert rows[0]['total_amount'] == '4'
+    # The connection went back to the pool once the response closed
+    assert pool.stats()['in_use_connections'] == 0
+
+
+def test_transactions_ndjson(client):
+    client, _ = client
+    response = client.get('/api/export/transactions?start=2026-03-02&end=2026-03-02&format=ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 4
+    assert lines[0]['transaction_date'] == '2026-03-02 08:15:00'
+    assert set(lines[0]) == {
+        'transaction_id', 'transaction_date', 'item_id', 'item_name', 'category',
+        'quantity', 'register_num', 'unit_price', 'total_amount',
+    }
+
+
+@pytest.mark.parametrize('url', [
+    '/api/export/transactions?format=xml',
+    '/api/export/transactions?start=2026-02-30',
+    f'/api/reports/items-by-revenue?{RANGE}&format=xml',
+])
+def test_bad_params_are_rejected(client, url):
+    client, pool = client
+    response = client.get(url)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert pool.stats()['in_use_connections'] == 0
+
+
+def test_export_streams_off_the_date_index(client):
+    conn = sqlite3.connect(database.DB_PATH)
+    try:
+        plan = [row[3] for row in conn.execute(
+            f'EXPLAIN QUERY PLAN {TRANSACTIONS_EXPORT_SQL}', ('2026-03-01', '2026-04-01')
+        )]
+    finally:
+        conn.close()
+    assert not any('TEMP B-TREE' in detail for detail in plan), plan
+
+
+def test_report_csv_matches_json(client):
+    client, _ = client
+    url = f'/api/reports/items-by-revenue?{RANGE}'
+    data = client.get(url).get_json()['data']
+
+    response = client.get(f'{url}&format=csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'items-by-revenue.csv' in response.headers['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [r['item_name'] for r in rows] == [item['item_name'] for item in data]
+    assert [float(r['revenue']) for r in rows] == [item['revenue'] for item in data]
+
+
+def test_report_csv_single_object():
+    assert row_export.report_csv({'success': True, 'data': {
+        'total_sales': 12.5, 'range': {'start': '2026-03-01'}, 'hours': [1, 2],
+    }}) == 'total_sales,range.start,hours\n12.5,2026-03-01,"[1,2]"\n'
@@ -0,0 +1,104 @@
+"""Tests for forecast_backtest.py."""
+
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_DIR = os.path.join(BACKEND_DIR, '..', 'database')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.append(DATABASE_DIR)
+
+import forecast_backtest
+from transaction_time_columns import ensure_time_columns
+
+YESTERDAY = date.today() - timedelta(days=1)
+
+
+def build_db(path, weekend_boost=1):
+    """Eight weeks of the same sales every day (times weekend_boost on the last two Saturdays)."""
+    with open(os.path.join(DATABASE_DIR, 'schema.sql')) as f:
+        schema = f.read().replace('CREATE TABLE sqlite_sequence(name,seq);', '')
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.executemany(
+        "INSERT INTO items (item_id, item_name, category, current_price, current_cost, is_resold) "
+        "VALUES (?, ?, ?, 4.0, 1.0, 0)",
+        [(1, 'Latte', 'coffeetea'), (2, 'Scone', 'baked goods'), (3, 'Never Sold', 'coffeetea')],
+    )
+    rows = []
+    for back in range(56):
+        day = YESTERDAY - timedelta(days=back)
+        boost = weekend_boost if day.weekday() == 5 and back < 14 else 1
+        for hour in (8, 13):
+            for item_id, qty in ((1, 2), (2, 3)):
+                rows.append((f'{day} {hour:02d}:15:00', item_id, qty * boost, qty * boost * 4.0))
+    conn.executemany(
+        "INSERT INTO transactions (transaction_date, item_id, item_name, category, "
+        "quantity, register_num, unit_price, total_amount) VALUES (?, ?, 'x', 'x', ?, 1, 4.0, ?)",
+        rows,
+    )
+    ensure_time_columns(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def results(rows):
+    return {(level, key): tuple(row) for level, key, *row in rows}
+
+
+def test_steady_sales_forecast_exactly(tmp_path):
+    path = str(tmp_path / 'steady.db')
+    build_db(path)
+    run_id, rows = forecast_backtest.run_backtest(path, workers=1)
+    by_key = results(rows)
+
+    # Replay starts once four weeks of history exist and stops the day before yesterday
+    first = YESTERDAY - timedelta(days=55 - forecast_backtest.HISTORY_DAYS)
+    replay_days = (YESTERDAY - timedelta(days=1) - first).days + 1
+    scored = sum(min(21, (YESTERDAY - day).days)
+                 for day in (first + timedelta(days=i) for i in range(replay_days)))
+    assert by_key[('daily', 'all')] == (scored, 0.0, 0.0, 40.0 * scored, 40.0 * scored)
+    assert by_key[('item', '1')][1:3] == (0.0, 0.0)
+    assert by_key[('category', 'baked goods')][1:3] == (0.0, 0.0)
+    assert by_key[('hour', '13:00')][1:3] == (0.0, 0.0)
+    # Nothing sold: no percentage error to report
+    assert by_key[('item', '3')][1:3] == (None, None)
+    assert by_key[('hour', '07:00')][1:3] == (None, None)
+    assert {key for level, key in by_key if level == 'horizon'} == {'1', '2', '3'}
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('SELECT replay_days FROM forecast_backtest_runs WHERE run_id = ?',
+                            (run_id,)).fetchone() == (replay_days,)
+        assert conn.execute('SELECT COUNT(*) FROM forecast_backtest_results WHERE run_id = ?',
+                            (run_id,)).fetchone()[0] == len(rows)
+    finally:
+        conn.close()
+
+
+def test_workers_match_single_process(tmp_path):
+    path = str(tmp_path / 'weekend.db')
+    build_db(path, weekend_boost=3)
+    start = YESTERDAY - timedelta(days=20)
+    _, serial = forecast_backtest.run_backtest(path, start=start, workers=1)
+    run_id, parallel = forecast_backtest.run_backtest(path, start=start, workers=2)
+
+    assert parallel == serial
+    # Saturdays picked up recently, so some forecasts miss
+    daily = results(serial)[('daily', 'all')]
+    assert daily[1] > 0
+
+    report = forecast_backtest.format_report(path, run_id)
+    assert f'Forecast backtest #{run_id}' in report
+    assert 'Latte' in report and 'week 3' in report and '13:00' in report
+
+
+def test_empty_range_is_rejected(tmp_path):
+    path = str(tmp_path / 'steady.db')
+    build_db(path)
+    with pytest.raises(SystemExit):
+        forecast_backtest.run_backtest(path, start=YESTERDAY, workers=1)
@@ -0,0 +1,221 @@
+"""Tests for forecast_job.py and the forecast endpoints' materialized reads."""
+
+import os
+import sqlite3
+import sys
+import types
+from datetime import date, datetime, timedelta
+
+import pytest
+from flask import Flask
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_DIR = os.path.join(BACKEND_DIR, '..', 'database')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.append(DATABASE_DIR)
+
+import cache_warmer
+import database
+import forecast_job
+import report_cache
+from admin.admin import admin_bp
+from data_version import ensure_data_version_tracking
+from extensions import cache
+from forecasts import forecasts
+from transaction_time_columns import ensure_time_columns
+
+FORECAST_URLS = [
+    '/api/forecasts/daily',
+    '/api/forecasts/hourly',
+    '/api/forecasts/hourly?target_pct=20',
+    '/api/forecasts/items',
+    '/api/forecasts/categories',
+]
+
+
+def build_db(path, today):
+    with open(os.path.join(DATABASE_DIR, 'schema.sql')) as f:
+        schema = f.read().replace('CREATE TABLE sqlite_sequence(name,seq);', '')
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.executemany(
+        "INSERT INTO items (item_id, item_name, category, current_price, current_cost, is_resold) "
+        "VALUES (?, ?, ?, 4.0, 1.0, 0)",
+        [(1, 'Latte', 'coffeetea'), (2, 'Scone', 'baked goods'), (3, 'New Tea', 'coffeetea')],
+    )
+    conn.execute("INSERT INTO settings (setting_key, setting_value) VALUES ('hourly_labor_rate', '20.0')")
+    # Item 3 has never sold; the other two sell more on some weekdays than others
+    conn.executemany(
+        "INSERT INTO transactions (transaction_date, item_id, item_name, category, "
+        "quantity, register_num, unit_price, total_amount) VALUES (?, ?, 'x', 'x', ?, 1, 4.25, ?)",
+        [(f'{today - timedelta(days=back)} {hour:02d}:15:00', item_id, qty, qty * 4.25)
+         for back in range(1, 31) for hour in (8, 9, 13) for item_id in (1, 2)
+         for qty in [1 + (back * item_id + hour) % 4]],
+    )
+    ensure_time_columns(conn.cursor())
+    ensure_data_version_tracking(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = str(tmp_path / 'forecasts.db')
+    build_db(path, date.today())
+    monkeypatch.setattr(database, 'DB_PATH', path)
+
+    pool = database.ConnectionPool(database.get_db)
+    monkeypatch.setattr(database, 'pool', pool)
+    monkeypatch.setattr(report_cache, 'pool', pool)
+
+    app = Flask(__name__)
+    cache.init_app(app, config={'CACHE_TYPE': 'NullCache'})
+    app.register_blueprint(forecasts.forecasts_bp)
+
+    yield app.test_client()
+    pool.close_all()
+
+
+def responses(client):
+    results = {}
+    for url in FORECAST_URLS:
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.get_json())
+        results[url] = response.get_json()
+    return results
+
+
+def stop_live_forecasts(monkeypatch):
+    def live(cursor, today):
+        raise AssertionError('computed live')
+    for name in ('daily_sales_rows', 'hourly_sales_rows', 'item_demand_rows', 'category_demand_rows'):
+        monkeypatch.setattr(forecasts, name, live)
+
+
+def write(sql, params=()):
+    conn = sqlite3.connect(database.DB_PATH)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def add_sale(day):
+    write("INSERT INTO transactions (transaction_date, item_id, item_name, category, "
+          "quantity, register_num, unit_price, total_amount) VALUES (?, 1, 'x', 'x', 1, 1, 4.25, 4.25)",
+          (f'{day} 20:15:00',))
+
+
+def generations(table):
+    conn = sqlite3.connect(database.DB_PATH)
+    try:
+        return dict(conn.execute(
+            f'SELECT generated_on, COUNT(*) FROM {table} GROUP BY generated_on'
+        ).fetchall())
+    finally:
+        conn.close()
+
+
+def test_materialized_forecasts_match_live(client, monkeypatch):
+    live = responses(client)
+    assert len(live['/api/forecasts/daily']['data']) == 21
+    new_tea = next(i for i in live['/api/forecasts/items']['data'] if i['item_id'] == 3)
+    assert new_tea['is_new'] and new_tea['total_forecast'] == 0
+
+    counts = forecast_job.run_forecast_job()
+    assert counts == {
+        'forecast_daily': 21,
+        'forecast_hourly': 21 * 15,
+        'forecast_item_daily': 3 * 21,
+        'forecast_category_daily': 2 * 21,
+    }
+
+    stop_live_forecasts(monkeypatch)
+    assert responses(client) == live
+
+
+def test_yesterdays_generation_is_not_served(client, monkeypatch):
+    forecast_job.run_forecast_job(today=date.today() - timedelta(days=1))
+    stop_live_forecasts(monkeypatch)
+    response = client.get('/api/forecasts/daily')
+    assert response.status_code == 500
+    assert 'computed live' in response.get_json()['error']
+
+
+def test_stale_generation_is_not_served(client, monkeypatch):
+    forecast_job.run_forecast_job()
+    stop_live_forecasts(monkeypatch)
+
+    # A sale before the forecast window leaves the generation current
+    add_sale(date.today() - timedelta(days=60))
+    assert client.get('/api/forecasts/daily').status_code == 200
+
+    add_sale(date.today() - timedelta(days=1))
+    response = client.get('/api/forecasts/daily')
+    assert response.status_code == 500
+    assert 'computed live' in response.get_json()['error']
+
+    # The scheduler's check regenerates it
+    assert forecast_job.run_forecast_job(only_if_missing=True)['forecast_daily'] == 21
+    assert client.get('/api/forecasts/daily').status_code == 200
+
+
+def test_untracked_database_is_computed_live(client, monkeypatch):
+    forecast_job.run_forecast_job()
+    write('DROP TABLE data_versions')
+    stop_live_forecasts(monkeypatch)
+    assert client.get('/api/forecasts/daily').status_code == 500
+
+
+def test_item_added_after_generation_forecasts_zero(client, monkeypatch):
+    forecast_job.run_forecast_job()
+    write("INSERT INTO items (item_id, item_name, category, current_price, current_cost, is_resold) "
+          "VALUES (4, 'Cold Brew', 'coffeetea', 5.0, 1.0, 0)")
+
+    # Catalog writes stamp the global version, so this generation is
+    # stale; the regenerated one covers the new item too
+    forecast_job.run_forecast_job(only_if_missing=True)
+    stop_live_forecasts(monkeypatch)
+    items = client.get('/api/forecasts/items').get_json()['data']
+    cold_brew = next(i for i in items if i['item_id'] == 4)
+    assert cold_brew['is_new'] and cold_brew['total_forecast'] == 0
+    assert cold_brew['weekly_forecast'][0]['start_date'] == (date.today() + timedelta(days=1)).isoformat()
+
+
+def test_rerun_replaces_todays_generation_and_prunes_old_ones(client):
+    today = date.today()
+    old = today - timedelta(days=forecast_job.KEEP_DAYS + 1)
+    kept = today - timedelta(days=forecast_job.KEEP_DAYS)
+    forecast_job.run_forecast_job(today=old)
+    forecast_job.run_forecast_job(today=kept)
+    forecast_job.run_forecast_job()
+    forecast_job.run_forecast_job()
+
+    assert generations('forecast_daily') == {kept.isoformat(): 21, today.isoformat(): 21}
+    assert generations('forecast_item_daily')[today.isoformat()] == 3 * 21
+
+
+def test_only_if_missing_skips_an_existing_generation(client):
+    assert forecast_job.run_forecast_job(only_if_missing=True)['forecast_daily'] == 21
+    assert forecast_job.run_forecast_job(only_if_missing=True) is None
+    assert forecast_job.last_run['generated_on'] == datetime.now().date().isoformat()
+
+
+def test_sync_reports_import_when_forecast_job_fails(client, monkeypatch):
+    importer = types.ModuleType('import_vivonet_data')
+    importer.import_vivonet = lambda start, end, store, db_path: {'inserted': 3}
+    monkeypatch.setitem(sys.modules, 'import_vivonet_data', importer)
+
+    def fail(db_path):
+        raise sqlite3.OperationalError('database is locked')
+    monkeypatch.setattr(forecast_job, 'run_forecast_job', fail)
+    monkeypatch.setattr(cache_warmer, 'start_cache_warmer', lambda app: None)
+
+    app = Flask(__name__)
+    app.register_blueprint(admin_bp)
+    response = app.test_client().post('/api/admin/sync-vivonet', json={})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['data'] == {'inserted': 3}
+    assert 'storing forecasts failed: database is locked' in body['message']
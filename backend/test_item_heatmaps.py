@@ -0,0 +1,50 @@
+"""Tests for the batch item-heatmaps endpoint (reports/items.py)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_query_plans import RANGE, EXCLUDE, traced  # noqa: F401 (fixture)
+
+
+def test_matrices_match_single_item_heatmaps(traced):
+    _, client, _, _ = traced
+    body = client.get(f'/api/reports/item-heatmaps?{RANGE}&item_ids=2,1,99&{EXCLUDE}').get_json()
+    assert [item['item_id'] for item in body['data']] == [2, 1, 99]
+
+    for item in body['data'][:2]:
+        single = client.get(
+            f'/api/reports/item-heatmap?{RANGE}&item_id={item["item_id"]}&{EXCLUDE}'
+        ).get_json()['data']
+        assert single
+        cells = {(row['day_num'], row['hour']): row for row in single}
+        for day in range(7):
+            for hour in range(24):
+                row = cells.get((day, hour), {'revenue': 0, 'units': 0})
+                assert item['revenue'][day][hour] == row['revenue']
+                assert item['units'][day][hour] == row['units']
+
+    unknown = body['data'][2]
+    assert unknown['item_name'] is None
+    assert unknown['revenue'] == [[0] * 24] * 7
+
+
+def test_top_and_category_rank_by_revenue(traced):
+    _, client, _, _ = traced
+    top = client.get(f'/api/reports/item-heatmaps?{RANGE}&top=1').get_json()['data']
+    assert len(top) == 1
+    top_items = client.get(f'/api/reports/top-items?{RANGE}').get_json()['data']
+    best = max(item['total_revenue'] for item in top_items)
+    assert top[0]['item_id'] in {item['item_id'] for item in top_items if item['total_revenue'] == best}
+
+    category = client.get(f'/api/reports/item-heatmaps?{RANGE}&category=coffeetea').get_json()
+    assert {item['item_id'] for item in category['data']} == {1, 2}
+    assert client.get(f'/api/reports/item-heatmaps?{RANGE}&category=none').get_json()['data'] == []
+
+
+def test_requires_an_item_selection(traced):
+    _, client, _, _ = traced
+    assert client.get(f'/api/reports/item-heatmaps?{RANGE}').status_code == 400
+    assert client.get(f'/api/reports/item-heatmaps?{RANGE}&item_ids=1,x').status_code == 400
+    assert client.get(f'/api/reports/item-heatmaps?{RANGE}&top=0').status_code == 400
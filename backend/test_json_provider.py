@@ -0,0 +1,56 @@
+"""Tests for json_provider.py: orjson output must match Flask's default encoder."""
+
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from json_provider import FastJSONProvider, orjson
+
+pytestmark = pytest.mark.skipif(orjson is None, reason='orjson not installed')
+
+
+@dataclass
+class Point:
+    x: int
+    y: float
+
+
+PAYLOAD = {
+    'success': True,
+    'data': [
+        {'item_name': 'Latte', 'revenue': 1234.5, 'units_sold': 321, 'ratio': 0.1 + 0.2},
+        {'item_name': 'Scone', 'revenue': 0.0, 'units_sold': 0, 'ratio': None},
+    ],
+    'date_range': {'start': '2026-01-01', 'end': '2026-01-31'},
+    'when': date(2026, 1, 31),
+    'stamp': datetime(2026, 1, 31, 8, 30),
+    'amount': Decimal('12.30'),
+    'point': Point(1, 2.5),
+}
+
+
+def test_matches_default_provider_output():
+    app = Flask(__name__)
+    fast, default = FastJSONProvider(app), DefaultJSONProvider(app)
+    with app.app_context():
+        assert fast.response(PAYLOAD).get_data() == default.response(PAYLOAD).get_data()
+        assert fast.response(PAYLOAD).mimetype == 'application/json'
+
+
+def test_non_string_keys_and_debug_mode():
+    app = Flask(__name__)
+    fast = FastJSONProvider(app)
+    with app.app_context():
+        assert json.loads(fast.response({7: 'a', 1: 'b'}).get_data()) == {'7': 'a', '1': 'b'}
+        # Debug mode keeps the default provider's pretty-printing
+        app.debug = True
+        assert fast.response({'a': 1}).get_data() == b'{\n  "a": 1\n}\n'
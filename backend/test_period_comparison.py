@@ -0,0 +1,50 @@
+"""Tests for the N-way period-comparison endpoint (reports/items.py)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from reports.items import parse_period
+from test_query_plans import RANGE, traced  # noqa: F401 (fixture)
+
+
+def test_parse_period():
+    assert parse_period('morning:1,2,3,4,5:9-12') == ('morning', [1, 2, 3, 4, 5], 9, 12)
+    for spec in ('morning', 'am:7:9-12', 'am:1:12-9', 'am:1:9', ':1:9-12'):
+        with pytest.raises(ValueError):
+            parse_period(spec)
+
+
+def test_periods_match_time_period_comparison(traced):
+    _, client, _, _ = traced
+    # Overlapping periods: each sale counts toward both
+    body = client.get(
+        f'/api/reports/period-comparison?{RANGE}'
+        '&period=early:1,2,3,4,5:8-9&period=all:0,1,2,3,4,5,6:0-24&period=none:0:0-1'
+    ).get_json()
+    assert [p['name'] for p in body['periods']] == ['early', 'all', 'none']
+    assert {row['item_id'] for row in body['data']} == {1, 2}
+
+    for row in body['data']:
+        single = client.get(
+            f'/api/reports/time-period-comparison?{RANGE}&item_id={row["item_id"]}'
+            '&period_a_days=1,2,3,4,5&period_a_start_hour=8&period_a_end_hour=9'
+            '&period_b_days=0,1,2,3,4,5,6&period_b_start_hour=0&period_b_end_hour=24'
+        ).get_json()['data']
+        for name, key in (('early', 'period_a'), ('all', 'period_b')):
+            expected = {k: single[key][k] for k in ('revenue', 'days_counted', 'units_sold', 'avg_per_day')}
+            assert row['periods'][name] == expected
+        assert row['periods']['none'] == {'revenue': 0, 'days_counted': 0, 'units_sold': 0, 'avg_per_day': 0}
+
+
+def test_item_selection_and_validation(traced):
+    _, client, _, _ = traced
+    url = f'/api/reports/period-comparison?{RANGE}&period=am:1:8-12'
+    assert [row['item_id'] for row in client.get(f'{url}&item_ids=2').get_json()['data']] == [2]
+    assert client.get(f'{url}&category=none').get_json()['data'] == []
+    assert client.get(f'/api/reports/period-comparison?{RANGE}').status_code == 400
+    assert client.get(f'{url}&period=am:2:8-12').status_code == 400
+    assert client.get(f'{url}&item_ids=x').status_code == 400
@@ -0,0 +1,202 @@
+"""
+Query-plan regression tests for the report endpoints.
+
+Every report route is requested against a fixture database built from
+database/schema.sql plus the time-column migration; each SQL statement the
+views run is captured and re-run under EXPLAIN QUERY PLAN. A statement
+fails the test if it:
+
+- scans `transactions` or `sales_hourly_rollup` instead of searching a
+  range, or
+- reads `transactions` through an index that doesn't cover the query
+  (unless the route is listed in NOT_COVERED with a reason).
+"""
+
+import os
+import re
+import sqlite3
+import sys
+
+import pytest
+from flask import Flask
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_DIR = os.path.join(BACKEND_DIR, '..', 'database')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.append(DATABASE_DIR)
+
+import database
+import report_cache
+from cost_intervals import ensure_cost_intervals
+from extensions import cache
+from forecasts.forecasts import forecasts_bp
+from reports.dashboard import dashboard_bp
+from reports.export import export_bp
+from reports.items import items_bp
+from reports.labor import labor_bp
+from reports.meta import meta_bp
+from sales_rollup import rebuild_rollup
+from transaction_time_columns import ensure_time_columns
+
+RANGE = 'start=2026-03-01&end=2026-03-31'
+EXCLUDE = 'exclude_dates=2026-03-07,2026-03-14'
+
+REPORT_URLS = [
+    '/api/data-freshness',
+    f'/api/total-sales?{RANGE}',
+    '/api/items',
+    f'/api/reports/top-items?{RANGE}',
+    f'/api/reports/revenue-trends?{RANGE}&granularity=week',
+    f'/api/reports/revenue-trends?{RANGE}&granularity=month',
+    f'/api/reports/revenue-trends?{RANGE}&granularity=day',
+    '/api/reports/revenue-trends?start=2025-07-01&end=2026-06-30&granularity=quarter',
+    '/api/reports/revenue-trends?start=2025-07-01&end=2026-06-30&granularity=fiscal_year',
+    f'/api/reports/items-by-revenue?{RANGE}',
+    f'/api/reports/items-by-revenue?{RANGE}&item_type=purchased',
+    f'/api/reports/items-by-profit?{RANGE}',
+    '/api/reports/items-by-margin',
+    f'/api/reports/item-heatmap?{RANGE}&item_id=1&{EXCLUDE}',
+    f'/api/reports/item-heatmaps?{RANGE}&item_ids=1,2&{EXCLUDE}',
+    f'/api/reports/item-heatmaps?{RANGE}&top=5&category=coffeetea',
+    f'/api/reports/time-period-comparison?{RANGE}&item_id=1',
+    f'/api/reports/period-comparison?{RANGE}&period=am:1,2,3,4,5:8-9&period=pm:0,6:9-17',
+    f'/api/reports/period-comparison?{RANGE}&period=am:1:8-12&category=coffeetea',
+    f'/api/reports/period-comparison?{RANGE}&period=am:1:8-12&item_ids=1,2',
+    '/api/reports/sales-per-hour?mode=single&date=2026-03-02',
+    f'/api/reports/sales-per-hour?{RANGE}&mode=day-of-week&{EXCLUDE}',
+    f'/api/reports/sales-per-hour?{RANGE}&{EXCLUDE}',
+    f'/api/reports/labor-percent?{RANGE}&{EXCLUDE}',
+    f'/api/dashboard/summary?{RANGE}',
+    '/api/forecasts/daily',
+    '/api/forecasts/hourly',
+    '/api/forecasts/items',
+    '/api/forecasts/categories',
+    '/api/forecasts/hourly?engine=numpy',
+    '/api/forecasts/categories?engine=numpy&weeks=52&method=trimmed',
+    f'/api/export/transactions?{RANGE}',
+]
+
+# Routes allowed to read `transactions` through a non-covering index
+NOT_COVERED = {
+    '/api/reports/items-by-profit': 'needs unit_price for each line',
+    '/api/export/transactions': 'exports every column of each line',
+}
+
+SALES_TABLES = ('transactions', 'sales_hourly_rollup')
+PLAN_ACCESS = re.compile(r'^(SCAN|SEARCH) (\w+)(?: USING (.*))?')
+SQL_KEYWORDS = {'where', 'join', 'inner', 'left', 'on', 'group', 'order', 'limit', 'union'}
+
+
+def build_fixture_db(path, with_rollup):
+    with open(os.path.join(DATABASE_DIR, 'schema.sql')) as f:
+        schema = f.read().replace('CREATE TABLE sqlite_sequence(name,seq);', '')
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.executemany(
+        "INSERT INTO items (item_id, item_name, category, current_price, current_cost, is_resold) "
+        "VALUES (?, ?, 'coffeetea', 4.0, 1.0, ?)",
+        [(1, 'Latte', 0), (2, 'Scone', 1)],
+    )
+    conn.execute(
+        "INSERT INTO item_cost_history (item_id, cost, effective_date) VALUES (1, 1.0, '2026-01-01')"
+    )
+    conn.executemany(
+        "INSERT INTO transactions (transaction_date, item_id, item_name, category, "
+        "quantity, register_num, unit_price, total_amount) "
+        "VALUES (?, ?, 'x', 'coffeetea', 1, 1, 4.0, 4.0)",
+        [(f'2026-03-{day:02d} 0{hour}:15:00', item_id)
+         for day in range(1, 29) for hour in (8, 9) for item_id in (1, 2)],
+    )
+    conn.execute(
+        "INSERT INTO labor_hours (shift_date, shift_start, shift_end, employee_name, employee_type) "
+        "VALUES ('2026-03-02', '2026-03-02 08:00:00', '2026-03-02 12:00:00', 'Sam', 'hourly')"
+    )
+    cursor = conn.cursor()
+    ensure_time_columns(cursor)
+    ensure_cost_intervals(cursor)
+    if with_rollup:
+        rebuild_rollup(cursor)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture(params=['transactions', 'rollup'])
+def traced(request, tmp_path, monkeypatch):
+    """App client plus the list of (path, sql) statements it executes."""
+    path = tmp_path / 'plans.db'
+    build_fixture_db(path, with_rollup=request.param == 'rollup')
+    monkeypatch.setattr(database, 'DB_PATH', str(path))
+
+    statements = []
+    current = {'path': None}
+
+    def traced_db():
+        conn = database.get_db()
+        conn.set_trace_callback(lambda sql: statements.append((current['path'], sql)))
+        return conn
+
+    pool = database.ConnectionPool(traced_db)
+    monkeypatch.setattr(database, 'pool', pool)
+    monkeypatch.setattr(report_cache, 'pool', pool)
+
+    app = Flask(__name__)
+    cache.init_app(app, config={'CACHE_TYPE': 'NullCache'})
+    for bp in (dashboard_bp, export_bp, forecasts_bp, items_bp, labor_bp, meta_bp):
+        app.register_blueprint(bp)
+
+    yield app, app.test_client(), current, statements
+    pool.close_all()
+
+
+def sales_table_aliases(sql):
+    """Map each name `transactions`/`sales_hourly_rollup` is read under to its table."""
+    aliases = {}
+    for table in SALES_TABLES:
+        if re.search(rf'\b{table}\b', sql):
+            aliases[table] = table
+        for alias in re.findall(rf'\b{table}\s+(?:AS\s+)?(\w+)', sql, re.IGNORECASE):
+            if alias.lower() not in SQL_KEYWORDS:
+                aliases[alias] = table
+    return aliases
+
+
+def plan_problems(conn, route, sql):
+    aliases = sales_table_aliases(sql)
+    if not aliases or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return []
+    problems = []
+    for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}'):
+        detail = row[3]
+        match = PLAN_ACCESS.match(detail)
+        if not match or match.group(2) not in aliases:
+            continue
+        table = aliases[match.group(2)]
+        if match.group(1) == 'SCAN':
+            problems.append(f'{route}: full scan of {table}: {detail}')
+        elif (table == 'transactions' and route not in NOT_COVERED
+              and 'COVERING INDEX' not in detail and 'PRIMARY KEY' not in detail):
+            problems.append(f'{route}: non-covering index on transactions: {detail}')
+    return problems
+
+
+def test_report_urls_cover_every_route(traced):
+    app = traced[0]
+    routes = {rule.rule for rule in app.url_map.iter_rules() if rule.rule.startswith('/api/')}
+    requested = {url.split('?')[0] for url in REPORT_URLS}
+    assert routes - requested == set()
+
+
+def test_report_queries_use_index_range_scans(traced):
+    _, client, current, statements = traced
+    for url in REPORT_URLS:
+        current['path'] = url.split('?')[0]
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.get_json())
+
+    conn = sqlite3.connect(database.DB_PATH)
+    try:
+        problems = [p for route, sql in statements for p in plan_problems(conn, route, sql)]
+    finally:
+        conn.close()
+    assert problems == []
+    assert any('transactions' in sql or 'sales_hourly_rollup' in sql for _, sql in statements)
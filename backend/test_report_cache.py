@@ -0,0 +1,262 @@
+"""Tests for the data-versioned report cache in report_cache.py."""
+
+import gzip
+import json
+import os
+import sqlite3
+import sys
+from datetime import date
+
+import pytest
+from flask import Flask, jsonify
+from werkzeug.datastructures import MultiDict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+from extensions import cache
+from report_cache import CATALOG, cached_report, catalog_span, is_historical, report_cache_key, request_span
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / 'cache_test.db'
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE data_versions (scope TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+    conn.executemany('INSERT INTO data_versions VALUES (?, ?)', [
+        ('sequence', 2), ('global', 1), ('day:2020-01-15', 2),
+    ])
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(database, 'DB_PATH', str(path))
+    return path
+
+
+@pytest.fixture
+def client(db_path):
+    app = Flask(__name__)
+    cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
+    calls = []
+
+    @app.route('/report')
+    @cached_report(timeout=60)
+    def report():
+        calls.append(1)
+        return {'success': True, 'data': len(calls)}
+
+    @app.route('/catalog')
+    @cached_report(timeout=60, span=catalog_span)
+    def catalog():
+        calls.append(1)
+        return {'success': True, 'data': len(calls)}
+
+    @app.route('/big')
+    @cached_report(timeout=60)
+    def big():
+        calls.append(1)
+        return {'success': True, 'data': [{'hour': h, 'sales': 1.5} for h in range(500)]}
+
+    @app.route('/broken')
+    @cached_report(timeout=60)
+    def broken():
+        calls.append(1)
+        return jsonify({'success': False}), 500
+
+    with app.app_context():
+        cache.clear()
+    client = app.test_client()
+    client.calls = calls
+    return client
+
+
+def stamp(db_path, scope):
+    """Stamp a scope the way the data_version triggers do."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE data_versions SET version = version + 1 WHERE scope = 'sequence'")
+    conn.execute("""
+        INSERT INTO data_versions VALUES (?, (SELECT version FROM data_versions WHERE scope = 'sequence'))
+        ON CONFLICT(scope) DO UPDATE SET version = excluded.version
+    """, (scope,))
+    conn.commit()
+    conn.close()
+
+
+def test_cached_until_data_version_changes(client, db_path):
+    assert client.get('/report?end=2020-01-31&start=2020-01-01').json['data'] == 1
+    # Same args in a different order hit the same entry
+    assert client.get('/report?start=2020-01-01&end=2020-01-31').json['data'] == 1
+    assert len(client.calls) == 1
+
+    stamp(db_path, 'global')
+    assert client.get('/report?start=2020-01-01&end=2020-01-31').json['data'] == 2
+
+
+def test_only_writes_inside_span_invalidate(client, db_path):
+    january = '/report?start=2020-01-01&end=2020-01-31'
+    march = '/report?start=2020-03-01&end=2020-03-31'
+    client.get(january)
+    client.get(march)
+    assert len(client.calls) == 2
+
+    # Syncing a day in March leaves January cached
+    stamp(db_path, 'day:2020-03-10')
+    client.get(january)
+    assert len(client.calls) == 2
+    client.get(march)
+    assert len(client.calls) == 3
+
+    # An older day inside January still invalidates it, even though a
+    # newer day (2020-01-15) already carries a higher stamp
+    stamp(db_path, 'day:2020-01-02')
+    client.get(january)
+    assert len(client.calls) == 4
+
+
+def test_error_responses_are_not_cached(client):
+    assert client.get('/broken').status_code == 500
+    assert client.get('/broken').status_code == 500
+    assert len(client.calls) == 2
+
+
+def test_invalid_dates_are_rejected_before_the_view(client):
+    for query in ('start=bad', 'end=2020-02-30', 'date=2020-01-32'):
+        assert client.get(f'/report?{query}').status_code == 400
+    assert client.calls == []
+
+
+def test_untracked_database_still_caches(client, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute('DROP TABLE data_versions')
+    conn.commit()
+    conn.close()
+
+    client.get('/report')
+    client.get('/report')
+    assert len(client.calls) == 1
+
+
+def test_matching_etag_returns_304_without_running_the_view(client, db_path):
+    first = client.get('/report?start=2020-01-01&end=2020-01-31')
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    # Revalidation skips the view and the body; argument order doesn't matter
+    revalidated = client.get('/report?end=2020-01-31&start=2020-01-01',
+                             headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+    assert len(client.calls) == 1
+
+    # Cache hits carry the same validator
+    assert client.get('/report?start=2020-01-01&end=2020-01-31').headers['ETag'] == etag
+
+    # A write inside the span changes the ETag, so the old one no longer matches
+    stamp(db_path, 'day:2020-01-20')
+    changed = client.get('/report?start=2020-01-01&end=2020-01-31',
+                         headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert len(client.calls) == 2
+
+
+def test_no_etag_without_data_version_or_on_errors(client, db_path):
+    assert 'ETag' not in client.get('/broken').headers
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('DROP TABLE data_versions')
+    conn.commit()
+    conn.close()
+    assert 'ETag' not in client.get('/report').headers
+
+
+def test_catalog_views_ignore_dated_writes(client, db_path):
+    etag = client.get('/catalog').headers['ETag']
+    stamp(db_path, 'day:2020-01-20')
+    assert client.get('/catalog', headers={'If-None-Match': etag}).status_code == 304
+    stamp(db_path, 'global')
+    assert client.get('/catalog', headers={'If-None-Match': etag}).status_code == 200
+    assert len(client.calls) == 2
+
+
+def test_large_responses_are_compressed_once_and_negotiated(client):
+    plain = client.get('/big')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+
+    zipped = client.get('/big', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert len(zipped.data) < len(plain.data)
+    assert json.loads(gzip.decompress(zipped.data)) == plain.json
+    # Each encoding is its own representation
+    assert zipped.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    assert len(client.calls) == 1
+
+    assert 'Content-Encoding' not in client.get('/big', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+    # Either validator revalidates
+    assert client.get('/big', headers={'If-None-Match': zipped.headers['ETag']}).status_code == 304
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get('/report', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Vary' not in response.headers
+
+
+def test_only_spans_ending_before_today_are_historical():
+    today = date(2026, 3, 10)
+    assert is_historical((date(2026, 1, 1), date(2026, 3, 9)), today)
+    assert not is_historical((date(2026, 1, 1), date(2026, 3, 10)), today)
+    assert not is_historical(None, today)
+    assert is_historical(CATALOG, today)
+
+
+def test_request_span_mirrors_report_args():
+    app = Flask(__name__)
+    with app.test_request_context('/r?start=2026-01-01&end=2026-01-31'):
+        assert request_span() == (date(2026, 1, 1), date(2026, 1, 31))
+    with app.test_request_context('/r?date=2026-02-03&start=2026-01-01'):
+        assert request_span() == (date(2026, 2, 3), date(2026, 2, 3))
+    with app.test_request_context('/r?end=bad'):
+        assert request_span() is None
+    with app.test_request_context('/r'):
+        start, end = request_span()
+        assert (end - start).days == 90
+
+
+def test_live_keys_roll_over_daily():
+    args = MultiDict({'start': '2026-01-01'})
+    monday = report_cache_key('/r', args, 'v1', False, date(2026, 3, 9))
+    tuesday = report_cache_key('/r', args, 'v1', False, date(2026, 3, 10))
+    assert monday != tuesday
+    assert (report_cache_key('/r', args, 'v1', True, date(2026, 3, 9))
+            == report_cache_key('/r', args, 'v1', True, date(2026, 3, 10)))
+
+
+def test_exclude_dates_are_canonical_in_keys():
+    span = (date(2026, 3, 1), date(2026, 3, 31))
+
+    def key(exclude):
+        args = MultiDict({'start': '2026-03-01', 'end': '2026-03-31', 'exclude_dates': exclude})
+        return report_cache_key('/r', args, 'v1', True, span=span)
+
+    canonical = key('2026-03-07,2026-03-14')
+    assert key('2026-03-14,2026-03-07,2026-03-14') == canonical
+    assert key('2026-03-07, 2026-03-14,2026-04-02') == canonical
+    assert key('2026-03-07') != canonical
+    # Invalid lists keep their own key; the view reports the error
+    assert key('2026-03-07,bad') != canonical
+
+
+def test_exclude_types_are_canonical_in_keys():
+    span = (date(2026, 3, 1), date(2026, 3, 31))
+
+    def key(exclude):
+        args = MultiDict({'start': '2026-03-01', 'end': '2026-03-31', 'exclude': exclude})
+        return report_cache_key('/r', args, 'v1', True, span=span)
+
+    canonical = key('game_day,holiday')
+    assert key('holiday, game_day,holiday') == canonical
+    assert key('game_day') != canonical
+    assert key('game_day,concert') != canonical
@@ -0,0 +1,112 @@
+"""Tests for ?layout=columnar (utils.success_response)."""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import report_cache
+from extensions import cache
+from reports.dashboard import dashboard_bp
+from reports.items import items_bp
+from reports.labor import labor_bp
+from reports.meta import meta_bp
+from test_query_plans import RANGE, REPORT_URLS, build_fixture_db
+from utils import columnar_rows, success_response
+
+REPORTS = [url for url in REPORT_URLS if url.startswith('/api/reports/')]
+
+
+@pytest.fixture(params=['transactions', 'rollup'])
+def client(request, tmp_path, monkeypatch):
+    path = tmp_path / 'layout.db'
+    build_fixture_db(path, with_rollup=request.param == 'rollup')
+    monkeypatch.setattr(database, 'DB_PATH', str(path))
+
+    pool = database.ConnectionPool(database.get_db)
+    monkeypatch.setattr(database, 'pool', pool)
+    monkeypatch.setattr(report_cache, 'pool', pool)
+
+    app = Flask(__name__)
+    cache.init_app(app, config={'CACHE_TYPE': 'NullCache'})
+    for bp in (dashboard_bp, items_bp, labor_bp, meta_bp):
+        app.register_blueprint(bp)
+
+    yield app.test_client()
+    pool.close_all()
+
+
+def get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.get_json())
+    return response.get_json()
+
+
+def test_every_report_supports_columnar(client):
+    for url in REPORTS:
+        rows = get(client, url)
+        columnar = get(client, f'{url}&layout=columnar' if '?' in url else f'{url}?layout=columnar')
+        if not isinstance(rows['data'], list):
+            assert columnar == rows, url
+            continue
+
+        columns = columnar.pop('columns')
+        data = columnar.pop('data')
+        assert columnar == {k: v for k, v in rows.items() if k != 'data'}, url
+        assert sorted(data) == sorted(columns), url
+        assert [dict(zip(columns, values)) for values in zip(*(data[c] for c in columns))] \
+            == rows['data'], url
+
+
+def test_csv_keeps_query_column_order(client):
+    url = f'/api/reports/items-by-revenue?{RANGE}&format=csv'
+    csv_text = client.get(url).get_data(as_text=True)
+    assert csv_text.splitlines()[0] == 'item_id,item_name,category,is_resold,units_sold,revenue'
+    assert client.get(f'{url}&layout=columnar').data == csv_text.encode()
+
+
+def test_csv_of_an_empty_range_still_has_a_header(client):
+    empty = 'start=2001-01-01&end=2001-01-07'
+    for url, header in (
+        (f'/api/reports/items-by-revenue?{empty}', 'item_id,item_name,category,is_resold,units_sold,revenue'),
+        (f'/api/reports/sales-per-hour?{empty}&mode=average', 'hour,sales'),
+        (f'/api/reports/top-items?{empty}', 'item_id,item_name,category,total_revenue'),
+    ):
+        assert client.get(f'{url}&format=csv').get_data(as_text=True) == header + '\n', url
+
+
+def test_unknown_layout_is_rejected(client):
+    response = client.get(f'/api/reports/items-by-revenue?{RANGE}&layout=wide')
+    assert response.status_code == 400
+
+
+def test_success_response_takes_sqlite_rows():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("SELECT 1 AS item_id, 'Latte' AS item_name UNION ALL SELECT 2, 'Scone'").fetchall()
+    conn.close()
+
+    app = Flask(__name__)
+    with app.test_request_context('/'):
+        assert success_response(rows, mode='x') == {
+            'success': True, 'data': [{'item_id': 1, 'item_name': 'Latte'},
+                                      {'item_id': 2, 'item_name': 'Scone'}], 'mode': 'x',
+        }
+    with app.test_request_context('/?layout=columnar'):
+        assert success_response(rows, mode='x') == {
+            'success': True, 'columns': ['item_id', 'item_name'],
+            'data': {'item_id': [1, 2], 'item_name': ['Latte', 'Scone']}, 'mode': 'x',
+        }
+        # Data that isn't a list of rows is left alone
+        assert success_response({'total_sales': 1.5}) == {'success': True, 'data': {'total_sales': 1.5}}
+
+
+def test_columnar_rows_fills_missing_keys():
+    assert columnar_rows([{'a': 1}, {'a': 2, 'b': 3}]) == (['a', 'b'], {'a': [1, 2], 'b': [None, 3]})
+    assert columnar_rows([]) == ([], {})
+    assert columnar_rows([], ('a', 'b')) == (['a', 'b'], {'a': [], 'b': []})
@@ -0,0 +1,55 @@
+"""Tests for revenue-trends period splitting and its single query (reports/meta.py)."""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from reports.meta import complete_periods
+from test_query_plans import traced  # noqa: F401 (fixture)
+
+
+def spans(periods):
+    return [(first.isoformat(), last.isoformat()) for first, last in periods]
+
+
+def test_week_partials_at_both_ends():
+    periods, partial = complete_periods(date(2026, 3, 4), date(2026, 3, 25), 'week')
+    assert spans(periods) == [('2026-03-09', '2026-03-15'), ('2026-03-16', '2026-03-22')]
+    assert partial == {
+        'type': 'both', 'start': '2026-03-04', 'end': '2026-03-08',
+        'end_partial_start': '2026-03-23', 'end_partial_end': '2026-03-25',
+    }
+
+
+def test_quarters_and_fiscal_years():
+    periods, partial = complete_periods(date(2025, 7, 1), date(2026, 6, 30), 'quarter')
+    assert len(periods) == 4 and partial is None
+    assert spans(periods)[1] == ('2025-10-01', '2025-12-31')
+
+    periods, partial = complete_periods(date(2024, 8, 15), date(2026, 6, 30), 'fiscal_year')
+    assert spans(periods) == [('2025-07-01', '2026-06-30')]
+    assert partial == {'type': 'start', 'start': '2024-08-15', 'end': '2025-06-30'}
+
+
+def test_days_have_no_partials():
+    periods, partial = complete_periods(date(2026, 2, 27), date(2026, 3, 2), 'day')
+    assert len(periods) == 4 and partial is None
+
+
+def test_periods_come_from_one_query(traced):
+    _, client, _, statements = traced
+    url = '/api/reports/revenue-trends?start=2026-03-01&end=2026-03-31&granularity='
+    weekly = client.get(url + 'week').get_json()['data']
+    sales_queries = [sql for _, sql in statements if 'SUM(' in sql]
+    assert len(weekly['periods']) == 4
+    assert len(sales_queries) == 1
+
+    daily = client.get(url + 'day').get_json()['data']['periods']
+    by_day = {p['start_date']: p['revenue'] for p in daily}
+    for week in weekly['periods']:
+        in_week = [r for d, r in by_day.items() if week['start_date'] <= d <= week['end_date']]
+        assert week['revenue'] == round(sum(in_week), 2)
+
+    assert client.get(url + 'fortnight').status_code == 400
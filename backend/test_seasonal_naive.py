@@ -0,0 +1,107 @@
+"""Tests for the numpy forecast engine (forecasts/seasonal_naive.py)."""
+
+import os
+import sys
+from datetime import date
+
+import numpy as np
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import report_cache
+from extensions import cache
+from forecasts import forecasts, seasonal_naive
+from forecasts.seasonal_naive import HISTORY_DAYS, Lookback, combine, lookback_columns
+from test_forecast_job import FORECAST_URLS, build_db
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = str(tmp_path / 'engine.db')
+    build_db(path, date.today())
+    monkeypatch.setattr(database, 'DB_PATH', path)
+
+    pool = database.ConnectionPool(database.get_db)
+    monkeypatch.setattr(database, 'pool', pool)
+    monkeypatch.setattr(report_cache, 'pool', pool)
+    monkeypatch.setattr(seasonal_naive, '_history', {})
+
+    app = Flask(__name__)
+    cache.init_app(app, config={'CACHE_TYPE': 'NullCache'})
+    app.register_blueprint(forecasts.forecasts_bp)
+
+    yield app.test_client()
+    pool.close_all()
+
+
+def with_args(url, args):
+    return f'{url}&{args}' if '?' in url else f'{url}?{args}'
+
+
+def test_numpy_engine_matches_python_engine(client):
+    for url in FORECAST_URLS:
+        python = client.get(url).get_json()
+        assert python['success'], url
+        assert client.get(with_args(url, 'engine=numpy')).get_json() == python, url
+
+
+@pytest.mark.parametrize('args', [
+    'weeks=52', 'weeks=13&method=weighted&half_life=2', 'weeks=26&method=trimmed&trim=0.25',
+])
+def test_lookback_options(client, args):
+    for url in FORECAST_URLS:
+        response = client.get(with_args(url, f'engine=numpy&{args}'))
+        assert response.status_code == 200, (url, response.get_json())
+        assert len(response.get_json()['data']) > 0
+
+
+@pytest.mark.parametrize('args', [
+    'engine=pandas', 'weeks=8', 'engine=numpy&weeks=3', 'engine=numpy&weeks=53',
+    'engine=numpy&weeks=x', 'engine=numpy&method=median', 'engine=numpy&trim=0.5',
+    'engine=numpy&method=weighted&half_life=0',
+])
+def test_bad_options_are_rejected(client, args):
+    response = client.get(f'/api/forecasts/daily?{args}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_lookback_columns_stop_before_today():
+    columns, valid = lookback_columns(4)
+    assert columns.shape == valid.shape == (21, 4)
+    # Tomorrow looks back 7..28 days; the last history column is yesterday
+    assert columns[0].tolist() == [HISTORY_DAYS - 6, HISTORY_DAYS - 13, HISTORY_DAYS - 20, HISTORY_DAYS - 27]
+    assert valid[0].all()
+    # A week from tomorrow, one week back is tomorrow itself
+    assert valid[7].tolist() == [False, True, True, True]
+    assert valid[20].tolist() == [False, False, False, True]
+
+
+def test_combine_methods():
+    values = np.array([[10.0, 20.0, 30.0, 1000.0], [5.0, 0.0, 0.0, 0.0]])
+    observed = np.array([[True, True, True, True], [True, False, False, False]])
+
+    assert combine(values, observed, Lookback(method='mean')).tolist() == [265.0, 5.0]
+    # Weights 1, 1/2, 1/4, 1/8 with half_life=1
+    weighted = combine(values, observed, Lookback(method='weighted', half_life=1))
+    assert weighted.tolist() == pytest.approx([(10 + 10 + 7.5 + 125) / 1.875, 5.0])
+    # trim=0.25 drops the lowest and highest of four weeks; one week drops none
+    assert combine(values, observed, Lookback(method='trimmed', trim=0.25)).tolist() == [25.0, 5.0]
+    # Nothing observed forecasts 0
+    assert combine(values, np.zeros_like(observed), Lookback()).tolist() == [0.0, 0.0]
+
+
+def test_history_version_is_read_through_the_view_connection(client, monkeypatch):
+    # One connection, so a second checkout from inside the view times out
+    pool = database.ConnectionPool(database.get_db, max_size=1, timeout=0.1)
+    monkeypatch.setattr(database, 'pool', pool)
+    monkeypatch.setattr(report_cache, 'pool', pool)
+    try:
+        response = client.get('/api/forecasts/daily?engine=numpy')
+        assert response.status_code == 200, response.get_json()
+        assert pool.stats()['timeouts'] == 0
+    finally:
+        pool.close_all()
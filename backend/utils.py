@@ -4,8 +4,12 @@ Shared utility functions for Cafe Analytics Backend
 These utilities are used across multiple blueprints and endpoints.
 """
 
+import sqlite3
 from datetime import datetime, timedelta
-from flask import jsonify
+from flask import has_request_context, jsonify, request
+
+# ?layout= values: 'rows' is a list of objects, 'columnar' one list per column
+LAYOUTS = ('rows', 'columnar')
 
 
 def get_default_date_range():
@@ -21,21 +25,75 @@ def get_default_date_range():
     return start_date, end_date
 
 
-def success_response(data, **metadata):
+def _is_row_list(data):
+    return isinstance(data, list) and all(isinstance(row, (dict, sqlite3.Row)) for row in data)
+
+
+def columnar_rows(rows, columns=()):
+    """
+    Transpose rows (dicts or sqlite3.Row) into (columns, {column: [values]}).
+
+    Columns are in the first row's order; keys only later rows have are
+    appended, and rows missing a column get None. `columns` is used
+    instead when there are no rows to read them from.
+    """
+    if not rows:
+        return list(columns), {column: [] for column in columns}
+    columns = list(dict.fromkeys(key for row in rows for key in row.keys()))
+    if rows and all(isinstance(row, sqlite3.Row) for row in rows):
+        # Every Row from one query has the same columns, in order
+        return columns, dict(zip(columns, map(list, zip(*rows))))
+    return columns, {
+        column: [row[column] if column in row.keys() else None for row in rows]
+        for column in columns
+    }
+
+
+def cursor_columns(cursor):
+    """Column names of the cursor's last query, known even when it returned no rows."""
+    return [column[0] for column in cursor.description]
+
+
+def request_layout():
+    """The ?layout= of the current request ('rows' outside a request)."""
+    if not has_request_context():
+        return 'rows'
+    if request.args.get('format') == 'csv':
+        # JSON objects are sent with sorted keys; `columns` keeps the
+        # query's column order for the CSV header (see row_export.report_csv)
+        return 'columnar'
+    return request.args.get('layout', 'rows')
+
+
+def success_response(data, columns=None, **metadata):
     """
     Create a standardized success response.
 
     Args:
-        data: The primary data to return (list, dict, or primitive)
+        data: The primary data to return (list, dict, or primitive). A list
+            of rows may hold sqlite3.Row objects straight from fetchall().
+        columns: The rows' column names (e.g. cursor_columns(cursor)), so
+            an empty result still lists them in the columnar layout and
+            the CSV header.
         **metadata: Optional additional fields (date_range, mode, etc.)
 
     Returns:
         dict: {'success': True, 'data': data, **metadata}
 
+        With ?layout=columnar, a list of rows is sent as
+        {'success': True, 'columns': [...], 'data': {column: [values]}, ...},
+        which doesn't repeat every key on every row. Other data is sent
+        unchanged.
+
     Example:
         success_response(items, date_range={'start': '2024-01-01', 'end': '2024-12-31'})
         # Returns: {'success': True, 'data': items, 'date_range': {...}}
     """
+    if _is_row_list(data):
+        if request_layout() == 'columnar':
+            columns, values = columnar_rows(data, columns or ())
+            return {'success': True, 'columns': columns, 'data': values, **metadata}
+        data = [row if isinstance(row, dict) else dict(row) for row in data]
     return {'success': True, 'data': data, **metadata}
 
 
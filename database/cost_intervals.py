@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Maintain item_cost_intervals, the date ranges each item cost applies to.
+
+items-by-profit needs the cost that was effective on each sale's date. It
+used to look that up with a correlated item_cost_history subquery per
+transaction row (plus DATE() on every row), and ran the whole lookup twice
+to count missing costs. This table stores cost history as non-overlapping
+[effective_from, effective_to) date ranges per item, so the report can
+range-join transactions against it in one pass:
+
+    LEFT JOIN item_cost_intervals c
+      ON c.item_id = t.item_id
+     AND t.transaction_date >= c.effective_from
+     AND t.transaction_date <  c.effective_to
+
+Bounds are 'YYYY-MM-DD' strings; comparing them with raw transaction
+timestamps is exact ('2026-03-01 08:00:00' >= '2026-03-01' and
+< '2026-03-02'). The bounds are declared DATE so they share
+transaction_date's column affinity; with TEXT, SQLite can't use the
+(item_id, effective_from) key for the range. The latest cost of an item
+runs to OPEN_END. Costs are kept as integer cents (item_cost_history.cost_cents,
+see money_columns.py); a table from before that, with a float `cost`, is
+rebuilt by ensure_cost_intervals().
+
+Triggers on item_cost_history rebuild an item's intervals whenever its
+history changes, so every writer keeps the table current:
+import_item_costs.py and migrate_item_cost_history.py install them via
+ensure_cost_intervals(), and later edits (including ad-hoc sqlite3
+sessions) go through the triggers.
+
+Usage:
+    python database/cost_intervals.py
+    python database/cost_intervals.py --db database/cafe_reports_vivonet_dev.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+from pathlib import Path
+
+from money_columns import CENTS_SQL, ensure_money_columns
+
+
+OPEN_END = "9999-12-31"
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS item_cost_intervals (
+    item_id INTEGER NOT NULL,
+    effective_from DATE NOT NULL,     -- 'YYYY-MM-DD', inclusive
+    effective_to DATE NOT NULL,       -- 'YYYY-MM-DD', exclusive
+    cost_cents INTEGER NOT NULL,
+    PRIMARY KEY (item_id, effective_from)
+) WITHOUT ROWID
+"""
+
+# Intervals for the items matched by {where}: each history row runs until
+# the item's next effective_date. The cost falls back to the dollar column
+# for a row whose cost_cents trigger hasn't run yet (triggers on the same
+# insert fire in no guaranteed order).
+SELECT_INTERVALS_SQL = f"""
+SELECT
+    item_id,
+    DATE(effective_date),
+    COALESCE(
+        LEAD(DATE(effective_date)) OVER (PARTITION BY item_id ORDER BY effective_date),
+        '{OPEN_END}'
+    ),
+    COALESCE(cost_cents, {CENTS_SQL.format(column="cost")})
+FROM item_cost_history
+WHERE {{where}}
+"""
+
+REFRESH_ITEM_SQL = """
+    DELETE FROM item_cost_intervals WHERE item_id = {item};
+    INSERT INTO item_cost_intervals (item_id, effective_from, effective_to, cost_cents)
+    {select};"""
+
+
+def default_db_path() -> Path:
+    script_dir = Path(__file__).resolve().parent
+    env_path = os.environ.get("CAFE_DB_PATH")
+    if env_path:
+        return Path(env_path).expanduser().resolve()
+    return script_dir / "cafe_reports.db"
+
+
+def _trigger_sql(op: str) -> tuple[str, str]:
+    """Return (name, CREATE TRIGGER statement) for one history operation."""
+    name = f"trg_item_cost_intervals_{op.lower()}"
+    # UPDATE can move a row to another item; refresh both.
+    rows = {"INSERT": ["NEW"], "DELETE": ["OLD"], "UPDATE": ["OLD", "NEW"]}[op]
+    body = "".join(
+        REFRESH_ITEM_SQL.format(
+            item=f"{row}.item_id",
+            select=SELECT_INTERVALS_SQL.format(where=f"item_id = {row}.item_id").strip(),
+        )
+        for row in rows
+    )
+    return name, f"CREATE TRIGGER {name}\nAFTER {op} ON item_cost_history\nBEGIN{body}\nEND"
+
+
+def rebuild_cost_intervals(cursor: sqlite3.Cursor) -> int:
+    """Recompute every interval from item_cost_history. Returns the row count."""
+    cursor.execute("DELETE FROM item_cost_intervals")
+    cursor.execute(
+        "INSERT INTO item_cost_intervals (item_id, effective_from, effective_to, cost_cents) "
+        + SELECT_INTERVALS_SQL.format(where="1")
+    )
+    cursor.execute("SELECT COUNT(*) FROM item_cost_intervals")
+    return cursor.fetchone()[0]
+
+
+def ensure_cost_intervals(cursor: sqlite3.Cursor) -> None:
+    """
+    Create item_cost_intervals and the triggers that maintain it.
+
+    Requires item_cost_history. The table is filled from history when it
+    is first created (or replaced, if it predates cost_cents); triggers
+    whose definition has changed are replaced. Runs inside the caller's
+    transaction.
+    """
+    ensure_money_columns(cursor)
+    cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'item_cost_intervals'"
+    )
+    row = cursor.fetchone()
+    created = row is None or "cost_cents" not in row[0]
+    if row is not None and created:
+        cursor.execute("DROP TABLE item_cost_intervals")
+    cursor.execute(CREATE_TABLE_SQL)
+
+    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")
+    triggers = dict(cursor.fetchall())
+    for op in ("INSERT", "UPDATE", "DELETE"):
+        name, sql = _trigger_sql(op)
+        if triggers.get(name) == sql:
+            continue
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(sql)
+
+    if created:
+        rebuild_cost_intervals(cursor)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild item_cost_intervals")
+    parser.add_argument("--db", default=None, help="Path to SQLite database")
+    args = parser.parse_args()
+
+    db_path = Path(args.db).expanduser().resolve() if args.db else default_db_path()
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        return 1
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    print(f"Database: {db_path}")
+    ensure_cost_intervals(cursor)
+    rows = rebuild_cost_intervals(cursor)
+    conn.commit()
+    conn.close()
+    print(f"Rebuilt item_cost_intervals: {rows} intervals")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Install and read the data versions used to key the report cache.
+
+The Flask backend caches report responses per process. Every sync path used
+to wipe that whole cache (admin sync endpoint, a localhost POST from
+vivonet_service, deploy_new_db.sh), which also threw away entries for
+ranges the new data could never affect, and only reached the one worker
+process that happened to serve the POST.
+
+Instead, the database records its own changes. Triggers on every table the
+reports read stamp a version on each INSERT/UPDATE/DELETE:
+
+- `day:YYYY-MM-DD` rows for dated data: transactions (by transaction date),
+  labor_hours (by shift_date) and event_calendar (by event_date)
+- the `global` row for undated data every report may depend on: items,
+  item_cost_history and settings
+
+Stamps are drawn from one increasing `sequence`, so the largest day version
+over any date span changes whenever a day inside that span is written. The
+backend keys each cached report on the global version plus that maximum
+over the report's span (backend/report_cache.py): importing yesterday's
+orders misses only entries whose span includes yesterday, and last spring's
+reports stay cached. Because the triggers live in the database file,
+writers that never call this module (the category scripts under scripts/,
+ad-hoc sqlite3 sessions) are tracked too.
+
+Writers call ensure_data_version_tracking() before writing, which installs
+(or upgrades) the table and triggers and is a no-op afterwards.
+
+Usage:
+    python database/data_version.py            # install (idempotent) and print
+    python database/data_version.py --db database/cafe_reports_vivonet_dev.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable
+
+
+GLOBAL_SCOPE = "global"
+SEQUENCE_SCOPE = "sequence"
+DAY_SCOPE_PREFIX = "day:"
+
+# table -> SQL date expression for its rows (None = undated, bumps global).
+# Derived tables (e.g. sales_hourly_rollup) are rebuilt from these inside
+# the same write, so they don't need triggers of their own.
+TRACKED_TABLES = {
+    "transactions": "DATE({row}.transaction_date)",
+    "labor_hours": "{row}.shift_date",
+    "event_calendar": "{row}.event_date",
+    "items": None,
+    "item_cost_history": None,
+    "settings": None,
+}
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+NEXT_SEQUENCE_SQL = f"""
+    UPDATE data_versions SET version = version + 1 WHERE scope = '{SEQUENCE_SCOPE}';"""
+
+STAMP_SCOPE_SQL = f"""
+    INSERT INTO data_versions (scope, version)
+    VALUES ({{scope}}, (SELECT version FROM data_versions WHERE scope = '{SEQUENCE_SCOPE}'))
+    ON CONFLICT(scope) DO UPDATE SET version = excluded.version;"""
+
+
+def default_db_path() -> Path:
+    script_dir = Path(__file__).resolve().parent
+    env_path = os.environ.get("CAFE_DB_PATH")
+    if env_path:
+        return Path(env_path).expanduser().resolve()
+    return script_dir / "cafe_reports.db"
+
+
+def day_scope(day: date | datetime | str) -> str:
+    if isinstance(day, (date, datetime)):
+        day = day.isoformat()
+    return f"{DAY_SCOPE_PREFIX}{str(day)[:10]}"
+
+
+def _trigger_sql(table: str, op: str, date_expr: str | None) -> tuple[str, str]:
+    """Return (name, CREATE TRIGGER statement) for one table/operation."""
+    name = f"trg_data_version_{table}_{op.lower()}"
+    if date_expr is None:
+        scopes = [f"'{GLOBAL_SCOPE}'"]
+    else:
+        # UPDATE can move a row between days; stamp both.
+        rows = {"INSERT": ["NEW"], "DELETE": ["OLD"], "UPDATE": ["OLD", "NEW"]}[op]
+        scopes = [f"'{DAY_SCOPE_PREFIX}' || {date_expr.format(row=row)}" for row in rows]
+
+    body = NEXT_SEQUENCE_SQL + "".join(STAMP_SCOPE_SQL.format(scope=s) for s in scopes)
+    return name, f"CREATE TRIGGER {name}\nAFTER {op} ON {table}\nBEGIN{body}\nEND"
+
+
+def ensure_data_version_tracking(cursor: sqlite3.Cursor) -> None:
+    """
+    Create data_versions and its triggers for every tracked table present.
+
+    Triggers whose definition has changed since they were installed are
+    replaced, so older databases pick up new tracking rules on the next
+    import.
+    """
+    cursor.execute(CREATE_TABLE_SQL)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO data_versions (scope, version) VALUES (?, 0)",
+        [(SEQUENCE_SCOPE,), (GLOBAL_SCOPE,)],
+    )
+    cursor.execute("SELECT type, name, sql FROM sqlite_master WHERE type IN ('table', 'trigger')")
+    rows = cursor.fetchall()
+    tables = {name for kind, name, _ in rows if kind == "table"}
+    triggers = {name: sql for kind, name, sql in rows if kind == "trigger"}
+
+    for table, date_expr in TRACKED_TABLES.items():
+        if table not in tables:
+            continue
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            name, sql = _trigger_sql(table, op, date_expr)
+            if triggers.get(name) == sql:
+                continue
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(sql)
+
+
+def bump_data_version(
+    cursor: sqlite3.Cursor,
+    days: Iterable[date | datetime | str] | None = None,
+) -> None:
+    """
+    Record a change the triggers can't see (e.g. a derived-table refresh).
+
+    Stamps the given days, or the global scope when days is None. Runs
+    inside the caller's transaction.
+    """
+    ensure_data_version_tracking(cursor)
+    scopes = [GLOBAL_SCOPE] if days is None else sorted({day_scope(d) for d in days})
+    for scope in scopes:
+        cursor.execute(NEXT_SEQUENCE_SQL)
+        cursor.execute(STAMP_SCOPE_SQL.format(scope="?"), (scope,))
+
+
+def get_data_version(
+    cursor: sqlite3.Cursor,
+    start: date | str | None = None,
+    end: date | str | None = None,
+) -> int | None:
+    """
+    Version of the data a report over [start, end] depends on.
+
+    With no span, returns the latest stamp of any scope. None if tracking
+    isn't installed.
+    """
+    try:
+        if start is None or end is None:
+            cursor.execute(
+                "SELECT version FROM data_versions WHERE scope = ?", (SEQUENCE_SCOPE,)
+            )
+        else:
+            cursor.execute(
+                """
+                SELECT MAX(
+                    (SELECT version FROM data_versions WHERE scope = ?),
+                    COALESCE((SELECT MAX(version) FROM data_versions
+                              WHERE scope >= ? AND scope <= ?), 0)
+                )
+                """,
+                (GLOBAL_SCOPE, day_scope(start), day_scope(end)),
+            )
+    except sqlite3.OperationalError:
+        return None
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Install data-version tracking")
+    parser.add_argument("--db", default=None, help="Path to SQLite database")
+    args = parser.parse_args()
+
+    db_path = Path(args.db).expanduser().resolve() if args.db else default_db_path()
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        return 1
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    ensure_data_version_tracking(cursor)
+    conn.commit()
+    print(f"Database: {db_path}")
+    print(f"Data version: {get_data_version(cursor)}")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Maintain the event_calendar table.
+
+Days that don't behave like the rest of the week (home football games,
+holidays, days the cafe was closed) used to live only in the frontend
+(frontend/src/utils/gamedays.ts), which sent them to the backend as a
+different exclude_dates list for every range. This table keeps them in the
+database, one row per (event_type, event_date), so reports can take
+`exclude=game_day` and the forecasts can leave those days out of their
+averages (see backend/event_days.py).
+
+Writes are stamped in data_versions by event_date like transactions, so
+cached reports and forecasts covering a changed day are recomputed.
+
+CSV files have a header row with `date,type` and an optional `name`
+column; --replace first deletes every event of the types in the file, so
+a season's schedule can be re-imported as a whole. The admin endpoint
+POST /api/admin/event-calendar takes the same rows as JSON.
+
+Usage:
+    python database/event_calendar.py --seed-game-days
+    python database/event_calendar.py --csv game_days_2026.csv --replace
+    python database/event_calendar.py --list
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from data_version import ensure_data_version_tracking
+
+
+EVENT_TYPES = ("game_day", "holiday", "closure")
+
+CREATE_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS event_calendar (
+    event_type TEXT NOT NULL CHECK(event_type IN ({", ".join(f"'{t}'" for t in EVENT_TYPES)})),
+    event_date TEXT NOT NULL,         -- 'YYYY-MM-DD'
+    name TEXT,                        -- e.g. 'Cal vs. Stanford'
+    PRIMARY KEY (event_type, event_date)
+) WITHOUT ROWID
+"""
+
+# Cal Football home games, as listed in frontend/src/utils/gamedays.ts
+GAME_DAYS_2025 = (
+    "2025-09-06",
+    "2025-09-13",
+    "2025-10-04",
+    "2025-10-17",
+    "2025-11-01",
+    "2025-11-29",
+)
+
+
+def default_db_path() -> Path:
+    script_dir = Path(__file__).resolve().parent
+    env_path = os.environ.get("CAFE_DB_PATH")
+    if env_path:
+        return Path(env_path).expanduser().resolve()
+    return script_dir / "cafe_reports.db"
+
+
+def ensure_event_calendar(cursor: sqlite3.Cursor) -> None:
+    """Create event_calendar and the data-version triggers that track it."""
+    cursor.execute(CREATE_TABLE_SQL)
+    ensure_data_version_tracking(cursor)
+
+
+def _event_row(event_date: str, event_type: str, name: str | None) -> tuple[str, str, str | None]:
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Unknown event type {event_type!r} (expected one of {', '.join(EVENT_TYPES)})")
+    try:
+        day = datetime.strptime(str(event_date).strip(), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"Invalid event date {event_date!r}; expected YYYY-MM-DD") from None
+    return event_type, day.isoformat(), (name or "").strip() or None
+
+
+def import_events(
+    cursor: sqlite3.Cursor,
+    events: Iterable[tuple[str, str, str | None]],
+    replace: bool = False,
+) -> int:
+    """
+    Insert or update (date, type, name) events.
+
+    Every row is validated before anything is written. With replace, all
+    existing events of the types being imported are deleted first. Runs
+    inside the caller's transaction. Returns the number of events written.
+    """
+    rows = [_event_row(*event) for event in events]
+    ensure_event_calendar(cursor)
+    if replace:
+        for event_type in sorted({row[0] for row in rows}):
+            cursor.execute("DELETE FROM event_calendar WHERE event_type = ?", (event_type,))
+    cursor.executemany(
+        """
+        INSERT INTO event_calendar (event_type, event_date, name) VALUES (?, ?, ?)
+        ON CONFLICT(event_type, event_date) DO UPDATE SET name = excluded.name
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def read_events_csv(path: str | Path) -> list[tuple[str, str, str | None]]:
+    """(date, type, name) rows from a CSV with date,type[,name] columns."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or not {"date", "type"} <= set(reader.fieldnames):
+            raise ValueError(f"{path}: expected a header row with date,type[,name]")
+        return [(row["date"], row["type"], row.get("name")) for row in reader]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import days into the event_calendar table")
+    parser.add_argument("--db", default=None, help="Path to SQLite database")
+    parser.add_argument("--csv", default=None, help="CSV of events to import (date,type[,name])")
+    parser.add_argument("--replace", action="store_true",
+                        help="Delete existing events of the imported types first")
+    parser.add_argument("--seed-game-days", action="store_true",
+                        help="Import the 2025 game days the frontend used to hardcode")
+    parser.add_argument("--list", action="store_true", help="Print every event")
+    args = parser.parse_args()
+
+    if not (args.csv or args.seed_game_days or args.list):
+        parser.error("pass --csv, --seed-game-days or --list")
+
+    db_path = Path(args.db).expanduser().resolve() if args.db else default_db_path()
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        return 1
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    print(f"Database: {db_path}")
+    try:
+        if args.seed_game_days:
+            count = import_events(cursor, [(day, "game_day", None) for day in GAME_DAYS_2025])
+            print(f"Seeded {count} game days")
+        if args.csv:
+            count = import_events(cursor, read_events_csv(args.csv), replace=args.replace)
+            print(f"Imported {count} events from {args.csv}")
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    conn.commit()
+
+    if args.list:
+        ensure_event_calendar(cursor)
+        for event_type, event_date, name in cursor.execute(
+            "SELECT event_type, event_date, name FROM event_calendar ORDER BY event_date, event_type"
+        ):
+            print(f"{event_date}  {event_type:9}  {name or ''}")
+        conn.commit()
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
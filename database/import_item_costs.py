@@ -18,6 +18,9 @@ Backwards-compatible CSV format is also accepted:
 If effective_date is not present in the CSV, pass --effective-date YYYY-MM-DD.
 If neither is provided, today's date is used and printed.
 
+History changes also refresh item_cost_intervals (see cost_intervals.py),
+which the profit report range-joins against.
+
 Usage:
     python database/import_item_costs.py item_costs.csv --effective-date 2026-07-01
     python database/import_item_costs.py item_costs.csv --db database/cafe_reports_vivonet_dev.db
@@ -34,6 +37,10 @@ import re
 import sqlite3
 from typing import Any
 
+from cost_intervals import ensure_cost_intervals
+from data_version import ensure_data_version_tracking
+from money_columns import to_cents
+
 
 CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS item_cost_history (
@@ -113,19 +120,19 @@ def upsert_cost_history(
     cursor.execute(
         """
         UPDATE item_cost_history
-        SET cost = ?, source = ?, notes = ?, created_at = CURRENT_TIMESTAMP
+        SET cost = ?, cost_cents = ?, source = ?, notes = ?, created_at = CURRENT_TIMESTAMP
         WHERE item_id = ? AND effective_date = ?
         """,
-        (cost, source, notes, item_id, effective_date),
+        (cost, to_cents(cost), source, notes, item_id, effective_date),
     )
     if cursor.rowcount == 0:
         cursor.execute(
             """
             INSERT INTO item_cost_history
-                (item_id, cost, effective_date, source, notes)
-            VALUES (?, ?, ?, ?, ?)
+                (item_id, cost, cost_cents, effective_date, source, notes)
+            VALUES (?, ?, ?, ?, ?, ?)
             """,
-            (item_id, cost, effective_date, source, notes),
+            (item_id, cost, to_cents(cost), effective_date, source, notes),
         )
 
 
@@ -163,6 +170,8 @@ def import_costs(db_path: Path, csv_path: Path, default_effective_date: str | No
     cursor = conn.cursor()
     cursor.execute("PRAGMA foreign_keys = ON")
     ensure_history_table(cursor)
+    ensure_cost_intervals(cursor)
+    ensure_data_version_tracking(cursor)
 
     print(f"Database: {db_path}")
     print(f"Reading costs from: {csv_path}")
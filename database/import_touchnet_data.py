@@ -16,10 +16,12 @@ Example:
 import sqlite3
 import sys
 import re
-import requests
 from datetime import datetime
 from collections import defaultdict
 
+from data_version import ensure_data_version_tracking
+from sales_rollup import refresh_rollup_days
+
 
 def parse_excel_file(excel_path):
     """
@@ -155,6 +157,9 @@ def import_data(db_path, excel_files):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
+    # Report caches key off data_versions; the triggers bump it as we write
+    ensure_data_version_tracking(cursor)
+
     # Load existing items from database (source of truth)
     print("\n💾 Loading existing items from database...")
     cursor.execute("""
@@ -257,6 +262,7 @@ def import_data(db_path, excel_files):
     insert_count = 0
     delete_count = 0
     update_count = 0
+    touched_days = set()
 
     for txn in all_transactions:
         # Get category from database
@@ -284,6 +290,7 @@ def import_data(db_path, excel_files):
             if result:
                 txn_id, original_qty, unit_price = result
 
+                touched_days.add(txn['timestamp'].date())
                 if cancel_qty >= original_qty:
                     # Full cancellation - delete the transaction
                     cursor.execute("DELETE FROM transactions WHERE transaction_id = ?", (txn_id,))
@@ -317,6 +324,7 @@ def import_data(db_path, excel_files):
                     txn['total_amount']
                 ))
                 insert_count += 1
+                touched_days.add(txn['timestamp'].date())
             except sqlite3.IntegrityError:
                 # Duplicate transaction, skip
                 pass
@@ -326,6 +334,9 @@ def import_data(db_path, excel_files):
     if update_count > 0:
         print(f"  ✅ Updated {update_count} partial cancellations")
 
+    refreshed = refresh_rollup_days(cursor, touched_days)
+    print(f"  ✅ Refreshed sales_hourly_rollup for {refreshed} days")
+
     conn.commit()
     conn.close()
 
@@ -404,17 +415,4 @@ if __name__ == "__main__":
     import_data(db_path, excel_files)
     verify_import(db_path)
 
-    # Clear Flask cache if server is running
-    print("\n🧹 Clearing API cache...")
-    try:
-        response = requests.post('http://localhost:5500/api/admin/clear-cache', timeout=2)
-        if response.status_code == 200:
-            print("   ✅ Cache cleared successfully")
-        else:
-            print(f"   ⚠️  Cache clear returned status {response.status_code}")
-    except requests.exceptions.ConnectionError:
-        print("   ℹ️  Flask server not running locally - skipping cache clear")
-    except Exception as e:
-        print(f"   ⚠️  Could not clear cache: {e}")
-
     print("\n🎉 Done! Check the verification output above.")
@@ -15,6 +15,8 @@ import sys
 import csv
 from datetime import datetime
 
+from data_version import ensure_data_version_tracking
+
 
 def parse_when2work_csv(csv_path):
     """
@@ -136,6 +138,7 @@ def import_shifts(db_path, csv_files):
     
     # Add unique constraint if not exists
     add_unique_constraint(conn)
+    ensure_data_version_tracking(cursor)
     
     all_shifts = []
     
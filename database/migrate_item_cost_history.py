@@ -24,6 +24,9 @@ import os
 import sqlite3
 from pathlib import Path
 
+from cost_intervals import ensure_cost_intervals
+from money_columns import CENTS_SQL
+
 
 CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS item_cost_history (
@@ -77,16 +80,19 @@ def migrate(db_path: Path, effective_date: str | None = None) -> bool:
     cursor.execute(CREATE_TABLE_SQL)
     cursor.execute(CREATE_INDEX_SQL)
     cursor.execute(CREATE_UNIQUE_INDEX_SQL)
+    # Seeded rows flow into item_cost_intervals through its triggers
+    ensure_cost_intervals(cursor)
 
     seed_date = effective_date or get_earliest_transaction_date(cursor)
     print(f"Seed effective_date: {seed_date}")
 
-    cursor.execute("""
+    cursor.execute(f"""
         INSERT OR IGNORE INTO item_cost_history
-            (item_id, cost, effective_date, source, notes)
+            (item_id, cost, cost_cents, effective_date, source, notes)
         SELECT
             item_id,
             current_cost,
+            {CENTS_SQL.format(column='current_cost')},
             ?,
             'seed_from_current_cost',
             'Initial seed from items.current_cost; review/replace with source cost data when available'
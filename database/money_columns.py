@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Maintain the integer-cents money columns.
+
+`unit_price`, `total_amount` and `item_cost_history.cost` are declared
+DECIMAL but SQLite stores them as floats, so every report summed floats
+and wrapped the result in ROUND(..., 2), and totals computed two ways
+(SQL vs. the columnar store, raw rows vs. the rollup) could disagree in
+the last bit. This module adds exact integer copies:
+
+- transactions.unit_price_cents and transactions.total_cents
+- item_cost_history.cost_cents
+
+Reports sum the integers and convert to dollars once, when selecting the
+result (backend/sales_source.py). The derived tables follow suit:
+sales_hourly_rollup keeps revenue_cents and item_cost_intervals keeps
+cost_cents, and the covering indexes from transaction_time_columns.py
+hold total_cents.
+
+Triggers keep the cents in step with the dollar columns on every insert
+and on updates of either, so rows written by anything (seed_data.py,
+ad-hoc scripts, a sqlite3 shell) are counted like imported ones; a row
+is only rewritten when its cents don't match. The importers write the
+dollar columns alone and leave the cents to the triggers, so they also
+work on a database this migration hasn't run on yet. database/schema.sql
+declares the columns and triggers, so new databases start out migrated.
+
+ensure_money_columns() adds the columns, backfills existing rows from the
+float columns and installs the triggers in the caller's transaction.
+ensure_time_columns() and ensure_cost_intervals() call it first, since
+their indexes and intervals read the cents.
+
+Running this script is the backfill migration: it adds and fills the
+columns, then brings the covering indexes, the rollup and the cost
+intervals over to cents.
+
+Usage:
+    python database/money_columns.py
+    python database/money_columns.py --db database/cafe_reports_vivonet_dev.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import sqlite3
+from pathlib import Path
+
+
+# table -> {cents column: dollar column it is derived from}
+MONEY_COLUMNS = {
+    "transactions": {"unit_price_cents": "unit_price", "total_cents": "total_amount"},
+    "item_cost_history": {"cost_cents": "cost"},
+}
+
+# Dollars -> cents in SQL, rounding half away from zero like to_cents()
+CENTS_SQL = "CAST(ROUND({column} * 100) AS INTEGER)"
+
+# table -> primary key the sync triggers update by
+TABLE_KEYS = {"transactions": "transaction_id", "item_cost_history": "id"}
+
+
+def default_db_path() -> Path:
+    script_dir = Path(__file__).resolve().parent
+    env_path = os.environ.get("CAFE_DB_PATH")
+    if env_path:
+        return Path(env_path).expanduser().resolve()
+    return script_dir / "cafe_reports.db"
+
+
+def to_cents(amount: float | str) -> int:
+    """
+    Whole cents for a dollar amount, as CENTS_SQL computes them.
+
+    Rounds half away from zero, so 0.125 -> 13 and -0.125 -> -13.
+    """
+    cents = float(amount) * 100
+    return int(math.copysign(math.floor(abs(cents) + 0.5), cents))
+
+
+def derived_column_triggers(
+    prefix: str, table: str, key: str, sources: list[str], derived: dict[str, str]
+) -> list[tuple[str, str]]:
+    """
+    (name, CREATE TRIGGER statement) pairs keeping derived columns current.
+
+    derived maps each column to the SQL computing it from a row, with
+    {row} standing for the row alias. After an insert, or an update of a
+    source or derived column, the row is rewritten only when a derived
+    value doesn't match.
+    """
+    stale = "\n  OR ".join(f"NEW.{name} IS NOT {sql.format(row='NEW')}" for name, sql in derived.items())
+    assignments = ",\n        ".join(f"{name} = {sql.format(row='NEW')}" for name, sql in derived.items())
+    body = f"UPDATE {table} SET\n        {assignments}\n    WHERE {key} = NEW.{key};"
+    triggers = []
+    for op, event in (("insert", "INSERT"), ("update", f"UPDATE OF {', '.join([*sources, *derived])}")):
+        name = f"trg_{prefix}_{op}"
+        triggers.append((name, f"CREATE TRIGGER {name}\nAFTER {event} ON {table}\nWHEN {stale}\nBEGIN\n    {body}\nEND"))
+    return triggers
+
+
+def install_triggers(cursor: sqlite3.Cursor, triggers: list[tuple[str, str]]) -> None:
+    """Create the triggers, replacing any whose definition has changed."""
+    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")
+    installed = dict(cursor.fetchall())
+    for name, sql in triggers:
+        if installed.get(name) == sql:
+            continue
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(sql)
+
+
+def cents_triggers(table: str) -> list[tuple[str, str]]:
+    """The triggers computing a money table's cents columns from its dollar columns."""
+    columns = MONEY_COLUMNS[table]
+    return derived_column_triggers(
+        f"{table}_cents", table, TABLE_KEYS[table], list(columns.values()),
+        {name: CENTS_SQL.format(column=f"{{row}}.{source}") for name, source in columns.items()},
+    )
+
+
+def _columns(cursor: sqlite3.Cursor, table: str) -> set[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def ensure_money_columns(cursor: sqlite3.Cursor) -> int:
+    """
+    Add and backfill the cents columns on every money table present, and
+    install the triggers that keep them current.
+
+    Runs inside the caller's transaction; the caller commits. Once the
+    columns exist only outdated triggers are replaced. Returns the number
+    of rows backfilled.
+    """
+    backfilled = 0
+    for table, columns in MONEY_COLUMNS.items():
+        existing = _columns(cursor, table)
+        if not existing:
+            continue
+        added = False
+        for name in columns:
+            if name not in existing:
+                print(f"  🔧 Adding column: {table}.{name}")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} INTEGER")
+                added = True
+        if added:
+            backfilled += _backfill_table(cursor, table)
+        install_triggers(cursor, cents_triggers(table))
+    return backfilled
+
+
+def _backfill_table(cursor: sqlite3.Cursor, table: str) -> int:
+    columns = MONEY_COLUMNS[table]
+    assignments = ", ".join(
+        f"{name} = {CENTS_SQL.format(column=source)}" for name, source in columns.items()
+    )
+    missing = " OR ".join(f"{name} IS NULL" for name in columns)
+    cursor.execute(f"UPDATE {table} SET {assignments} WHERE {missing}")
+    return cursor.rowcount
+
+
+def backfill_money_columns(cursor: sqlite3.Cursor) -> int:
+    """Fill the cents columns for rows that don't have them yet."""
+    return sum(
+        _backfill_table(cursor, table)
+        for table, columns in MONEY_COLUMNS.items()
+        if set(columns) <= _columns(cursor, table)
+    )
+
+
+def main() -> int:
+    # Imported here: each of these calls ensure_money_columns() itself
+    from cost_intervals import ensure_cost_intervals
+    from sales_rollup import ensure_rollup_table
+    from transaction_time_columns import ensure_time_columns
+
+    parser = argparse.ArgumentParser(description="Add and backfill the integer-cents money columns")
+    parser.add_argument("--db", default=None, help="Path to SQLite database")
+    args = parser.parse_args()
+
+    db_path = Path(args.db).expanduser().resolve() if args.db else default_db_path()
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        return 1
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    print(f"Database: {db_path}")
+    rows = ensure_money_columns(cursor)
+    # Rows written by anything that bypassed the importers
+    rows += backfill_money_columns(cursor)
+    ensure_time_columns(cursor)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    if "sales_hourly_rollup" in tables:
+        ensure_rollup_table(cursor)
+    if "item_cost_history" in tables:
+        ensure_cost_intervals(cursor)
+    conn.commit()
+    conn.close()
+    print(f"Backfilled money columns for {rows} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Maintain the sales_hourly_rollup table.
+
+Reports mostly ask "how much of item X sold on day D in hour H", and used to
+answer that by re-aggregating raw `transactions` rows with DATE()/strftime()
+on every request. This table stores those sums once per
+(sale_date, sale_hour, item_id), so a multi-month report aggregates a few
+thousand pre-summed rows instead of hundreds of thousands of line items.
+
+Writers keep it current for only the days they touch:
+- vivonet_service.ingest_orders refreshes the days it inserted rows for
+- import_touchnet_data.import_data refreshes the days it inserted/cancelled
+- this script rebuilds everything (or a date range) on demand
+
+The backend only reads the rollup once a full rebuild has marked it ready
+(settings.sales_hourly_rollup_ready); until then reports use raw rows.
+
+Revenue is kept in integer cents (summed from transactions.total_cents, see
+money_columns.py). Writers skip the refresh on a database that hasn't been
+migrated to cents yet; money_columns.py rebuilds the rollup when it
+migrates, and a rollup from before cents, with a float `revenue` column,
+is otherwise rebuilt in place the first time a writer touches it.
+
+Rows carry no category: reports join `items` for the current one, so
+recategorising items (scripts/apply_category_update.py) never leaves the
+rollup stale. A rollup from before that, with a `category` column, is
+rebuilt the same way.
+
+Usage:
+    python database/sales_rollup.py --rebuild
+    python database/sales_rollup.py --start 2026-07-01 --end 2026-07-21
+    python database/sales_rollup.py --rebuild --db database/cafe_reports_vivonet_dev.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterable
+
+from data_version import bump_data_version
+from money_columns import ensure_money_columns
+
+
+READY_SETTING_KEY = "sales_hourly_rollup_ready"
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS sales_hourly_rollup (
+    sale_date TEXT NOT NULL,          -- 'YYYY-MM-DD'
+    sale_hour INTEGER NOT NULL,       -- 0-23
+    day_of_week INTEGER NOT NULL,     -- 0=Sunday ... 6=Saturday (strftime('%w'))
+    item_id INTEGER NOT NULL,
+    units INTEGER NOT NULL,
+    revenue_cents INTEGER NOT NULL,
+    line_count INTEGER NOT NULL,
+    PRIMARY KEY (sale_date, sale_hour, item_id)
+) WITHOUT ROWID
+"""
+
+CREATE_ITEM_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_sales_hourly_rollup_item_date
+ON sales_hourly_rollup (item_id, sale_date)
+"""
+
+# Aggregates one half-open transaction_date range into rollup rows.
+INSERT_RANGE_SQL = """
+INSERT INTO sales_hourly_rollup (
+    sale_date, sale_hour, day_of_week, item_id,
+    units, revenue_cents, line_count
+)
+SELECT
+    DATE(transaction_date),
+    CAST(strftime('%H', transaction_date) AS INTEGER),
+    CAST(strftime('%w', transaction_date) AS INTEGER),
+    item_id,
+    SUM(quantity),
+    SUM(total_cents),
+    COUNT(*)
+FROM transactions
+WHERE transaction_date >= ? AND transaction_date < ?
+GROUP BY 1, 2, 4
+"""
+
+# INSERT_RANGE_SQL bounds covering every transaction
+ALL_DAYS = ("0000-01-01 00:00:00", "9999-12-31 23:59:59")
+
+
+def default_db_path() -> Path:
+    script_dir = Path(__file__).resolve().parent
+    env_path = os.environ.get("CAFE_DB_PATH")
+    if env_path:
+        return Path(env_path).expanduser().resolve()
+    return script_dir / "cafe_reports.db"
+
+
+def ensure_rollup_table(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the rollup table, or replace one that predates revenue_cents or
+    still has a category column.
+
+    A replaced table is refilled for every day at once, so a ready rollup
+    stays complete.
+    """
+    ensure_money_columns(cursor)
+    cursor.execute("PRAGMA table_info(sales_hourly_rollup)")
+    columns = {row[1] for row in cursor.fetchall()}
+    outdated = bool(columns) and ("revenue_cents" not in columns or "category" in columns)
+    if outdated:
+        print("  🔧 Rebuilding sales_hourly_rollup with revenue in cents and no category")
+        cursor.execute("DROP TABLE sales_hourly_rollup")
+    cursor.execute(CREATE_TABLE_SQL)
+    cursor.execute(CREATE_ITEM_INDEX_SQL)
+    if outdated:
+        cursor.execute(INSERT_RANGE_SQL, ALL_DAYS)
+
+
+def _as_date(value: date | datetime | str) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _midnight(d: date) -> str:
+    return f"{d.isoformat()} 00:00:00"
+
+
+def refresh_rollup_days(cursor: sqlite3.Cursor, days: Iterable[date | datetime | str]) -> int:
+    """
+    Recompute the rollup rows for the given sale days from `transactions`.
+
+    Accepts dates, datetimes or 'YYYY-MM-DD...' strings. Runs inside the
+    caller's transaction; the caller commits. Returns the number of days
+    refreshed: none before transactions has total_cents, since adding and
+    backfilling it is left to the money_columns.py migration.
+    """
+    unique_days = sorted({_as_date(d) for d in days})
+    if not unique_days:
+        return 0
+    cursor.execute("PRAGMA table_info(transactions)")
+    if "total_cents" not in {row[1] for row in cursor.fetchall()}:
+        return 0
+
+    ensure_rollup_table(cursor)
+    for day in unique_days:
+        cursor.execute(
+            "DELETE FROM sales_hourly_rollup WHERE sale_date = ?",
+            (day.isoformat(),),
+        )
+        cursor.execute(
+            INSERT_RANGE_SQL,
+            (_midnight(day), _midnight(day + timedelta(days=1))),
+        )
+    return len(unique_days)
+
+
+def rebuild_rollup(cursor: sqlite3.Cursor, start: str | None = None, end: str | None = None) -> int:
+    """
+    Rebuild the rollup from `transactions`.
+
+    With no range, rebuilds every day and marks the rollup ready for the
+    reports. With start/end ('YYYY-MM-DD', inclusive), only refreshes those
+    days and leaves the ready flag untouched. Returns the rollup row count.
+    """
+    ensure_rollup_table(cursor)
+
+    if start or end:
+        if not (start and end):
+            raise ValueError("--start and --end must be given together")
+        first, last = _as_date(start), _as_date(end)
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        refresh_rollup_days(cursor, days)
+        # Reports read the rollup directly, so cached responses built from
+        # the old rows must be invalidated even when `transactions` didn't
+        # change.
+        bump_data_version(cursor, days)
+    else:
+        cursor.execute("DELETE FROM sales_hourly_rollup")
+        cursor.execute(INSERT_RANGE_SQL, ALL_DAYS)
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO settings (setting_key, setting_value, last_updated)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            """,
+            (READY_SETTING_KEY, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        bump_data_version(cursor)
+
+    cursor.execute("SELECT COUNT(*) FROM sales_hourly_rollup")
+    return cursor.fetchone()[0]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the sales_hourly_rollup table")
+    parser.add_argument("--db", default=None, help="Path to SQLite database")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild every day and mark the rollup ready")
+    parser.add_argument("--start", default=None, help="First day to refresh (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="Last day to refresh (YYYY-MM-DD, inclusive)")
+    args = parser.parse_args()
+
+    if not args.rebuild and not (args.start and args.end):
+        parser.error("pass --rebuild, or --start and --end")
+
+    db_path = Path(args.db).expanduser().resolve() if args.db else default_db_path()
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        return 1
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    print(f"Database: {db_path}")
+    if args.rebuild:
+        rows = rebuild_rollup(cursor)
+        print(f"Rebuilt sales_hourly_rollup: {rows} rows (marked ready)")
+    else:
+        rows = rebuild_rollup(cursor, args.start, args.end)
+        print(f"Refreshed {args.start} → {args.end}: {rows} rollup rows total")
+    conn.commit()
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
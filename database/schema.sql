@@ -28,12 +28,29 @@ CREATE TABLE item_cost_history (
     source TEXT,
     notes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    cost_cents INTEGER,                    -- cost in whole cents (money_columns.py)
     FOREIGN KEY (item_id) REFERENCES items(item_id)
 );
 CREATE INDEX idx_item_cost_history_item_date
 ON item_cost_history (item_id, effective_date);
 CREATE UNIQUE INDEX idx_item_cost_history_unique_item_date
 ON item_cost_history (item_id, effective_date);
+CREATE TRIGGER trg_item_cost_history_cents_insert
+AFTER INSERT ON item_cost_history
+WHEN NEW.cost_cents IS NOT CAST(ROUND(NEW.cost * 100) AS INTEGER)
+BEGIN
+    UPDATE item_cost_history SET
+        cost_cents = CAST(ROUND(NEW.cost * 100) AS INTEGER)
+    WHERE id = NEW.id;
+END;
+CREATE TRIGGER trg_item_cost_history_cents_update
+AFTER UPDATE OF cost, cost_cents ON item_cost_history
+WHEN NEW.cost_cents IS NOT CAST(ROUND(NEW.cost * 100) AS INTEGER)
+BEGIN
+    UPDATE item_cost_history SET
+        cost_cents = CAST(ROUND(NEW.cost * 100) AS INTEGER)
+    WHERE id = NEW.id;
+END;
 CREATE TABLE transactions (
     transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
     transaction_date TIMESTAMP NOT NULL,
@@ -44,6 +61,11 @@ CREATE TABLE transactions (
     register_num INTEGER NOT NULL,
     unit_price DECIMAL(10,2) NOT NULL,
     total_amount DECIMAL(10,2) NOT NULL,
+    unit_price_cents INTEGER,              -- whole cents, kept in step by triggers (money_columns.py)
+    total_cents INTEGER,
+    sale_date TEXT,                        -- DATE(transaction_date), kept by triggers (transaction_time_columns.py)
+    sale_hour INTEGER,                     -- 0-23
+    day_of_week INTEGER,                   -- 0=Sunday ... 6=Saturday, as strftime('%w')
     FOREIGN KEY (item_id) REFERENCES items(item_id)
 );
 CREATE TABLE sqlite_sequence(name,seq);
@@ -52,6 +74,56 @@ CREATE INDEX idx_transactions_item ON transactions(item_id);
 CREATE INDEX idx_transactions_category ON transactions(category);
 CREATE UNIQUE INDEX idx_transactions_unique 
 ON transactions(transaction_date, item_id, register_num);
+CREATE TRIGGER trg_transactions_cents_insert
+AFTER INSERT ON transactions
+WHEN NEW.unit_price_cents IS NOT CAST(ROUND(NEW.unit_price * 100) AS INTEGER)
+  OR NEW.total_cents IS NOT CAST(ROUND(NEW.total_amount * 100) AS INTEGER)
+BEGIN
+    UPDATE transactions SET
+        unit_price_cents = CAST(ROUND(NEW.unit_price * 100) AS INTEGER),
+        total_cents = CAST(ROUND(NEW.total_amount * 100) AS INTEGER)
+    WHERE transaction_id = NEW.transaction_id;
+END;
+CREATE TRIGGER trg_transactions_cents_update
+AFTER UPDATE OF unit_price, total_amount, unit_price_cents, total_cents ON transactions
+WHEN NEW.unit_price_cents IS NOT CAST(ROUND(NEW.unit_price * 100) AS INTEGER)
+  OR NEW.total_cents IS NOT CAST(ROUND(NEW.total_amount * 100) AS INTEGER)
+BEGIN
+    UPDATE transactions SET
+        unit_price_cents = CAST(ROUND(NEW.unit_price * 100) AS INTEGER),
+        total_cents = CAST(ROUND(NEW.total_amount * 100) AS INTEGER)
+    WHERE transaction_id = NEW.transaction_id;
+END;
+CREATE TRIGGER trg_transactions_time_insert
+AFTER INSERT ON transactions
+WHEN NEW.sale_date IS NOT DATE(NEW.transaction_date)
+  OR NEW.sale_hour IS NOT CAST(strftime('%H', NEW.transaction_date) AS INTEGER)
+  OR NEW.day_of_week IS NOT CAST(strftime('%w', NEW.transaction_date) AS INTEGER)
+BEGIN
+    UPDATE transactions SET
+        sale_date = DATE(NEW.transaction_date),
+        sale_hour = CAST(strftime('%H', NEW.transaction_date) AS INTEGER),
+        day_of_week = CAST(strftime('%w', NEW.transaction_date) AS INTEGER)
+    WHERE transaction_id = NEW.transaction_id;
+END;
+CREATE TRIGGER trg_transactions_time_update
+AFTER UPDATE OF transaction_date, sale_date, sale_hour, day_of_week ON transactions
+WHEN NEW.sale_date IS NOT DATE(NEW.transaction_date)
+  OR NEW.sale_hour IS NOT CAST(strftime('%H', NEW.transaction_date) AS INTEGER)
+  OR NEW.day_of_week IS NOT CAST(strftime('%w', NEW.transaction_date) AS INTEGER)
+BEGIN
+    UPDATE transactions SET
+        sale_date = DATE(NEW.transaction_date),
+        sale_hour = CAST(strftime('%H', NEW.transaction_date) AS INTEGER),
+        day_of_week = CAST(strftime('%w', NEW.transaction_date) AS INTEGER)
+    WHERE transaction_id = NEW.transaction_id;
+END;
+CREATE INDEX idx_transactions_item_time_cents
+ON transactions(item_id, transaction_date, sale_date, day_of_week,
+                sale_hour, quantity, total_cents);
+CREATE INDEX idx_transactions_date_item_time_cents
+ON transactions(transaction_date, item_id, sale_date, day_of_week,
+                sale_hour, quantity, total_cents);
 CREATE TABLE labor_hours (
     labor_id INTEGER PRIMARY KEY AUTOINCREMENT,
     shift_date DATE NOT NULL,              -- Denormalized for quick date filtering
@@ -0,0 +1,71 @@
+"""
+PRAGMA profiles for the report and ingestion connections.
+
+The Flask report connections (backend/database.py) read with READ_PRAGMAS;
+the importers (vivonet_service.connect_for_ingest) write with
+WRITE_PRAGMAS. Both profiles and apply_pragmas() live here so settings the
+two sides must agree on (the journal mode, the busy timeout) are read from
+the environment in one place.
+
+Each setting can be overridden next to CAFE_DB_PATH in the environment; an
+empty value skips that PRAGMA entirely.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from typing import Iterable
+
+# Shared by both profiles.
+# - journal_mode=wal lets readers keep serving while a Vivonet sync writes.
+#   Set CAFE_DB_JOURNAL_MODE=delete on filesystems that can't host WAL's
+#   shared-memory file.
+JOURNAL_MODE = os.environ.get("CAFE_DB_JOURNAL_MODE", "wal")
+BUSY_TIMEOUT = os.environ.get("CAFE_DB_BUSY_TIMEOUT", "5000")
+TEMP_STORE = os.environ.get("CAFE_DB_TEMP_STORE", "memory")
+
+# Read profile applied to every report connection.
+# - mmap_size covers the whole (~57 MB) database so multi-month scans of
+#   `transactions` read memory-mapped pages instead of copying them.
+# - cache_size is per connection; negative values are KiB (so -16384 is
+#   16 MiB, vs. the 2000-page default the audit found).
+# - query_only makes report connections refuse writes outright.
+READ_PRAGMAS = (
+    ("journal_mode", JOURNAL_MODE),
+    ("busy_timeout", BUSY_TIMEOUT),
+    ("mmap_size", os.environ.get("CAFE_DB_MMAP_SIZE", str(256 * 1024 * 1024))),
+    ("cache_size", os.environ.get("CAFE_DB_CACHE_SIZE", "-16384")),
+    ("temp_store", TEMP_STORE),
+    ("query_only", os.environ.get("CAFE_DB_QUERY_ONLY", "1")),
+)
+
+# Write profile for ingestion connections.
+# - synchronous=NORMAL is durable under WAL except for the last commit on
+#   power loss, which a re-run of the (idempotent) import recovers.
+WRITE_PRAGMAS = (
+    ("journal_mode", JOURNAL_MODE),
+    ("synchronous", os.environ.get("CAFE_DB_WRITE_SYNCHRONOUS", "normal")),
+    ("busy_timeout", BUSY_TIMEOUT),
+    ("cache_size", os.environ.get("CAFE_DB_WRITE_CACHE_SIZE", "-16384")),
+    ("temp_store", TEMP_STORE),
+)
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: Iterable[tuple[str, str | None]]) -> None:
+    """
+    Apply a (name, value) PRAGMA profile to a connection.
+
+    journal_mode is persistent and needs a brief write lock to change; if
+    another process holds the database (or the file is read-only) we keep
+    whatever mode the file already has rather than failing the request or
+    aborting the import.
+    """
+    for name, value in pragmas:
+        if value in (None, ""):
+            continue
+        try:
+            conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.OperationalError:
+            if name != "journal_mode":
+                raise
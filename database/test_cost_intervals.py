@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for item_cost_intervals maintenance.
+
+Covers:
+    - Intervals are built from existing history when the table is created
+    - Triggers keep an item's intervals current on insert/update/delete
+    - The import script refreshes intervals alongside history
+
+Run:
+    cd database/
+    python -m pytest test_cost_intervals.py -v
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cost_intervals import OPEN_END, ensure_cost_intervals, rebuild_cost_intervals
+from import_item_costs import ensure_history_table, import_costs
+from money_columns import ensure_money_columns, to_cents
+
+
+class TestCostIntervals(unittest.TestCase):
+
+    def setUp(self):
+        self.db_fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        self.conn = sqlite3.connect(self.db_path)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute("""
+            CREATE TABLE items (
+                item_id INTEGER PRIMARY KEY,
+                item_name TEXT NOT NULL,
+                current_cost DECIMAL(10,2),
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.cursor.executemany(
+            "INSERT INTO items (item_id, item_name) VALUES (?, ?)",
+            [(101, "Latte"), (102, "Scone")],
+        )
+        ensure_history_table(self.cursor)
+
+    def tearDown(self):
+        self.conn.close()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+    def add_cost(self, item_id, cost, effective_date):
+        ensure_money_columns(self.cursor)
+        self.cursor.execute(
+            "INSERT INTO item_cost_history (item_id, cost, cost_cents, effective_date) "
+            "VALUES (?, ?, ?, ?)",
+            (item_id, cost, to_cents(cost), effective_date),
+        )
+
+    def intervals(self):
+        self.cursor.execute("SELECT * FROM item_cost_intervals ORDER BY item_id, effective_from")
+        return self.cursor.fetchall()
+
+    def test_created_from_existing_history(self):
+        self.add_cost(101, 1.25, "2026-03-01")
+        self.add_cost(101, 1.00, "2026-01-01")
+        self.add_cost(102, 0.80, "2026-02-10")
+
+        ensure_cost_intervals(self.cursor)
+
+        self.assertEqual(self.intervals(), [
+            (101, "2026-01-01", "2026-03-01", 100),
+            (101, "2026-03-01", OPEN_END, 125),
+            (102, "2026-02-10", OPEN_END, 80),
+        ])
+
+    def test_triggers_refresh_changed_item(self):
+        ensure_cost_intervals(self.cursor)
+        self.add_cost(101, 1.00, "2026-01-01")
+        self.add_cost(101, 1.50, "2026-04-01")
+        self.add_cost(102, 0.80, "2026-02-10")
+        self.assertEqual(len(self.intervals()), 3)
+
+        # Moving a row to another item refreshes both items
+        self.cursor.execute(
+            "UPDATE item_cost_history SET item_id = 102 WHERE effective_date = '2026-04-01'"
+        )
+        self.assertEqual(self.intervals(), [
+            (101, "2026-01-01", OPEN_END, 100),
+            (102, "2026-02-10", "2026-04-01", 80),
+            (102, "2026-04-01", OPEN_END, 150),
+        ])
+
+        self.cursor.execute("DELETE FROM item_cost_history WHERE item_id = 102")
+        self.assertEqual(self.intervals(), [(101, "2026-01-01", OPEN_END, 100)])
+
+        self.assertEqual(rebuild_cost_intervals(self.cursor), 1)
+
+    def test_import_costs_refreshes_intervals(self):
+        self.conn.commit()
+        csv_fd, csv_path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(csv_fd, "w") as f:
+            f.write("item_id,item_name,cost,effective_date\n")
+            f.write("101,Latte,1.00,2026-01-01\n")
+            f.write("101,Latte,1.20,2026-05-01\n")
+        try:
+            self.assertTrue(import_costs(Path(self.db_path), Path(csv_path)))
+        finally:
+            os.unlink(csv_path)
+
+        self.assertEqual(self.intervals(), [
+            (101, "2026-01-01", "2026-05-01", 100),
+            (101, "2026-05-01", OPEN_END, 120),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
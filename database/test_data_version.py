@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for data-version tracking.
+
+Covers:
+    - Triggers stamp the written day (transactions) or the global scope
+      (items) on insert/update/delete
+    - Span versions only change for writes inside the span
+    - Failed (duplicate) inserts don't stamp anything
+    - Installation is idempotent, upgrades changed triggers and skips
+      tables that don't exist
+
+Run:
+    cd database/
+    python -m pytest test_data_version.py -v
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_version import bump_data_version, ensure_data_version_tracking, get_data_version
+from test_import_vivonet import create_test_db
+
+
+class TestDataVersion(unittest.TestCase):
+
+    def setUp(self):
+        self.db_fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        self.conn = create_test_db(self.db_path)
+        self.cursor = self.conn.cursor()
+        ensure_data_version_tracking(self.cursor)
+
+    def tearDown(self):
+        self.conn.close()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+    def insert_txn(self, ts="2026-02-17 08:00:00"):
+        self.cursor.execute("""
+            INSERT INTO transactions (
+                transaction_date, item_id, item_name, category,
+                quantity, register_num, unit_price, total_amount
+            ) VALUES (?, 101, 'Brewed Coffee', 'coffeetea', 1, 1, 3.5, 3.5)
+        """, (ts,))
+
+    def scopes(self):
+        self.cursor.execute("SELECT scope, version FROM data_versions ORDER BY scope")
+        return dict(self.cursor.fetchall())
+
+    def test_writes_bump_version(self):
+        self.assertEqual(get_data_version(self.cursor), 0)
+        self.insert_txn()
+        self.assertEqual(get_data_version(self.cursor), 1)
+        self.cursor.execute("UPDATE items SET current_price = 4.0 WHERE item_id = 101")
+        self.assertEqual(get_data_version(self.cursor), 2)
+        self.cursor.execute("DELETE FROM transactions")
+        self.assertEqual(get_data_version(self.cursor), 3)
+        self.assertEqual(self.scopes(), {
+            "day:2026-02-17": 3, "global": 2, "sequence": 3,
+        })
+
+    def test_span_version_tracks_days_in_span(self):
+        self.insert_txn("2026-02-17 08:00:00")
+        self.insert_txn("2026-03-05 08:00:00")
+        feb = get_data_version(self.cursor, "2026-02-01", "2026-02-28")
+        mar = get_data_version(self.cursor, "2026-03-01", "2026-03-31")
+
+        self.insert_txn("2026-03-06 09:00:00")
+        self.assertEqual(get_data_version(self.cursor, "2026-02-01", "2026-02-28"), feb)
+        self.assertGreater(get_data_version(self.cursor, "2026-03-01", "2026-03-31"), mar)
+
+        # Moving a row between days stamps both
+        self.cursor.execute(
+            "UPDATE transactions SET transaction_date = '2026-02-20 08:00:00' "
+            "WHERE transaction_date = '2026-03-05 08:00:00'"
+        )
+        self.assertGreater(get_data_version(self.cursor, "2026-02-01", "2026-02-28"), feb)
+        self.assertEqual(self.scopes()["day:2026-03-05"], self.scopes()["day:2026-02-20"])
+
+        # Catalog changes reach every span
+        before = get_data_version(self.cursor, "2025-01-01", "2025-01-31")
+        self.cursor.execute("UPDATE items SET current_price = 4.0 WHERE item_id = 101")
+        self.assertGreater(get_data_version(self.cursor, "2025-01-01", "2025-01-31"), before)
+
+    def test_rejected_insert_does_not_bump(self):
+        self.insert_txn()
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.insert_txn()
+        self.assertEqual(get_data_version(self.cursor), 1)
+
+    def test_install_is_idempotent(self):
+        ensure_data_version_tracking(self.cursor)
+        self.insert_txn()
+        self.assertEqual(get_data_version(self.cursor), 1)
+
+        # labor_hours/settings aren't in this test schema: no triggers for them
+        self.cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'"
+        )
+        self.assertEqual(self.cursor.fetchone()[0], 6)
+
+    def test_outdated_trigger_is_replaced(self):
+        self.cursor.execute("DROP TRIGGER trg_data_version_transactions_insert")
+        self.cursor.execute("""
+            CREATE TRIGGER trg_data_version_transactions_insert
+            AFTER INSERT ON transactions
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE scope = 'global';
+            END
+        """)
+        ensure_data_version_tracking(self.cursor)
+        self.insert_txn()
+        self.assertEqual(self.scopes()["global"], 0)
+        self.assertEqual(self.scopes()["day:2026-02-17"], 1)
+
+    def test_explicit_bump(self):
+        bump_data_version(self.cursor)
+        self.assertEqual(self.scopes()["global"], 1)
+        bump_data_version(self.cursor, ["2026-02-17", "2026-02-18"])
+        self.assertEqual(self.scopes()["day:2026-02-18"], 3)
+
+    def test_untracked_database_has_no_version(self):
+        conn = sqlite3.connect(":memory:")
+        self.assertIsNone(get_data_version(conn.cursor()))
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the event_calendar table.
+
+Covers:
+    - Imports insert events and update names on re-import
+    - replace deletes the imported types' other events only
+    - Invalid rows are rejected before anything is written
+    - Writes stamp the event's day in data_versions
+    - CSV files need date,type columns
+
+Run:
+    cd database/
+    python -m pytest test_event_calendar.py -v
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_version import get_data_version
+from event_calendar import import_events, read_events_csv
+from test_import_vivonet import create_test_db
+
+
+class TestEventCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.db_fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        self.conn = create_test_db(self.db_path)
+        self.cursor = self.conn.cursor()
+
+    def tearDown(self):
+        self.conn.close()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+    def events(self):
+        self.cursor.execute(
+            "SELECT event_date, event_type, name FROM event_calendar ORDER BY event_date, event_type"
+        )
+        return self.cursor.fetchall()
+
+    def test_import_and_update(self):
+        count = import_events(self.cursor, [
+            ("2026-09-05", "game_day", "Cal vs. Oregon"),
+            ("2026-11-26", "holiday", None),
+        ])
+        self.assertEqual(count, 2)
+        import_events(self.cursor, [("2026-09-05", "game_day", " Cal vs. Oregon State ")])
+        self.assertEqual(self.events(), [
+            ("2026-09-05", "game_day", "Cal vs. Oregon State"),
+            ("2026-11-26", "holiday", None),
+        ])
+
+    def test_replace_only_touches_imported_types(self):
+        import_events(self.cursor, [
+            ("2025-09-06", "game_day", None),
+            ("2025-12-25", "closure", None),
+        ])
+        import_events(self.cursor, [("2026-09-05", "game_day", None)], replace=True)
+        self.assertEqual(self.events(), [
+            ("2025-12-25", "closure", None),
+            ("2026-09-05", "game_day", None),
+        ])
+
+    def test_invalid_rows_write_nothing(self):
+        import_events(self.cursor, [("2026-09-05", "game_day", None)])
+        for bad in (("2026-09-12", "concert", None), ("09/12/2026", "game_day", None)):
+            with self.assertRaises(ValueError):
+                import_events(self.cursor, [("2026-09-19", "game_day", None), bad], replace=True)
+        self.assertEqual(self.events(), [("2026-09-05", "game_day", None)])
+
+    def test_writes_stamp_event_day(self):
+        import_events(self.cursor, [])
+        before = get_data_version(self.cursor, "2026-09-05", "2026-09-05")
+        other_day = get_data_version(self.cursor, "2026-09-12", "2026-09-12")
+
+        import_events(self.cursor, [("2026-09-05", "game_day", None)])
+        self.assertGreater(get_data_version(self.cursor, "2026-09-05", "2026-09-05"), before)
+        self.assertEqual(get_data_version(self.cursor, "2026-09-12", "2026-09-12"), other_day)
+
+        stamped = get_data_version(self.cursor, "2026-09-05", "2026-09-05")
+        self.cursor.execute("DELETE FROM event_calendar")
+        self.assertGreater(get_data_version(self.cursor, "2026-09-05", "2026-09-05"), stamped)
+
+    def test_csv_needs_date_and_type(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            good = os.path.join(tmp, "events.csv")
+            with open(good, "w") as f:
+                f.write("date,type,name\n2026-09-05,game_day,Cal vs. Oregon\n2026-11-26,holiday,\n")
+            self.assertEqual(read_events_csv(good), [
+                ("2026-09-05", "game_day", "Cal vs. Oregon"),
+                ("2026-11-26", "holiday", ""),
+            ])
+
+            bad = os.path.join(tmp, "dates.csv")
+            with open(bad, "w") as f:
+                f.write("date\n2026-09-05\n")
+            with self.assertRaises(ValueError):
+                read_events_csv(bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
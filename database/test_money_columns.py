@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the integer-cents money columns.
+
+Covers:
+    - to_cents() rounds like the SQL backfill
+    - Migration adds and backfills the columns from the float columns
+    - Vivonet ingestion writes the cents on insert
+    - Triggers fill the cents for rows written any other way
+    - database/schema.sql starts out migrated
+    - Cost intervals from before cost_cents are rebuilt in cents
+
+Run:
+    cd database/
+    python -m pytest test_money_columns.py -v
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cost_intervals import OPEN_END, ensure_cost_intervals
+from import_item_costs import ensure_history_table
+from money_columns import CENTS_SQL, ensure_money_columns, to_cents
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+from test_import_vivonet import create_test_db, make_line_item, make_order
+from vivonet_service import (
+    build_product_map,
+    ensure_vivonet_columns,
+    ingest_orders,
+    setup_logging,
+)
+
+
+class TestMoneyColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.db_fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        self.conn = create_test_db(self.db_path)
+        self.cursor = self.conn.cursor()
+
+    def tearDown(self):
+        self.conn.close()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+    def test_to_cents_matches_sql(self):
+        for amount in (4.15, 0.1 + 0.2, 12.45, 0.125, -0.125, 1999.99, 0, "3.50"):
+            self.cursor.execute(f"SELECT {CENTS_SQL.format(column='?')}", (amount,))
+            self.assertEqual(to_cents(amount), self.cursor.fetchone()[0], amount)
+        self.assertEqual(to_cents(0.125), 13)
+        self.assertEqual(to_cents("3.50"), 350)
+
+    def test_backfill_from_float_columns(self):
+        self.cursor.executemany(
+            """
+            INSERT INTO transactions (
+                transaction_date, item_id, item_name, category,
+                quantity, register_num, unit_price, total_amount
+            ) VALUES (?, 101, 'x', 'coffeetea', ?, 1, ?, ?)
+            """,
+            [("2026-02-17 08:00:00", 3, 4.15, 12.45), ("2026-02-17 09:00:00", 1, 0.1 + 0.2, 0.1 + 0.2)],
+        )
+
+        self.assertEqual(ensure_money_columns(self.cursor), 2)
+
+        self.cursor.execute("SELECT unit_price_cents, total_cents FROM transactions ORDER BY 1")
+        self.assertEqual(self.cursor.fetchall(), [(30, 30), (415, 1245)])
+        # Second call is a no-op
+        self.assertEqual(ensure_money_columns(self.cursor), 0)
+
+    def test_ingest_orders_writes_cents(self):
+        ensure_vivonet_columns(self.cursor)
+        ensure_money_columns(self.cursor)
+        orders = [make_order(
+            1001, "2026-02-17 18:00:00", 7898454,
+            [make_line_item(50001, 17188487, "Brewed Coffee", 3, 4.15)]
+        )]
+        ingest_orders(orders, self.cursor, build_product_map(self.cursor),
+                      setup_logging(), "cafe")
+
+        self.cursor.execute("SELECT total_amount, unit_price_cents, total_cents FROM transactions")
+        self.assertEqual(self.cursor.fetchall(), [(12.45, 415, 1245)])
+
+    def test_triggers_fill_cents_for_other_writers(self):
+        ensure_money_columns(self.cursor)
+        self.cursor.execute("""
+            INSERT INTO transactions (
+                transaction_date, item_id, item_name, category,
+                quantity, register_num, unit_price, total_amount
+            ) VALUES ('2026-02-17 08:00:00', 101, 'x', 'coffeetea', 3, 1, 4.15, 12.45)
+        """)
+        self.cursor.execute("SELECT unit_price_cents, total_cents FROM transactions")
+        self.assertEqual(self.cursor.fetchall(), [(415, 1245)])
+
+        # Updating the dollars (or writing bad cents) recomputes the cents
+        self.cursor.execute("UPDATE transactions SET quantity = 2, total_amount = 8.30")
+        self.cursor.execute("UPDATE transactions SET unit_price_cents = 0")
+        self.cursor.execute("SELECT unit_price_cents, total_cents FROM transactions")
+        self.assertEqual(self.cursor.fetchall(), [(415, 830)])
+
+    def test_cost_triggers_keep_intervals_in_cents(self):
+        ensure_history_table(self.cursor)
+        ensure_cost_intervals(self.cursor)
+        self.cursor.execute(
+            "INSERT INTO item_cost_history (item_id, cost, effective_date) VALUES (101, 1.15, '2026-01-01')"
+        )
+        self.cursor.execute("UPDATE item_cost_history SET cost = 1.35")
+
+        self.cursor.execute("SELECT cost_cents FROM item_cost_history")
+        self.assertEqual(self.cursor.fetchall(), [(135,)])
+        self.cursor.execute("SELECT * FROM item_cost_intervals")
+        self.assertEqual(self.cursor.fetchall(), [(101, "2026-01-01", OPEN_END, 135)])
+
+    def test_schema_sql_is_migrated(self):
+        with open(SCHEMA_PATH) as f:
+            schema = f.read().replace("CREATE TABLE sqlite_sequence(name,seq);", "")
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.executescript(schema)
+            cursor = conn.cursor()
+            cursor.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name")
+            before = cursor.fetchall()
+            self.assertEqual(ensure_money_columns(cursor), 0)
+            cursor.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name")
+            self.assertEqual(cursor.fetchall(), before)
+        finally:
+            conn.close()
+
+    def test_float_cost_intervals_are_rebuilt_in_cents(self):
+        ensure_history_table(self.cursor)
+        self.cursor.execute(
+            "INSERT INTO item_cost_history (item_id, cost, effective_date) VALUES (101, 1.15, '2026-01-01')"
+        )
+        self.cursor.execute("""
+            CREATE TABLE item_cost_intervals (
+                item_id INTEGER NOT NULL,
+                effective_from DATE NOT NULL,
+                effective_to DATE NOT NULL,
+                cost REAL NOT NULL,
+                PRIMARY KEY (item_id, effective_from)
+            ) WITHOUT ROWID
+        """)
+
+        ensure_cost_intervals(self.cursor)
+
+        self.cursor.execute("SELECT * FROM item_cost_intervals")
+        self.assertEqual(self.cursor.fetchall(), [(101, "2026-01-01", OPEN_END, 115)])
+
+
+if __name__ == "__main__":
+    unittest.main()
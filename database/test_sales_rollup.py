@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests for the sales_hourly_rollup maintenance helpers.
+
+Covers:
+    - Per-day refresh matches a fresh aggregate of transactions
+    - Vivonet ingestion keeps the rollup current for the days it touches
+    - Full rebuild marks the rollup ready in settings
+
+Run:
+    cd database/
+    python -m pytest test_sales_rollup.py -v
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from money_columns import ensure_money_columns, to_cents
+from sales_rollup import READY_SETTING_KEY, rebuild_rollup, refresh_rollup_days
+from test_import_vivonet import create_test_db, make_line_item, make_order
+from vivonet_service import (
+    build_product_map,
+    ensure_vivonet_columns,
+    ingest_orders,
+    setup_logging,
+)
+
+
+def insert_txn(cursor, ts, item_id, qty, amount, category="coffeetea"):
+    ensure_money_columns(cursor)
+    cursor.execute(
+        """
+        INSERT INTO transactions (
+            transaction_date, item_id, item_name, category,
+            quantity, register_num, unit_price, total_amount,
+            unit_price_cents, total_cents
+        ) VALUES (?, ?, 'x', ?, ?, 1, ?, ?, ?, ?)
+        """,
+        (ts, item_id, category, qty, amount / qty, amount,
+         to_cents(amount / qty), to_cents(amount)),
+    )
+
+
+class TestSalesRollup(unittest.TestCase):
+
+    def setUp(self):
+        self.db_fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        self.conn = create_test_db(self.db_path)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute("""
+            CREATE TABLE settings (
+                setting_key TEXT PRIMARY KEY,
+                setting_value TEXT NOT NULL,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def tearDown(self):
+        self.conn.close()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+    def rollup_rows(self):
+        self.cursor.execute("""
+            SELECT sale_date, sale_hour, day_of_week, item_id, units, revenue_cents, line_count
+            FROM sales_hourly_rollup
+            ORDER BY sale_date, sale_hour, item_id
+        """)
+        return self.cursor.fetchall()
+
+    def test_refresh_day_aggregates_by_hour_and_item(self):
+        insert_txn(self.cursor, "2026-02-17 08:05:00", 101, 1, 3.50)
+        insert_txn(self.cursor, "2026-02-17 08:40:00", 101, 2, 7.00)
+        insert_txn(self.cursor, "2026-02-17 09:10:00", 102, 1, 6.25)
+        insert_txn(self.cursor, "2026-02-18 08:00:00", 101, 1, 3.50)
+
+        self.assertEqual(refresh_rollup_days(self.cursor, ["2026-02-17"]), 1)
+
+        self.assertEqual(self.rollup_rows(), [
+            ("2026-02-17", 8, 2, 101, 3, 1050, 2),
+            ("2026-02-17", 9, 2, 102, 1, 625, 1),
+        ])
+
+        # A refresh replaces the day's rows rather than adding to them
+        self.cursor.execute("DELETE FROM transactions WHERE item_id = 102")
+        refresh_rollup_days(self.cursor, ["2026-02-17"])
+        self.assertEqual(len(self.rollup_rows()), 1)
+
+    def test_ingest_orders_refreshes_touched_days(self):
+        ensure_vivonet_columns(self.cursor)
+        ensure_money_columns(self.cursor)
+        orders = [make_order(
+            1001, "2026-02-17 18:00:00", 7898454,
+            [make_line_item(50001, 17188487, "Brewed Coffee", 2, 3.50)]
+        )]
+        ingest_orders(orders, self.cursor, build_product_map(self.cursor),
+                      setup_logging(), "cafe")
+
+        self.assertEqual(self.rollup_rows(), [
+            ("2026-02-17", 18, 2, 17188487, 2, 700, 1),
+        ])
+
+    def test_full_rebuild_marks_ready(self):
+        insert_txn(self.cursor, "2026-02-17 08:05:00", 101, 1, 3.50)
+        insert_txn(self.cursor, "2026-03-01 12:00:00", 103, 1, 3.00)
+
+        self.assertEqual(rebuild_rollup(self.cursor), 2)
+
+        self.cursor.execute(
+            "SELECT 1 FROM settings WHERE setting_key = ?", (READY_SETTING_KEY,)
+        )
+        self.assertIsNotNone(self.cursor.fetchone())
+
+    def test_float_revenue_rollup_is_rebuilt_in_cents(self):
+        insert_txn(self.cursor, "2026-02-17 08:05:00", 101, 1, 3.50)
+        insert_txn(self.cursor, "2026-02-18 09:00:00", 102, 2, 4.30)
+        self.cursor.execute("""
+            CREATE TABLE sales_hourly_rollup (
+                sale_date TEXT NOT NULL, sale_hour INTEGER NOT NULL,
+                day_of_week INTEGER NOT NULL, item_id INTEGER NOT NULL,
+                category TEXT NOT NULL, units INTEGER NOT NULL,
+                revenue REAL NOT NULL, line_count INTEGER NOT NULL,
+                PRIMARY KEY (sale_date, sale_hour, item_id)
+            ) WITHOUT ROWID
+        """)
+
+        # Refreshing one day rebuilds every day, so a ready rollup stays whole
+        refresh_rollup_days(self.cursor, ["2026-02-17"])
+
+        self.assertEqual(self.rollup_rows(), [
+            ("2026-02-17", 8, 2, 101, 1, 350, 1),
+            ("2026-02-18", 9, 3, 102, 2, 430, 1),
+        ])
+
+    def test_rollup_with_category_column_is_rebuilt_without_it(self):
+        insert_txn(self.cursor, "2026-02-17 08:05:00", 101, 1, 3.50)
+        self.cursor.execute("""
+            CREATE TABLE sales_hourly_rollup (
+                sale_date TEXT NOT NULL, sale_hour INTEGER NOT NULL,
+                day_of_week INTEGER NOT NULL, item_id INTEGER NOT NULL,
+                category TEXT NOT NULL, units INTEGER NOT NULL,
+                revenue_cents INTEGER NOT NULL, line_count INTEGER NOT NULL,
+                PRIMARY KEY (sale_date, sale_hour, item_id)
+            ) WITHOUT ROWID
+        """)
+
+        refresh_rollup_days(self.cursor, ["2026-02-17"])
+
+        self.cursor.execute("PRAGMA table_info(sales_hourly_rollup)")
+        self.assertNotIn("category", {row[1] for row in self.cursor.fetchall()})
+        self.assertEqual(self.rollup_rows(), [("2026-02-17", 8, 2, 101, 1, 350, 1)])
+
+    def test_range_refresh_leaves_ready_flag_alone(self):
+        insert_txn(self.cursor, "2026-02-17 08:05:00", 101, 1, 3.50)
+
+        rebuild_rollup(self.cursor, "2026-02-16", "2026-02-18")
+
+        self.cursor.execute("SELECT COUNT(*) FROM settings")
+        self.assertEqual(self.cursor.fetchone()[0], 0)
+        self.assertEqual(len(self.rollup_rows()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared PRAGMA profiles.
+
+Covers:
+    - Empty values are skipped
+    - A journal_mode the file can't switch to is kept as-is; other
+      failures still raise
+    - The read and write profiles agree on the journal mode and busy timeout
+
+Run:
+    cd database/
+    python -m pytest test_sqlite_pragmas.py -v
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlite_pragmas import READ_PRAGMAS, WRITE_PRAGMAS, apply_pragmas
+from vivonet_service import connect_for_ingest
+
+
+class TestApplyPragmas(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def test_empty_values_are_skipped(self):
+        conn = sqlite3.connect(self.db_path)
+        apply_pragmas(conn, [("cache_size", ""), ("busy_timeout", None), ("temp_store", "memory")])
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -2000)
+        self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)
+        conn.close()
+
+    def test_locked_journal_mode_is_kept(self):
+        holder = sqlite3.connect(self.db_path)
+        holder.execute("CREATE TABLE t (x INTEGER)")
+        holder.execute("BEGIN EXCLUSIVE")
+
+        conn = sqlite3.connect(self.db_path)
+        apply_pragmas(conn, [("busy_timeout", "0"), ("journal_mode", "wal")])
+        holder.rollback()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            apply_pragmas(conn, [("cache_size", "1 1")])
+        conn.close()
+        holder.close()
+
+    def test_ingest_connection_uses_the_write_profile(self):
+        self.assertEqual(dict(READ_PRAGMAS)["journal_mode"], dict(WRITE_PRAGMAS)["journal_mode"])
+        self.assertEqual(dict(READ_PRAGMAS)["busy_timeout"], dict(WRITE_PRAGMAS)["busy_timeout"])
+
+        conn = connect_for_ingest(self.db_path)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], dict(WRITE_PRAGMAS)["journal_mode"])
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], int(dict(WRITE_PRAGMAS)["busy_timeout"]))
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the stored time-dimension columns on transactions.
+
+Covers:
+    - Migration adds and backfills the columns to match DATE()/strftime()
+    - Triggers fill the columns on insert and on transaction_date updates
+    - Vivonet ingestion gets the columns from the triggers, and leaves an
+      unmigrated database's schema alone
+    - schema.sql is already migrated
+    - Hourly report queries are answered from the covering indexes
+
+Run:
+    cd database/
+    python -m pytest test_transaction_time_columns.py -v
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+from test_import_vivonet import create_test_db, make_line_item, make_order
+from test_sales_rollup import insert_txn
+from transaction_time_columns import (
+    DATE_TIME_INDEX,
+    ITEM_TIME_INDEX,
+    ensure_time_columns,
+)
+from vivonet_service import (
+    build_product_map,
+    ensure_vivonet_columns,
+    ingest_orders,
+    setup_logging,
+)
+
+
+class TestTransactionTimeColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.db_fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        self.conn = create_test_db(self.db_path)
+        self.cursor = self.conn.cursor()
+
+    def tearDown(self):
+        self.conn.close()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+    def test_backfill_matches_sql_functions(self):
+        # Sunday night, Monday morning, Saturday noon
+        for ts in ("2026-02-15 23:59:00", "2026-02-16 00:05:00", "2026-02-21 12:00:00"):
+            insert_txn(self.cursor, ts, 101, 1, 3.50)
+
+        self.assertEqual(ensure_time_columns(self.cursor), 3)
+
+        self.cursor.execute("""
+            SELECT sale_date = DATE(transaction_date),
+                   sale_hour = CAST(strftime('%H', transaction_date) AS INTEGER),
+                   day_of_week = CAST(strftime('%w', transaction_date) AS INTEGER)
+            FROM transactions
+        """)
+        self.assertEqual(self.cursor.fetchall(), [(1, 1, 1)] * 3)
+
+        # Second call is a no-op
+        self.assertEqual(ensure_time_columns(self.cursor), 0)
+
+    def time_columns(self):
+        self.cursor.execute("SELECT sale_date, sale_hour, day_of_week FROM transactions")
+        return self.cursor.fetchall()
+
+    def test_triggers_fill_columns_for_other_writers(self):
+        ensure_time_columns(self.cursor)
+        # Written without the time columns, as seed_data.py does
+        insert_txn(self.cursor, "2026-02-15 23:59:00", 101, 1, 3.50)
+        self.assertEqual(self.time_columns(), [("2026-02-15", 23, 0)])
+
+        self.cursor.execute("UPDATE transactions SET transaction_date = '2026-02-21 12:00:00'")
+        self.assertEqual(self.time_columns(), [("2026-02-21", 12, 6)])
+
+        # A stray write to a derived column is put back
+        self.cursor.execute("UPDATE transactions SET sale_hour = 3")
+        self.assertEqual(self.time_columns(), [("2026-02-21", 12, 6)])
+
+    def ingest(self, when):
+        orders = [make_order(
+            1001, when, 7898454,
+            [make_line_item(50001, 17188487, "Brewed Coffee", 2, 3.50)]
+        )]
+        ingest_orders(orders, self.cursor, build_product_map(self.cursor),
+                      setup_logging(), "cafe")
+
+    def test_ingest_leaves_unmigrated_schema_alone(self):
+        ensure_vivonet_columns(self.cursor)
+        self.cursor.execute("SELECT name, sql FROM sqlite_master")
+        before = self.cursor.fetchall()
+
+        self.ingest("2026-02-17 18:00:00")
+        self.cursor.execute("SELECT name, sql FROM sqlite_master")
+        self.assertEqual(self.cursor.fetchall(), before)
+        self.cursor.execute("SELECT COUNT(*) FROM transactions")
+        self.assertEqual(self.cursor.fetchone()[0], 1)
+
+    def test_ingest_orders_writes_time_columns(self):
+        ensure_vivonet_columns(self.cursor)
+        ensure_time_columns(self.cursor)
+        self.ingest("2026-02-17 18:00:00")
+
+        self.assertEqual(self.time_columns(), [("2026-02-17", 18, 2)])
+
+    def test_schema_sql_is_migrated(self):
+        with open(SCHEMA_PATH) as f:
+            schema = f.read().replace("CREATE TABLE sqlite_sequence(name,seq);", "")
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.executescript(schema)
+            cursor = conn.cursor()
+            cursor.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name")
+            before = cursor.fetchall()
+            self.assertEqual(ensure_time_columns(cursor), 0)
+            cursor.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name")
+            self.assertEqual(cursor.fetchall(), before)
+        finally:
+            conn.close()
+
+    def query_plan(self, sql, params):
+        self.cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return " | ".join(row[3] for row in self.cursor.fetchall())
+
+    def test_hourly_queries_use_covering_indexes(self):
+        ensure_time_columns(self.cursor)
+        date_range = ("2026-02-01 00:00:00", "2026-03-01 00:00:00")
+
+        plan = self.query_plan("""
+            SELECT sale_date, day_of_week, sale_hour, SUM(total_cents), SUM(quantity)
+            FROM transactions
+            WHERE item_id = ? AND transaction_date >= ? AND transaction_date < ?
+              AND sale_date NOT IN (?)
+            GROUP BY sale_date, day_of_week, sale_hour
+        """, (101, *date_range, "2026-02-14"))
+        self.assertIn(f"COVERING INDEX {ITEM_TIME_INDEX}", plan)
+
+        plan = self.query_plan("""
+            SELECT sale_date, sale_hour, SUM(total_cents)
+            FROM transactions
+            WHERE transaction_date >= ? AND transaction_date < ?
+            GROUP BY sale_date, sale_hour
+        """, date_range)
+        self.assertIn(f"COVERING INDEX {DATE_TIME_INDEX}", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Maintain the stored time-dimension columns on `transactions`.
+
+The hourly reports (sales-per-hour, item-heatmap, time-period-comparison)
+group raw transactions by day, hour and weekday. Without stored columns
+they evaluate DATE(), strftime('%H') and strftime('%w') on every matching
+row, and the exclude-dates variants put DATE(transaction_date) NOT IN (...)
+in the WHERE clause. This module adds:
+
+- sale_date ('YYYY-MM-DD'), sale_hour (0-23) and day_of_week
+  (0=Sunday ... 6=Saturday, as strftime('%w')) columns, and
+- covering indexes holding those columns plus item_id, quantity and
+  total_cents (see money_columns.py), so a date-range (or item + date-range) report is answered
+  from the index alone with no per-row function calls.
+
+Triggers fill the columns on every insert and on updates of
+transaction_date, so rows written by anything (the importers,
+seed_data.py, a sqlite3 shell) carry them; the importers themselves only
+write transaction_date. database/schema.sql declares the columns, triggers
+and indexes, so new databases start out migrated.
+
+On an existing database, running this script is the migration.
+ensure_time_columns() adds the columns, backfills existing rows and
+installs the triggers, then creates the indexes last (after
+ensure_money_columns(), since they hold total_cents). Backfilling and
+building the indexes rewrites the whole table, so the importers never do
+it; run it once, outside a sync. The backend only reads the columns once
+the covering index exists (backend/sales_source.py), so an unmigrated
+database keeps using the DATE()/strftime() expressions.
+
+Usage:
+    python database/transaction_time_columns.py
+    python database/transaction_time_columns.py --db database/cafe_reports_vivonet_dev.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+from pathlib import Path
+
+from money_columns import derived_column_triggers, ensure_money_columns, install_triggers
+
+
+# column -> (type, SQL that derives it from transaction_date), with {row}
+# standing for the row alias as in derived_column_triggers()
+TIME_COLUMNS = {
+    "sale_date": ("TEXT", "DATE({row}.transaction_date)"),
+    "sale_hour": ("INTEGER", "CAST(strftime('%H', {row}.transaction_date) AS INTEGER)"),
+    "day_of_week": ("INTEGER", "CAST(strftime('%w', {row}.transaction_date) AS INTEGER)"),
+}
+
+# The backend treats the first index as the "columns are populated" marker
+# (for the time and the cents columns both).
+ITEM_TIME_INDEX = "idx_transactions_item_time_cents"
+DATE_TIME_INDEX = "idx_transactions_date_item_time_cents"
+
+# Earlier covering indexes: a date-leading one without item_id, and the
+# pair holding total_amount that the cents indexes replace.
+SUPERSEDED_INDEXES = (
+    "idx_transactions_date_time",
+    "idx_transactions_item_time",
+    "idx_transactions_date_item_time",
+)
+
+CREATE_INDEX_SQL = (
+    # Per-item reports: item_id = ? AND transaction_date range
+    f"""
+    CREATE INDEX IF NOT EXISTS {ITEM_TIME_INDEX}
+    ON transactions (item_id, transaction_date, sale_date, day_of_week,
+                     sale_hour, quantity, total_cents)
+    """,
+    # All-item reports: transaction_date range only. item_id comes right
+    # after the date so per-item totals (items-by-revenue, top-items) are
+    # index-only too.
+    f"""
+    CREATE INDEX IF NOT EXISTS {DATE_TIME_INDEX}
+    ON transactions (transaction_date, item_id, sale_date, day_of_week,
+                     sale_hour, quantity, total_cents)
+    """,
+)
+
+
+def default_db_path() -> Path:
+    script_dir = Path(__file__).resolve().parent
+    env_path = os.environ.get("CAFE_DB_PATH")
+    if env_path:
+        return Path(env_path).expanduser().resolve()
+    return script_dir / "cafe_reports.db"
+
+
+def time_triggers() -> list[tuple[str, str]]:
+    """The triggers computing the time columns from transaction_date."""
+    return derived_column_triggers(
+        "transactions_time", "transactions", "transaction_id", ["transaction_date"],
+        {name: expr for name, (_, expr) in TIME_COLUMNS.items()},
+    )
+
+
+def ensure_time_columns(cursor: sqlite3.Cursor) -> int:
+    """
+    Add, backfill and index the time-dimension columns if missing, and
+    install the triggers that keep them current.
+
+    Runs inside the caller's transaction; the caller commits. Once the
+    columns exist only outdated triggers are replaced. Returns the number
+    of rows backfilled.
+    """
+    ensure_money_columns(cursor)
+
+    cursor.execute("PRAGMA table_info(transactions)")
+    existing = {row[1] for row in cursor.fetchall()}
+
+    added = []
+    for name, (sql_type, _) in TIME_COLUMNS.items():
+        if name not in existing:
+            print(f"  🔧 Adding column: {name}")
+            cursor.execute(f"ALTER TABLE transactions ADD COLUMN {name} {sql_type}")
+            added.append(name)
+
+    backfilled = 0
+    if added:
+        backfilled = backfill_time_columns(cursor)
+    install_triggers(cursor, time_triggers())
+
+    for sql in CREATE_INDEX_SQL:
+        cursor.execute(sql)
+    for name in SUPERSEDED_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    return backfilled
+
+
+def backfill_time_columns(cursor: sqlite3.Cursor) -> int:
+    """Fill the time columns for rows that don't have them yet."""
+    assignments = ", ".join(
+        f"{name} = {expr.format(row='transactions')}" for name, (_, expr) in TIME_COLUMNS.items()
+    )
+    cursor.execute(f"UPDATE transactions SET {assignments} WHERE sale_date IS NULL")
+    return cursor.rowcount
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Add and backfill transactions time columns")
+    parser.add_argument("--db", default=None, help="Path to SQLite database")
+    args = parser.parse_args()
+
+    db_path = Path(args.db).expanduser().resolve() if args.db else default_db_path()
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        return 1
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    print(f"Database: {db_path}")
+    rows = ensure_time_columns(cursor)
+    # Rows written by anything that bypassed the importers
+    rows += backfill_time_columns(cursor)
+    conn.commit()
+    conn.close()
+    print(f"Backfilled time columns for {rows} transactions")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
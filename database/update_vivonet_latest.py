@@ -224,6 +224,9 @@ def local_update(args: argparse.Namespace) -> tuple[dt.date, dt.date]:
     if rc != 0:
         raise SystemExit(f"Vivonet import failed with exit code {rc}")
 
+    # Store today's forecasts from the new sales (see backend/forecast_job.py)
+    run([sys.executable, "backend/forecast_job.py", "--db", str(db_path)])
+
     latest_after = get_latest_vivonet_timestamp(db_path)
     summary_after = get_daily_summary(db_path, start_date)
     print_summary("Local DB after Vivonet update", latest_after, summary_after)
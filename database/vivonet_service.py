@@ -15,6 +15,11 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+from data_version import ensure_data_version_tracking
+from money_columns import to_cents
+from sales_rollup import refresh_rollup_days
+from sqlite_pragmas import WRITE_PRAGMAS, apply_pragmas
+
 try:
     import requests
 except ImportError:
@@ -61,6 +66,14 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(SCRIPT_DIR, "cafe_reports.db")
 LOG_PATH = os.path.join(SCRIPT_DIR, "vivonet_review.log")
 
+
+def connect_for_ingest(db_path):
+    """Open a connection configured with the ingestion write profile."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    apply_pragmas(conn, WRITE_PRAGMAS)
+    return conn
+
 def setup_logging():
     """Configure review logger for flagged items."""
     logger = logging.getLogger("vivonet_review")
@@ -261,6 +274,7 @@ def ingest_orders(orders, cursor, name_map, review_logger, store_key):
     Returns dict: {inserted, skipped, flagged, unmapped}
     """
     stats = {"inserted": 0, "skipped": 0, "flagged": 0, "unmapped": 0}
+    touched_days = set()
 
     for order in orders:
         order_id = order.get("orderId")
@@ -271,6 +285,7 @@ def ingest_orders(orders, cursor, name_map, review_logger, store_key):
 
         local_dt = parse_vivonet_timestamp(closed_ts_utc)
         date_str = local_dt.strftime("%Y-%m-%d")
+        inserted_before = stats["inserted"]
 
         for check in order.get("checks", []):
             for li in check.get("orderLineItems", []):
@@ -279,6 +294,12 @@ def ingest_orders(orders, cursor, name_map, review_logger, store_key):
                     cursor, name_map, review_logger, stats
                 )
 
+        if stats["inserted"] > inserted_before:
+            touched_days.add(date_str)
+
+    # Keep sales_hourly_rollup current for just the days this batch changed.
+    refresh_rollup_days(cursor, touched_days)
+
     return stats
 def _process_line_item(li, order_id, local_dt, date_str, position_id,
                        cursor, name_map, review_logger, stats):
@@ -341,7 +362,9 @@ def _insert_transaction(cursor, local_dt, resolved, quantity, price,
                         position_id, order_id, line_item_id, stats):
     """Insert one transaction row with idempotency guard."""
     item_id, item_name, category = resolved
-    total_amount = round(price * quantity, 2)
+    # Total from whole cents, so it matches the cents the triggers derive
+    # (money_columns.py); the triggers also fill the time columns
+    total_amount = to_cents(price) * quantity / 100
 
     try:
         cursor.execute("""
@@ -375,10 +398,10 @@ def import_vivonet(start_date, end_date, store_key="cafe", db_path=None):
                 "unmapped": 0, "total_orders": 0}
     print(f"  ✅ {len(orders)} orders fetched")
 
-    conn = sqlite3.connect(db_path)
+    conn = connect_for_ingest(db_path)
     cursor = conn.cursor()
-    cursor.execute("PRAGMA foreign_keys = ON")
     ensure_vivonet_columns(cursor)
+    ensure_data_version_tracking(cursor)
     conn.commit()
 
     name_map = build_product_map(cursor)
@@ -392,11 +415,4 @@ def import_vivonet(start_date, end_date, store_key="cafe", db_path=None):
     if stats["flagged"] or stats["unmapped"]:
         print(f"  ⚠️  See {LOG_PATH}")
 
-    # Clear Flask cache if running
-    try:
-        import requests as req
-        req.post("http://localhost:5500/api/admin/clear-cache", timeout=2)
-    except Exception:
-        pass
-
     return stats
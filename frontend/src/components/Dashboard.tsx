@@ -19,10 +19,9 @@ import {
   Package,
 } from "lucide-react";
 import {
-  getItemsByRevenue,
-  getLaborPercent,
-  getTotalSales,
+  getDashboardSummary,
   getDataFreshness,
+  type DashboardSummary,
 } from "../utils/api";
 import ItemsByRevenue from "./ItemsByRevenue";
 import SalesPerHour from "./SalesPerHour";
@@ -312,24 +311,19 @@ export default function Dashboard() {
   const loadDashboardData = async () => {
     setLoading(true);
     try {
-      // These four requests are independent of each other -- run them
-      // concurrently instead of awaiting them one at a time.
-      const [revenueData, salesData, laborDataTotal, laborDataStudent] =
-        await Promise.all([
-          getItemsByRevenue(startDate, endDate),
-          getTotalSales(startDate, endDate),
-          getLaborPercent(startDate, endDate, true),
-          getLaborPercent(startDate, endDate, false),
-        ]);
-
-      if (revenueData.data.length > 0) {
-        const top = revenueData.data[0];
-        setTopSeller(top.item_name);
-        setTopSellerUnits(top.units_sold);
-        setTopSellerRevenue(top.revenue);
+      // One request for every KPI: the backend shares a single scan of the
+      // range and a single labor proration run between them.
+      const summary: DashboardSummary = (
+        await getDashboardSummary(startDate, endDate)
+      ).data;
+
+      if (summary.top_seller) {
+        setTopSeller(summary.top_seller.item_name);
+        setTopSellerUnits(summary.top_seller.units_sold);
+        setTopSellerRevenue(summary.top_seller.revenue);
       }
 
-      const totalSales = salesData.data.total_sales;
+      const totalSales = summary.total_sales;
       setTodaySales(totalSales);
 
       // Calculate daily average sales
@@ -341,35 +335,12 @@ export default function Dashboard() {
       const dailyAvg = numberOfDays > 0 ? totalSales / numberOfDays : 0;
       setAvgDailySales(dailyAvg);
 
-      // Calculate average labor percentage for the date range (weighted by sales volume)
-      // Get total labor (salaried + students)
-      if (laborDataTotal.data.length > 0) {
-        const totalLaborCost = laborDataTotal.data.reduce(
-          (sum: number, hour: any) => sum + hour.labor_cost,
-          0
-        );
-        const totalSales = laborDataTotal.data.reduce(
-          (sum: number, hour: any) => sum + hour.sales,
-          0
-        );
-        const avgLabor =
-          totalSales > 0 ? (totalLaborCost / totalSales) * 100 : 0;
-        setAvgLaborPct(avgLabor);
+      // Sales-weighted labor % for the range: all staff, and students only
+      if (summary.avg_labor_pct !== null) {
+        setAvgLaborPct(summary.avg_labor_pct);
       }
-
-      // Get student-only labor
-      if (laborDataStudent.data.length > 0) {
-        const studentLaborCost = laborDataStudent.data.reduce(
-          (sum: number, hour: any) => sum + hour.labor_cost,
-          0
-        );
-        const totalSales = laborDataStudent.data.reduce(
-          (sum: number, hour: any) => sum + hour.sales,
-          0
-        );
-        const avgStudentLabor =
-          totalSales > 0 ? (studentLaborCost / totalSales) * 100 : 0;
-        setAvgStudentLaborPct(avgStudentLabor);
+      if (summary.avg_student_labor_pct !== null) {
+        setAvgStudentLaborPct(summary.avg_student_labor_pct);
       }
     } catch (error) {
       console.error("Error loading dashboard data:", error);
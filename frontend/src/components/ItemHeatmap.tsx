@@ -2,7 +2,7 @@ import { useState, useEffect } from "react";
 import { useDateRange } from "../context/DateContext";
 import { getCategoryColor } from "../utils/categoryColors";
 import { formatCurrency } from "../utils/formatters";
-import { getTopItems, getItemHeatmap } from "../utils/api";
+import { getTopItems, getItemHeatmaps } from "../utils/api";
 import { useSaturdayFilter } from "../utils/useSaturdayFilter";
 import FilterBar from "./FilterBar";
 import ReportStateWrapper from "./ReportStateWrapper";
@@ -15,12 +15,11 @@ interface TopItem {
   total_revenue: number;
 }
 
-interface HeatmapCell {
-  day_of_week: string;
-  day_num: number;
-  hour: number;
-  revenue: number;
-  units: number;
+// Dense 7×24 matrices indexed [day_num][hour] (day_num 0 = Sunday)
+interface HeatmapMatrix {
+  item_id: number;
+  revenue: number[][];
+  units: number[][];
 }
 
 // Display order: Monday through Sunday (weekends on right)
@@ -38,7 +37,9 @@ const HOURS = [7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21]; // 7am-
 export default function ItemHeatmap() {
   const [topItems, setTopItems] = useState<TopItem[]>([]);
   const [selectedItem, setSelectedItem] = useState<TopItem | null>(null);
-  const [heatmapData, setHeatmapData] = useState<HeatmapCell[]>([]);
+  const [heatmaps, setHeatmaps] = useState<Map<number, HeatmapMatrix>>(
+    new Map()
+  );
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [sidebarCollapsed, setSidebarCollapsed] = useState(false);
@@ -77,37 +78,36 @@ export default function ItemHeatmap() {
     loadTopItems();
   }, [startDate, endDate]);
 
-  // Load heatmap data when item selected
+  // Load every listed item's heatmap in one request, so switching items
+  // doesn't refetch
   useEffect(() => {
-    if (!selectedItem) return;
+    if (topItems.length === 0) return;
 
-    const loadHeatmapData = async () => {
+    const loadHeatmaps = async () => {
       try {
         const excludeDates = getExcludeDates();
-        const response = await getItemHeatmap(
-          selectedItem.item_id,
+        const response = await getItemHeatmaps(
+          topItems.map((item) => item.item_id),
           startDate,
           endDate,
           excludeDates
         );
-        setHeatmapData(response.data || []);
+        const matrices: HeatmapMatrix[] = response.data || [];
+        setHeatmaps(new Map(matrices.map((m) => [m.item_id, m])));
       } catch (err) {
         console.error("Failed to load heatmap data", err);
       }
     };
 
-    loadHeatmapData();
-  }, [selectedItem, startDate, endDate, filters.saturdayFilter]);
+    loadHeatmaps();
+  }, [topItems, startDate, endDate, filters.saturdayFilter]);
 
-  // Create a map for quick lookups
-  const dataMap = new Map<string, number>();
-  heatmapData.forEach((cell) => {
-    const key = `${cell.day_num}-${cell.hour}`;
-    dataMap.set(key, cell.revenue);
-  });
+  const revenueMatrix = selectedItem
+    ? heatmaps.get(selectedItem.item_id)?.revenue
+    : undefined;
 
   // Calculate max revenue for color scaling
-  const maxRevenue = Math.max(...heatmapData.map((cell) => cell.revenue), 1);
+  const maxRevenue = Math.max(...(revenueMatrix?.flat() ?? []), 1);
 
   // Get revenue for a specific cell
   // Maps display index to database day_num (DB uses Sun=0, Mon=1, ..., Sat=6)
@@ -116,8 +116,7 @@ export default function ItemHeatmap() {
     // Display: Mon(0), Tue(1), ..., Sat(5), Sun(6)
     // Database: Sun(0), Mon(1), ..., Sat(6)
     const dbDayNum = displayDayIndex === 6 ? 0 : displayDayIndex + 1;
-    const key = `${dbDayNum}-${hour}`;
-    return dataMap.get(key) || 0;
+    return revenueMatrix?.[dbDayNum][hour] || 0;
   };
 
   // Calculate blue intensity
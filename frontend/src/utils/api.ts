@@ -103,6 +103,15 @@ export interface HeatmapCell {
   units: number;
 }
 
+// Dense 7×24 matrices indexed [day_num][hour] (day_num 0 = Sunday)
+export interface ItemHeatmapMatrix {
+  item_id: number;
+  item_name: string | null;
+  category: string | null;
+  revenue: number[][];
+  units: number[][];
+}
+
 export interface WeeklyForecast {
   week: number;
   start_date: string;
@@ -126,6 +135,35 @@ export interface CategoryDemandForecast {
   total_forecast: number;
 }
 
+export interface DashboardSummary {
+  top_seller: {
+    item_id: number;
+    item_name: string;
+    category: string;
+    is_resold: number;
+    units_sold: number;
+    revenue: number;
+  } | null;
+  total_sales: number;
+  avg_labor_pct: number | null;
+  avg_student_labor_pct: number | null;
+  labor_percent: {
+    all: LaborHour[];
+    hourly: LaborHour[];
+  };
+}
+
+// Dashboard KPIs (top seller, total sales, labor %) in one request
+export const getDashboardSummary = async (
+  startDate: string,
+  endDate: string
+) => {
+  const response = await dedupedGet(`${API_BASE}/dashboard/summary`, {
+    params: { start: startDate, end: endDate },
+  });
+  return response.data;
+};
+
 // R3: Items by Revenue
 export const getItemsByRevenue = async (
   startDate: string,
@@ -252,6 +290,27 @@ export const getItemHeatmap = async (
   return response.data;
 };
 
+// R9b: Get heatmaps for several items in one request
+export const getItemHeatmaps = async (
+  itemIds: number[],
+  startDate: string,
+  endDate: string,
+  excludeDates?: string[]
+) => {
+  const params: any = {
+    item_ids: itemIds.join(","),
+    start: startDate,
+    end: endDate,
+  };
+  if (excludeDates && excludeDates.length > 0) {
+    params.exclude_dates = excludeDates.join(",");
+  }
+  const response = await axios.get(`${API_BASE}/reports/item-heatmaps`, {
+    params,
+  });
+  return response.data;
+};
+
 // P3: Item Demand Forecast
 export const getItemDemandForecast = async () => {
   const response = await axios.get(`${API_BASE}/forecasts/items`);
@@ -350,7 +409,7 @@ export interface RevenueTrendsData {
 export const getRevenueTrends = async (
   startDate: string,
   endDate: string,
-  granularity: "week" | "month" = "week"
+  granularity: "day" | "week" | "month" | "quarter" | "fiscal_year" = "week"
 ) => {
   const response = await axios.get(`${API_BASE}/reports/revenue-trends`, {
     params: { start: startDate, end: endDate, granularity },
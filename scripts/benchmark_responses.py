@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark report response size and latency, before and after fast JSON +
+compression (backend/json_provider.py, backend/response_encoding.py).
+
+For each endpoint, requests are made in-process through Flask's test client:
+
+    before   stdlib JSON encoder, uncompressed, cache cleared (cold)
+    after    orjson (if installed) + best Accept-Encoding variant, cold
+    hit      the same request answered from the cache
+
+and the JSON encoding alone is timed with both encoders.
+
+Usage:
+    cd scripts/
+    python benchmark_responses.py
+    python benchmark_responses.py --db ../database/cafe_reports_vivonet_dev.db --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+
+def endpoints(today):
+    """The report requests worth measuring: the largest payloads plus dashboard defaults."""
+    start = (today - timedelta(days=90)).isoformat()
+    end = today.isoformat()
+    dates = f'start={start}&end={end}'
+    return [
+        '/api/forecasts/items',
+        '/api/forecasts/hourly',
+        '/api/forecasts/daily',
+        '/api/forecasts/categories',
+        f'/api/reports/sales-per-hour?mode=day-of-week&{dates}',
+        f'/api/reports/sales-per-hour?{dates}',
+        f'/api/reports/labor-percent?{dates}',
+        f'/api/reports/items-by-revenue?{dates}&item_type=all',
+        f'/api/reports/items-by-profit?{dates}',
+        f'/api/dashboard/summary?{dates}',
+        '/api/items',
+    ]
+
+
+def median_ms(fn, repeat):
+    """Median wall time of fn() in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--db', help='Database file (default: the backend default / CAFE_DB_PATH)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+    parser.add_argument('--accept-encoding', default='gzip, deflate, br',
+                        help='Accept-Encoding for the "after" requests')
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ['CAFE_DB_PATH'] = os.path.abspath(args.db)
+    os.environ['CAFE_CACHE_WARM'] = '0'
+    sys.path.insert(0, BACKEND_DIR)
+
+    from flask.json.provider import DefaultJSONProvider
+
+    from app import app
+    from extensions import cache
+    from json_provider import FAST_JSON_ENABLED, FastJSONProvider
+
+    client = app.test_client()
+    stdlib_json = DefaultJSONProvider(app)
+    fast_json = FastJSONProvider(app) if FAST_JSON_ENABLED else stdlib_json
+    after_headers = {'Accept-Encoding': args.accept_encoding}
+
+    def cold(url, provider, headers=None):
+        def run():
+            with app.app_context():
+                cache.clear()
+            app.json = provider
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, (url, response.status_code)
+            return response
+        return run
+
+    print(f"orjson: {'on' if FAST_JSON_ENABLED else 'off'}   "
+          f"Accept-Encoding (after): {args.accept_encoding}   repeat: {args.repeat}\n")
+    header = (f"{'endpoint':<58} {'bytes':>9} {'after':>9} {'enc':>8} "
+              f"{'json std':>9} {'orjson':>8} {'cold bef':>9} {'cold aft':>9} {'hit':>7}")
+    print(header)
+    print('-' * len(header))
+
+    totals = {'before': 0, 'after': 0}
+    for url in endpoints(date.today()):
+        before = cold(url, stdlib_json)()
+        after = cold(url, fast_json, after_headers)()
+        payload = before.get_json()
+
+        with app.app_context():
+            json_std = median_ms(lambda: stdlib_json.response(payload), args.repeat)
+            json_fast = median_ms(lambda: fast_json.response(payload), args.repeat)
+        cold_before = median_ms(cold(url, stdlib_json), args.repeat)
+        cold_after = median_ms(cold(url, fast_json, after_headers), args.repeat)
+        hit = median_ms(lambda: client.get(url, headers=after_headers), args.repeat)
+
+        totals['before'] += len(before.data)
+        totals['after'] += len(after.data)
+        label = url if len(url) <= 58 else url[:55] + '...'
+        print(f"{label:<58} {len(before.data):>9,} {len(after.data):>9,} "
+              f"{after.headers.get('Content-Encoding', '-'):>8} "
+              f"{json_std:>8.2f}ms {json_fast:>6.2f}ms {cold_before:>7.1f}ms {cold_after:>7.1f}ms "
+              f"{hit:>5.2f}ms")
+
+    print('-' * len(header))
+    saved = 1 - totals['after'] / totals['before'] if totals['before'] else 0
+    print(f"{'total bytes':<58} {totals['before']:>9,} {totals['after']:>9,}   ({saved:.0%} smaller)")
+    app.json = fast_json
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark revenue-trends over multi-year ranges: one query for every period
+versus the old loop of one SUM query per period.
+
+For each granularity the script times, over the same complete periods:
+
+    loop      one `SUM(revenue)` query per period (the previous implementation)
+    grouped   reports.meta.period_revenues(): one statement for all periods
+    endpoint  the whole /api/reports/revenue-trends request, cache cleared
+
+and checks that loop and grouped return the same revenues.
+
+Without --db, a synthetic database with --years of sales (schema.sql plus
+the stored time columns) is built in a temporary directory.
+
+Usage:
+    cd scripts/
+    python benchmark_revenue_trends.py
+    python benchmark_revenue_trends.py --years 5 --repeat 10
+    python benchmark_revenue_trends.py --db ../database/cafe_reports_vivonet_dev.db
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(SCRIPTS_DIR, '..', 'backend')
+DATABASE_DIR = os.path.join(SCRIPTS_DIR, '..', 'database')
+
+GRANULARITIES = ['day', 'week', 'month', 'quarter', 'fiscal_year']
+
+
+def build_synthetic_db(path, years):
+    """Schema plus `years` of sales ending yesterday: ~40 lines/day over 30 items."""
+    sys.path.append(DATABASE_DIR)
+    from transaction_time_columns import ensure_time_columns
+
+    with open(os.path.join(DATABASE_DIR, 'schema.sql')) as f:
+        schema = f.read().replace('CREATE TABLE sqlite_sequence(name,seq);', '')
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.executemany(
+        "INSERT INTO items (item_id, item_name, category, current_price, is_resold) "
+        "VALUES (?, ?, 'coffeetea', 4.0, 0)",
+        [(i, f'item {i}') for i in range(1, 31)],
+    )
+    rng = random.Random(0)
+    end = date.today() - timedelta(days=1)
+    day = end - timedelta(days=365 * years)
+    rows = []
+    while day <= end:
+        for register in range(40):
+            price = rng.choice([2.5, 3.75, 4.25, 5.0])
+            rows.append((f'{day.isoformat()} {rng.randint(7, 20):02d}:{rng.randint(0, 59):02d}:00',
+                         rng.randint(1, 30), register, price, price))
+        day += timedelta(days=1)
+    conn.executemany(
+        "INSERT INTO transactions (transaction_date, item_id, item_name, category, "
+        "quantity, register_num, unit_price, total_amount) "
+        "VALUES (?, ?, 'x', 'coffeetea', 1, ?, ?, ?)",
+        rows,
+    )
+    ensure_time_columns(conn.cursor())
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def median_ms(fn, repeat):
+    """Median wall time of fn() in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--db', help='Database file (default: a synthetic database)')
+    parser.add_argument('--years', type=int, default=3, help='Range length (and synthetic data) in years')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.db:
+        db_path = os.path.abspath(args.db)
+    else:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp_dir.name, 'trends.db')
+        lines = build_synthetic_db(db_path, args.years)
+        print(f"Synthetic database: {args.years} years, {lines:,} transaction lines")
+
+    os.environ['CAFE_DB_PATH'] = db_path
+    os.environ['CAFE_CACHE_WARM'] = '0'
+    sys.path.insert(0, BACKEND_DIR)
+
+    from app import app
+    from database import get_db
+    from extensions import cache
+    from reports.meta import complete_periods, period_revenues
+    from sales_source import get_sales_source
+
+    client = app.test_client()
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=365 * args.years)
+
+    conn = get_db()
+    cursor = conn.cursor()
+    src = get_sales_source(cursor)
+
+    def loop(periods):
+        """The previous implementation: one query per period."""
+        revenues = []
+        for first, last in periods:
+            date_where, params = src.date_filter(first, last)
+            cursor.execute(
+                f'SELECT SUM({src.revenue}) / 100.0 FROM {src.table} WHERE {date_where}', params
+            )
+            revenue = cursor.fetchone()[0]
+            revenues.append(revenue if revenue is not None else 0)
+        return revenues
+
+    def endpoint(url):
+        def run():
+            with app.app_context():
+                cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+        return run
+
+    print(f"Range: {start} to {end}   source: {src.table}   repeat: {args.repeat}\n")
+    header = (f"{'granularity':<12} {'periods':>8} {'loop':>10} {'grouped':>10} {'speedup':>8} "
+              f"{'endpoint':>10} {'same':>5}")
+    print(header)
+    print('-' * len(header))
+    for granularity in GRANULARITIES:
+        periods, _ = complete_periods(start, end, granularity)
+        url = f'/api/reports/revenue-trends?start={start}&end={end}&granularity={granularity}'
+        same = loop(periods) == period_revenues(cursor, src, periods)
+        loop_ms = median_ms(lambda: loop(periods), args.repeat)
+        grouped_ms = median_ms(lambda: period_revenues(cursor, src, periods), args.repeat)
+        endpoint_ms = median_ms(endpoint(url), args.repeat)
+        print(f"{granularity:<12} {len(periods):>8} {loop_ms:>8.1f}ms {grouped_ms:>8.1f}ms "
+              f"{loop_ms / grouped_ms:>7.1f}x {endpoint_ms:>8.1f}ms {'yes' if same else 'NO':>5}")
+
+    conn.close()
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
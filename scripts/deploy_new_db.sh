@@ -1,5 +1,5 @@
 #!/bin/bash
-# Deploy new database to PythonAnywhere and clear cache
+# Deploy new database to PythonAnywhere
 # Location-agnostic - can be run from anywhere
 
 set -e  # Exit on any error
@@ -31,10 +31,8 @@ if [ $? -eq 0 ]; then
     echo "🔄 Reloading web app..."
     ssh $PYTHONANYWHERE_USER@ssh.pythonanywhere.com "touch /var/www/${PYTHONANYWHERE_USER}_pythonanywhere_com_wsgi.py"
     echo "✓ Web app reloaded"
-    echo ""
-    echo "🧹 Clearing cache..."
-    curl -s -u "$CAFE_ADMIN_CREDS" -X POST https://$PYTHONANYWHERE_USER.pythonanywhere.com/api/admin/clear-cache > /dev/null
-    echo "✓ Cache cleared"
+    # No cache clear needed: report cache keys include the database file
+    # identity and data version, so the new file never serves old entries.
     echo ""
     echo "✅ Done! New data is live at https://$PYTHONANYWHERE_USER.pythonanywhere.com"
 else